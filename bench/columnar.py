@@ -0,0 +1,72 @@
+""" benchmark of creating primitives from an array of flat objects
+
+usage: python bench/columnar.py [number of rows]
+
+Rows of {ts, id, value} are created by:
+- rows: Primitive.produce, one Model per row
+- array: Primitive.produce_columns, columns in array.array
+- numpy: Primitive.produce_columns, columns in numpy arrays (when installed)
+"""
+from __future__ import print_function
+from pyswagger import App
+from pyswagger.primitives import Primitive
+from pyswagger.primitives.columnar import numpy
+import json
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+
+spec = {
+    'swagger': '2.0',
+    'info': {'title': 'bench', 'version': '1.0'},
+    'host': 'localhost',
+    'paths': {},
+    'definitions': {
+        'Samples': {'type': 'array', 'items': {'$ref': '#/definitions/Sample'}},
+        'Sample': {
+            'type': 'object',
+            'required': ['ts', 'id'],
+            'properties': {
+                'ts': {'type': 'integer', 'format': 'int64', 'minimum': 0},
+                'id': {'type': 'integer', 'format': 'int32'},
+                'value': {'type': 'number', 'format': 'double', 'minimum': 0, 'maximum': 1000},
+            },
+        },
+    },
+}
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    payload = [dict(ts=1500000000000 + i, id=i % 1000, value=(i % 997) / 10.0) for i in range(n)]
+
+    folder = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(folder, 'swagger.json'), 'w') as f:
+            json.dump(spec, f)
+
+        factory = Primitive()
+        app = App.load(folder, prim=factory)
+        app.prepare()
+    finally:
+        shutil.rmtree(folder)
+
+    samples = app.resolve('#/definitions/Samples')
+    runs = [
+        ('rows', lambda: factory.produce(samples, payload, dict(read=True))),
+        ('array', lambda: factory.produce_columns(samples, payload, use_numpy=False)),
+    ]
+    if numpy:
+        runs.append(('numpy', lambda: factory.produce_columns(samples, payload)))
+
+    for name, fn in runs:
+        t = min(timeit.repeat(fn, number=1, repeat=3))
+        print('{0}: {1:.3f}s, {2:.0f} rows/s'.format(name, t, n / t))
+
+    # the same values from all
+    rows = runs[0][1]()
+    for _, fn in runs[1:]:
+        assert list(fn()['ts']) == [r.ts for r in rows]
@@ -0,0 +1,82 @@
+""" benchmark of cycle detection on a synthetic spec
+
+usage: python bench/cycle_detector.py [number of schemas] [--legacy]
+
+Each Schema refers to the next two Schema(s) in the same group,
+and the last Schema in a group refers back to the first one.
+The legacy approach (walk from each Schema) is measured for comparison
+when '--legacy' is provided, it's very slow on large specs.
+"""
+from __future__ import print_function
+from pyswagger import App
+from pyswagger.scan import Scanner, default_tree_traversal
+from pyswagger.scanner import CycleDetector
+from pyswagger.scanner.cycle_detector import _schema_out_obj
+from pyswagger.spec.v2_0.objects import Schema
+from pyswagger.spec.v2_0.parser import SchemaContext
+from pyswagger.utils import walk
+import json
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+
+def make_spec(n, group=10):
+    definitions = {}
+    for i in range(n):
+        first = i - i % group
+        nexts = [j for j in (i + 1, i + 2) if j < first + group and j < n]
+        props = dict(('p{0}'.format(j), {'$ref': '#/definitions/s{0}'.format(j)}) for j in nexts)
+        if not nexts:
+            props['p'] = {'$ref': '#/definitions/s{0}'.format(first)}
+        props['id'] = {'type': 'integer'}
+        definitions['s{0}'.format(i)] = {'type': 'object', 'properties': props}
+
+    return {
+        'swagger': '2.0',
+        'info': {'title': 'bench', 'version': '1.0'},
+        'host': 'localhost',
+        'paths': {},
+        'definitions': definitions,
+    }
+
+def detect(app):
+    cy = CycleDetector()
+    Scanner(app).scan(route=[cy], root=app.root)
+    return cy.cycles['schema']
+
+def detect_legacy(app):
+    def _out(path):
+        obj = app.resolve(path, parser=SchemaContext)
+        return [] if obj == None else _schema_out_obj(obj)
+
+    cyc = []
+    for path, obj in default_tree_traversal(app.root, []):
+        if isinstance(obj, Schema):
+            cyc = walk(path, _out, cyc)
+    return cyc
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if a != '--legacy']
+    n = int(args[0]) if args else 10000
+    fns = [('scc', detect)]
+    if '--legacy' in sys.argv:
+        fns.append(('legacy', detect_legacy))
+
+    folder = tempfile.mkdtemp()
+    try:
+        with open(os.path.join(folder, 'swagger.json'), 'w') as f:
+            json.dump(make_spec(n), f)
+
+        app = App.load(folder)
+        app.prepare(strict=False)
+
+        if len(fns) > 1:
+            assert sorted(detect(app)) == sorted(detect_legacy(app))
+        for name, fn in fns:
+            print('{0}: {1:.3f}s'.format(name, min(timeit.repeat(lambda: fn(app), number=1, repeat=3))))
+    finally:
+        shutil.rmtree(folder)
@@ -0,0 +1,64 @@
+""" benchmark of encoding request bodies in JSON
+
+usage: python bench/json_encoder.py [number of orders]
+
+An array of orders (Models with Datetime, Byte, Array...) is encoded by:
+- PrimJSONEncoder: json.dumps with a default() for primitives, the path without Schema
+- SchemaEncoder: encoding directed by Schema of the body
+"""
+from __future__ import print_function
+from pyswagger import App
+from pyswagger.primitives import Primitive
+from pyswagger.primitives.comm import PrimJSONEncoder
+from pyswagger.primitives.encoder import SchemaEncoder
+import json
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+# the same spec and payload as bench/primitives.py
+from primitives import spec, make_payload
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+
+    folder = tempfile.mkdtemp()
+    try:
+        s = json.loads(json.dumps(spec))
+        s['definitions']['Order']['properties'].update({
+            'created': {'type': 'string', 'format': 'date-time'},
+            'signature': {'type': 'string', 'format': 'byte'},
+        })
+        s['definitions']['Orders'] = {'type': 'array', 'items': {'$ref': '#/definitions/Order'}}
+        with open(os.path.join(folder, 'swagger.json'), 'w') as f:
+            json.dump(s, f)
+
+        app = App.load(folder, prim=Primitive())
+        app.prepare()
+    finally:
+        shutil.rmtree(folder)
+
+    orders = app.resolve('#/definitions/Orders')
+    payload = make_payload(n)
+    for v in payload:
+        v.update(created='2017-01-02T03:04:05.678Z', signature='signed by someone')
+    models = app.prim_factory.produce(orders, payload)
+
+    encoder = SchemaEncoder()
+    runs = [
+        ('PrimJSONEncoder', lambda: json.dumps(models, cls=PrimJSONEncoder)),
+        ('SchemaEncoder', lambda: encoder.encode(orders, models)),
+    ]
+
+    expected = None
+    for name, fn in runs:
+        t = min(timeit.repeat(fn, number=1, repeat=7))
+        print('{0}: {1:.3f}s, {2:.0f} orders/s'.format(name, t, n / t))
+
+        # the same JSON from both
+        ret = json.loads(fn())
+        assert expected == None or ret == expected
+        expected = ret
@@ -0,0 +1,68 @@
+""" benchmark of JSON backends of MimeCodec
+
+usage: python bench/mime_codec.py [number of orders]
+
+Orders (Models with Datetime, Byte, Array...) are marshalled and the
+results are unmarshalled, by each JSON backend installed.
+"""
+from __future__ import print_function
+from pyswagger import App
+from pyswagger.primitives import MimeCodec, Primitive
+from pyswagger.primitives.codec import get_json_backend, _json_backends
+import json
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+# the same spec and payload as bench/primitives.py
+from primitives import spec, make_payload
+
+
+def make_models(n):
+    """ orders in primitives, with Datetime and Byte
+    """
+    folder = tempfile.mkdtemp()
+    try:
+        s = json.loads(json.dumps(spec))
+        s['definitions']['Order']['properties'].update({
+            'created': {'type': 'string', 'format': 'date-time'},
+            'signature': {'type': 'string', 'format': 'byte'},
+        })
+        with open(os.path.join(folder, 'swagger.json'), 'w') as f:
+            json.dump(s, f)
+
+        app = App.load(folder, prim=Primitive())
+        app.prepare()
+        order = app.resolve('#/definitions/Order')
+
+        payload = make_payload(n)
+        for v in payload:
+            v.update(created='2017-01-02T03:04:05.678Z', signature='signed by someone')
+        return [app.prim_factory.produce(order, v) for v in payload]
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    models = make_models(n)
+
+    expected = None
+    for name in _json_backends:
+        if get_json_backend(name).name != name:
+            print('{0}: not installed'.format(name))
+            continue
+
+        codec = MimeCodec(json_backend=name)
+        data = codec.marshal('application/json', models)
+
+        t_marshal = min(timeit.repeat(lambda: codec.marshal('application/json', models), number=1, repeat=3))
+        t_unmarshal = min(timeit.repeat(lambda: codec.unmarshal('application/json', data), number=1, repeat=3))
+        print('{0}: marshal {1:.3f}s, unmarshal {2:.3f}s'.format(name, t_marshal, t_unmarshal))
+
+        # the same JSON from every backend
+        ret = codec.unmarshal('application/json', data)
+        assert expected == None or ret == expected
+        expected = ret
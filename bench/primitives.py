@@ -0,0 +1,118 @@
+""" benchmark of creating primitives from a large nested payload
+
+usage: python bench/primitives.py [number of orders]
+
+Primitives are created by:
+- interpreted: Primitive.produce without compiled constructors
+- compiled: Primitive, Schemas compiled into closures
+- codegen: CodegenPrimitive, python source generated for Schemas
+- slots: SlotsPrimitive, Models kept in __slots__ classes
+
+Memory held by the created primitives is reported when tracemalloc is available.
+"""
+from __future__ import print_function
+from pyswagger import App
+from pyswagger.primitives import Primitive
+from pyswagger.primitives.codegen import CodegenPrimitive
+from pyswagger.primitives.slots import SlotsPrimitive
+import json
+import os
+import shutil
+import sys
+import tempfile
+import timeit
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+class InterpretedPrimitive(Primitive):
+    """ interpret Schema for every value """
+
+    def produce(self, obj, val, ctx=None):
+        return self._produce(obj, val, ctx)
+
+
+spec = {
+    'swagger': '2.0',
+    'info': {'title': 'bench', 'version': '1.0'},
+    'host': 'localhost',
+    'paths': {},
+    'definitions': {
+        'Order': {
+            'type': 'object',
+            'required': ['id', 'items'],
+            'properties': {
+                'id': {'type': 'integer', 'format': 'int64', 'minimum': 0},
+                'status': {'type': 'string', 'enum': ['placed', 'approved', 'delivered']},
+                'note': {'type': 'string', 'maxLength': 128},
+                'customer': {'$ref': '#/definitions/Customer'},
+                'items': {'type': 'array', 'items': {'$ref': '#/definitions/Item'}, 'maxItems': 100},
+            },
+        },
+        'Customer': {
+            'type': 'object',
+            'properties': {
+                'id': {'type': 'integer'},
+                'name': {'type': 'string', 'minLength': 1},
+                'vip': {'type': 'boolean'},
+            },
+        },
+        'Item': {
+            'type': 'object',
+            'properties': {
+                'sku': {'type': 'string'},
+                'quantity': {'type': 'integer', 'minimum': 1, 'maximum': 1000},
+                'price': {'type': 'number', 'format': 'double', 'minimum': 0},
+                'tags': {'type': 'array', 'items': {'type': 'string'}},
+            },
+        },
+    },
+}
+
+def make_payload(n):
+    return [dict(
+        id=i,
+        status='placed',
+        note='leave it at the door',
+        customer=dict(id=i, name='customer {0}'.format(i), vip=i % 2 == 0),
+        items=[dict(sku='sku-{0}'.format(j), quantity=j + 1, price=9.99, tags=['a', 'b']) for j in range(5)],
+    ) for i in range(n)]
+
+
+if __name__ == '__main__':
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    payload = make_payload(n)
+
+    folder, results = tempfile.mkdtemp(), []
+    try:
+        with open(os.path.join(folder, 'swagger.json'), 'w') as f:
+            json.dump(spec, f)
+
+        for name, factory in (
+                ('interpreted', InterpretedPrimitive()),
+                ('compiled', Primitive()),
+                ('codegen', CodegenPrimitive()),
+                ('slots', SlotsPrimitive())):
+            app = App.load(folder, prim=factory)
+            app.prepare()
+            order = app.resolve('#/definitions/Order')
+
+            def run():
+                return [factory.produce(order, v, dict(read=True)) for v in payload]
+
+            results.append(run())
+            print('{0}: {1:.3f}s'.format(name, min(timeit.repeat(run, number=1, repeat=3))))
+
+            if tracemalloc:
+                tracemalloc.start()
+                kept = run()
+                print('{0}: {1:.1f} MB kept'.format(name, tracemalloc.get_traced_memory()[0] / 1024.0 / 1024.0))
+                tracemalloc.stop()
+                del kept
+
+        assert all(r == results[0] for r in results)
+    finally:
+        shutil.rmtree(folder)
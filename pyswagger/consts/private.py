@@ -18,3 +18,6 @@ SWAGGER_FILE_NAMES = [
 ]
 
 SCOPE_SEPARATOR = '!##!'
+
+# version of the binary image written by App.save_snapshot
+SNAPSHOT_FORMAT = 1
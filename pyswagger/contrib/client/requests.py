@@ -1,5 +1,6 @@
 from __future__ import absolute_import
 from ...core import BaseClient
+from ...io import MultipartEncoder
 from requests import Session, Request
 import six
 
@@ -36,43 +37,44 @@ class Client(BaseClient):
         req, resp = super(Client, self).request((req, resp), opt)
 
         # apply request-related options before preparation.
-        req.prepare(scheme=self.prepare_schemes(req), handle_files=False)
+        req.prepare(scheme=self.prepare_schemes(req), handle_files=True, stream=True)
         req._patch(opt)
 
         composed_headers = self.compose_headers(req, headers, opt, as_dict=True)
 
-        # prepare for uploaded files
-        file_obj = []
-        def append(name, obj):
-            f = obj.data or open(obj.filename, 'rb')
-            if 'Content-Type' in obj.header:
-                file_obj.append((name, (obj.filename, f, obj.header['Content-Type'])))
-            else:
-                file_obj.append((name, (obj.filename, f)))
-
-        for k, v in six.iteritems(req.files):
-            if isinstance(v, list):
-                for vv in v:
-                    append(k, vv)
-            else:
-                append(k, v)
+        # streamed body is sent with Content-Length when known, or chunked.
+        # multipart/form-data of unknown length is buffered, since chunked
+        # uploading isn't accepted by many servers.
+        data = req.data
+        if isinstance(data, MultipartEncoder) and data.len == None:
+            data = data.getvalue()
 
         rq = Request(
             method=req.method.upper(),
             url=req.url,
             params=req.query,
-            data=req.data,
+            data=data,
             headers=composed_headers,
-            files=file_obj
         )
         rq = self.__s.prepare_request(rq)
         rs = self.__s.send(rq, stream=True, **self.__send_opt)
 
-        resp.apply_with(
-            status=rs.status_code,
-            header=rs.headers,
-            raw=six.BytesIO(rs.content).getvalue()
-        )
+        # with a compression policy, body is decompressed by Response
+        # according to Content-Encoding, instead of by requests.
+        decode = resp.compression == None
+        if resp.stream_body:
+            # body is consumed by Response.iter_data
+            resp.apply_with(status=rs.status_code, header=rs.headers)
+            if decode:
+                resp.raw_stream = rs.iter_content(chunk_size=64 * 1024)
+            else:
+                resp.raw_stream = rs.raw.stream(64 * 1024, decode_content=False)
+        else:
+            resp.apply_with(
+                status=rs.status_code,
+                header=rs.headers,
+                raw=six.BytesIO(rs.content).getvalue() if decode else rs.raw.read(decode_content=False)
+            )
 
         return resp
 
@@ -1,8 +1,10 @@
 from __future__ import absolute_import
 from ...core import BaseClient
+from ...io import StreamBody
 from tornado.httpclient import AsyncHTTPClient, HTTPRequest
 from tornado.httputil import url_concat, HTTPHeaders
 from tornado import gen
+import functools
 
 
 class TornadoClient(BaseClient):
@@ -31,7 +33,7 @@ class TornadoClient(BaseClient):
         opt = opt or {}
         req, resp = super(TornadoClient, self).request((req, resp), opt)
 
-        req.prepare(scheme=self.prepare_schemes(req), handle_files=True)
+        req.prepare(scheme=self.prepare_schemes(req), handle_files=True, stream=True)
         req._patch(opt)
 
         composed_headers = self.compose_headers(req, headers, opt)
@@ -41,17 +43,29 @@ class TornadoClient(BaseClient):
 
         url = url_concat(req.url, req.query)
 
+        if isinstance(req.data, StreamBody):
+            body = dict(body_producer=functools.partial(_produce_body, req.data))
+        else:
+            body = dict(body=req.data)
+
+        # with a compression policy, body is decompressed according to it,
+        # instead of by tornado.
         rq = HTTPRequest(
             url=url,
             method=req.method.upper(),
             headers=tornado_headers,
-            body=req.data
+            decompress_response=resp.compression == None,
+            **body
             )
         rs = yield self.__client.fetch(rq)
 
+        raw = rs.body
+        if resp.compression and 'Content-Encoding' in rs.headers:
+            raw = resp.compression.decompress(rs.headers['Content-Encoding'], raw)
+
         resp.apply_with(
             status=rs.code,
-            raw=rs.body
+            raw=raw
             )
 
         for k, v in rs.headers.get_all():
@@ -59,3 +73,12 @@ class TornadoClient(BaseClient):
 
         raise gen.Return(resp)
 
+
+
+@gen.coroutine
+def _produce_body(data, write):
+    """ body_producer of tornado.httpclient.HTTPRequest, write
+    chunks of a streamed body.
+    """
+    for chunk in data:
+        yield write(chunk)
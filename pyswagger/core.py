@@ -2,24 +2,65 @@ from __future__ import absolute_import
 from .resolve import Resolver
 from .primitives import Primitive, MimeCodec
 from .spec.v1_2.parser import ResourceListContext
-from .spec.v2_0.parser import SwaggerContext
-from .spec.v2_0.objects import Operation
-from .spec.base import BaseObj
-from .scan import Scanner
+from .spec.v2_0.parser import SwaggerContext, ParameterContext, ResponseContext
+from .spec.v2_0.objects import Operation, Parameter, Response, PathItem
+from .spec.base import BaseObj, _deproxy
+from .scan import Scanner, default_tree_traversal, ref_tree_traversal
 from .scanner import TypeReduce, CycleDetector
 from .scanner.v1_2 import Upgrade
 from .scanner.v2_0 import AssignParent, Merge, Resolve, PatchObject, YamlFixer, Aggregate, NormalizeRef
-from pyswagger import utils, errs, consts
+from pyswagger import utils, errs, consts, __version__
 import copy
 import base64
 import six
 import weakref
 import logging
+import hashlib
+import functools
+import threading
 
 
 logger = logging.getLogger(__name__)
 
 
+class _LazyScopeDict(utils.ScopeDict):
+    """ ScopeDict which prepares objects when accessed,
+    used when App is prepared lazily.
+    """
+    def __init__(self, prepare, *a, **k):
+        super(_LazyScopeDict, self).__init__(*a, **k)
+        self.__prepare = prepare
+
+    def __getitem__(self, *keys):
+        obj = super(_LazyScopeDict, self).__getitem__(*keys)
+        self.__prepare(obj)
+        return obj
+
+    def get(self, k, d=None):
+        if not dict.__contains__(self, k):
+            return d
+        return self[k]
+
+    def __iter__(self):
+        for k in list(dict.keys(self)):
+            self.__prepare(dict.__getitem__(self, k))
+            yield k
+
+    def itervalues(self):
+        for k in self:
+            yield dict.__getitem__(self, k)
+
+    def iteritems(self):
+        for k in self:
+            yield k, dict.__getitem__(self, k)
+
+    def values(self):
+        return list(self.itervalues())
+
+    def items(self):
+        return list(self.iteritems())
+
+
 class App(object):
     """ Major component of pyswagger
 
@@ -33,7 +74,7 @@ class App(object):
         sc_path: ('/', '#/paths')
     }
 
-    def __init__(self, url=None, url_load_hook=None, sep=consts.private.SCOPE_SEPARATOR, prim=None, mime_codec=None, resolver=None):
+    def __init__(self, url=None, url_load_hook=None, sep=consts.private.SCOPE_SEPARATOR, prim=None, mime_codec=None, resolver=None, concurrency=1):
         """ constructor
 
         :param url str: url of swagger.json
@@ -41,6 +82,7 @@ class App(object):
         :param sep str: separator used by pyswager.utils.ScopeDict
         :param prim pyswagger.primitives.Primitive: factory for primitives in Swagger.
         :param resolver: pyswagger.resolve.Resolver: customized resolver used as default when none is provided when resolving
+        :param int concurrency: maximum number of documents loaded at the same time
         """
 
         logger.info('init with url: {0}'.format(url))
@@ -59,6 +101,10 @@ class App(object):
         # - a map from json-pointer to spec.BaseObj
         self.__objs = {}
 
+        # a map from json-reference to resolved object,
+        # filled by successful lookups of App.resolve
+        self.__index = {}
+
         if url_load_hook and resolver:
             raise ValueError('when use customized Resolver, please pass url_load_hook to that one')
 
@@ -74,6 +120,23 @@ class App(object):
         # MIME codec
         self.__mime_codec = mime_codec or MimeCodec()
 
+        # limit of concurrent loading
+        self.__concurrency = concurrency
+
+        # compile call plans of Operation(s) when preparing
+        self.__precompile = False
+
+        # documents loaded ahead of preparation
+        self.__prefetched = {}
+
+        # lazy preparation
+        # - a map from id of PathItem(s), Schema(s) to their json-pointers
+        # - a set of id of prepared objects
+        self.__lazy = False
+        self.__lazy_paths = {}
+        self.__lazy_prepared = set()
+        self.__lazy_lock = threading.RLock()
+
     @property
     def root(self):
         """ schema representation of Swagger API, its structure may
@@ -152,6 +215,15 @@ class App(object):
         """
         return self.__prim
 
+    @property
+    def prefetched(self):
+        """ external documents loaded concurrently before preparation,
+        only available when App is loaded with concurrency > 1
+
+        :type: dict, a map from url to seconds spent
+        """
+        return self.__prefetched
+
     @property
     def mime_codec(self):
         """ mime codec used by this app
@@ -171,7 +243,7 @@ class App(object):
         if version == '1.2':
             # swagger 1.2
             with ResourceListContext(tmp, '_tmp_') as ctx:
-                ctx.parse(obj, jref, self.__resolver, getter)
+                ctx.parse(obj, jref, self.__resolver, getter, concurrency=self.__concurrency)
         elif version == '2.0':
             # swagger 2.0
             with SwaggerContext(tmp, '_tmp_') as ctx:
@@ -210,12 +282,12 @@ class App(object):
 
             s.scan(root=obj, route=[AssignParent()])
 
-        # fix for yaml that treat response code as number
+        # fix for yaml that treat response code as number,
+        # it should be done before going into Operation(s)
         s.scan(root=obj, route=[YamlFixer()], leaves=[Operation])
-        # normalize $ref
-        url, jp = utils.jr_split(jref)
-        s.scan(root=obj, route=[NormalizeRef(url)])
+
         # cache this object
+        url, jp = utils.jr_split(jref)
         if url not in self.__objs:
             if jp == '#':
                 self.__objs[url] = obj
@@ -226,11 +298,41 @@ class App(object):
                 raise Exception('it should be able to resolve with BaseObj')
             self.__objs[url].update({jp: obj})
 
-        # pre resolve Schema Object
+        # objects under this url might be different from the indexed ones
+        self.__index.clear()
+
+        # normalize $ref, and pre resolve Schema Object in one traversal,
+        # $ref of an object is normalized before resolving it.
         # note: make sure this object is cached before using 'Resolve' scanner
-        s.scan(root=obj, route=[Resolve()])
+        s.scan(root=obj, route=[NormalizeRef(url), Resolve()])
         return obj
 
+    def _prefetch_refs(self):
+        """ walk through loaded documents to discover external
+        documents referred by $ref, and load them concurrently.
+        """
+        cache = self.__resolver.cache
+        todo = [utils.jr_split(self.__url)[0]]
+        seen = set(todo)
+
+        while len(todo):
+            urls = set()
+            for u in todo:
+                if cache.get(u, None):
+                    urls |= utils.get_external_refs(cache[u], u)
+
+            todo = sorted(urls - seen)
+            seen |= urls
+            try:
+                self.__prefetched.update(self.__resolver.prefetch(todo, concurrency=self.__concurrency))
+            except Exception as e:
+                # leave the rest to be loaded when resolving
+                logger.warning('failed to prefetch external documents: {0}'.format(e))
+                break
+
+        for u, t in six.iteritems(self.__prefetched):
+            logger.info('prefetched [{0}] in {1:.3f} seconds'.format(u, t))
+
     def _validate(self):
         """ check if this Swagger API valid or not.
 
@@ -258,7 +360,7 @@ class App(object):
         return v.errs
 
     @classmethod
-    def load(kls, url, getter=None, parser=None, url_load_hook=None, sep=consts.private.SCOPE_SEPARATOR, prim=None, mime_codec=None, resolver=None):
+    def load(kls, url, getter=None, parser=None, url_load_hook=None, sep=consts.private.SCOPE_SEPARATOR, prim=None, mime_codec=None, resolver=None, concurrency=1):
         """ load json as a raw App
 
         :param str url: url of path of Swagger API definition
@@ -272,6 +374,7 @@ class App(object):
         :param prim pyswager.primitives.Primitive: factory for primitives in Swagger
         :param mime_codec pyswagger.primitives.MimeCodec: MIME codec
         :param resolver: pyswagger.resolve.Resolver: customized resolver used as default when none is provided when resolving
+        :param int concurrency: maximum number of documents loaded at the same time, ex. API declarations in Swagger 1.2
         :return: the created App object
         :rtype: App
         :raises ValueError: if url is wrong
@@ -281,7 +384,7 @@ class App(object):
         logger.info('load with [{0}]'.format(url))
 
         url = utils.normalize_url(url)
-        app = kls(url, url_load_hook=url_load_hook, sep=sep, prim=prim, mime_codec=mime_codec, resolver=resolver)
+        app = kls(url, url_load_hook=url_load_hook, sep=sep, prim=prim, mime_codec=mime_codec, resolver=resolver, concurrency=concurrency)
         app.__raw, app.__version = app.load_obj(url, getter=getter, parser=parser)
         if app.__version not in ['1.2', '2.0']:
             raise NotImplementedError('Unsupported Version: {0}'.format(self.__version))
@@ -309,11 +412,79 @@ class App(object):
 
         return result
 
-    def prepare(self, strict=True):
+    def _deref_lazily(self, obj):
+        """ get (json-pointer, object) of the object referred by $ref,
+        used by lazy preparation to reach referenced objects.
+        """
+        if isinstance(obj, PathItem):
+            # operations are merged into referrer by Merge
+            return None
+
+        r = getattr(obj, '$ref', None)
+        if not r:
+            return None
+
+        ro = getattr(obj, 'ref_obj', None)
+        if ro == None:
+            ro = self.resolve(r, {Parameter: ParameterContext, Response: ResponseContext}.get(obj.__class__, None))
+
+        url, jp = utils.jr_split(r)
+        return jp if url == utils.jr_split(self.__url)[0] else r, _deproxy(ro)
+
+    def _prepare_lazily(self, obj, path=None):
+        """ prepare an object and objects reachable from it, a PathItem
+        would be prepared when one of its Operation is requested.
+
+        :param obj: the object to prepare
+        :param str path: json-pointer of this object
+        """
+        obj = _deproxy(obj)
+        if not isinstance(obj, BaseObj):
+            return
+        if isinstance(obj, Operation):
+            obj = _deproxy(obj._parent_)
+
+        path = self.__lazy_paths.get(id(obj), path)
+        if not path or id(obj) in self.__lazy_prepared:
+            return
+
+        with self.__lazy_lock:
+            if id(obj) in self.__lazy_prepared:
+                return
+
+            visited = set()
+            m, po, ag = Merge(), PatchObject(), Aggregate()
+            Scanner(self).schedule(
+                root=obj,
+                route=[m, po, ag],
+                after={po: [m], ag: [po]},
+                nexter=functools.partial(
+                    ref_tree_traversal,
+                    deref=self._deref_lazily,
+                    path=path,
+                    skip=self.__lazy_prepared,
+                    visited=visited
+            ))
+            self.__lazy_prepared |= visited
+
+            if self.__precompile:
+                for op in six.itervalues(obj._children_):
+                    if isinstance(op, Operation):
+                        op.compile()
+
+    def prepare(self, strict=True, lazy=False, precompile=False):
         """ preparation for loaded json
 
         :param bool strict: when in strict mode, exception would be raised if not valid.
+        :param bool lazy: when True, Operation(s) accessed by App.op, App.s and Schema(s) accessed by App.m are prepared
+        along with objects reachable from them when first accessed. Cycle detection is skipped in this mode.
+        :param bool precompile: when True, call plans of Operation(s) are compiled when they are prepared, instead of
+        the first time they are called.
         """
+        self.__precompile = precompile
+
+        if self.__concurrency > 1 and self.__version == '2.0':
+            self._prefetch_refs()
 
         self.__root = self.prepare_obj(self.raw, self.__url)
         self.validate(strict=strict)
@@ -325,15 +496,23 @@ class App(object):
                 # extract schemes from the url to load spec
                 self.__schemes = [six.moves.urlparse(self.__url).schemes]
 
-        s = Scanner(self)
-        s.scan(root=self.__root, route=[Merge()])
-        s.scan(root=self.__root, route=[PatchObject()])
-        s.scan(root=self.__root, route=[Aggregate()])
+        if lazy:
+            self._prepare_index_lazily()
+            return
 
+        # - PatchObject relies on 'final' of Parameter(s), which is
+        #   not ready until all Parameter(s) in Operation are merged.
+        # - Aggregate relies on Schema.name patched by PatchObject.
+        # - TypeReduce should collect Operation(s) from merged PathItem(s).
+        m, po, ag = Merge(), PatchObject(), Aggregate()
         # reducer for Operation
         tr = TypeReduce(self.__sep)
         cy = CycleDetector()
-        s.scan(root=self.__root, route=[tr, cy])
+        Scanner(self).schedule(
+            root=self.__root,
+            route=[m, po, ag, tr, cy],
+            after={po: [m], ag: [po], tr: [m]}
+        )
 
         # 'op' -- shortcut for Operation with tag and operaionId
         self.__op = utils.ScopeDict(tr.op)
@@ -350,6 +529,33 @@ class App(object):
         if len(cy.cycles['schema']) > 0 and strict:
             raise errs.CycleDetectionError('Cycles detected in Schema Object: {0}'.format(cy.cycles['schema']))
 
+        if precompile:
+            for op in six.itervalues(tr.op):
+                op.compile()
+
+    def _prepare_index_lazily(self):
+        """ build App.op, App.m without preparing Operation(s), Schema(s)
+        """
+        self.__lazy = True
+
+        s = Scanner(self)
+        tr = TypeReduce(self.__sep)
+        for k, pi in six.iteritems(getattr(self.__root, 'paths', None) or {}):
+            self.__lazy_paths[id(pi)] = utils.jp_compose(k, base='#/paths')
+            if getattr(pi, '$ref'):
+                # Operation(s) are available after merging
+                self._prepare_lazily(pi)
+            s.scan(root=pi, route=[tr], leaves=[Operation])
+
+        definitions = getattr(self.__root, 'definitions', None) or {}
+        for k, d in six.iteritems(definitions):
+            self.__lazy_paths[id(d)] = utils.jp_compose(k, base='#/definitions')
+
+        self.__op = _LazyScopeDict(self._prepare_lazily, tr.op)
+        self.__m = _LazyScopeDict(self._prepare_lazily, definitions)
+        self.__m.sep = self.__sep
+        self.__op.sep = self.__sep
+
     @classmethod
     def create(kls, url, strict=True):
         """ factory of App
@@ -371,6 +577,103 @@ class App(object):
     """
     _create_ = create
 
+    @staticmethod
+    def _digest_of(resolver, urls):
+        """ content hash of loaded documents
+        """
+        h = hashlib.sha1()
+        for url in urls:
+            h.update(url.encode('utf-8') if isinstance(url, six.text_type) else url)
+            utils.digest(resolver.resolve(url), h)
+        return h.hexdigest()
+
+    def save_snapshot(self, path):
+        """ write the prepared object graph into a binary image,
+        which could be loaded by App.from_snapshot without loading
+        and preparing Swagger API definition again.
+
+        :param str path: path of the image file
+        :raises Exception: if this App is not prepared
+        """
+        if self.__root == None:
+            raise Exception('App should be prepared before taking a snapshot')
+        if self.__lazy:
+            raise Exception('Lazily prepared App is not supported by snapshot')
+
+        urls = sorted(u for u, v in six.iteritems(self.__resolver.cache) if v)
+        header = dict(
+            format=consts.private.SNAPSHOT_FORMAT,
+            version=__version__,
+            urls=urls,
+            key=self._digest_of(self.__resolver, urls),
+        )
+        state = dict(
+            url=self.__url,
+            sep=self.__sep,
+            raw=self.__raw,
+            root=self.__root,
+            swagger_version=self.__version,
+            schemes=self.__schemes,
+            op=self.__op,
+            m=self.__m,
+            objs=self.__objs,
+        )
+
+        with open(path, 'wb') as f:
+            six.moves.cPickle.dump(header, f, six.moves.cPickle.HIGHEST_PROTOCOL)
+            six.moves.cPickle.dump(state, f, six.moves.cPickle.HIGHEST_PROTOCOL)
+
+        logger.info('snapshot [{0}] saved to {1}'.format(header['key'], path))
+
+    @classmethod
+    def from_snapshot(kls, path, verify=False, url_load_hook=None, prim=None, mime_codec=None, resolver=None):
+        """ factory of App, restore a prepared App from an image written by App.save_snapshot
+
+        The image is unpickled, therefore it should only come from a trusted source.
+
+        :param str path: path of the image file
+        :param bool verify: fetch loaded documents again and compare them with the content hash in image,
+        to detect a stale image.
+        :param func url_load_hook: hook to patch the url to load json
+        :param prim pyswager.primitives.Primitive: factory for primitives in Swagger
+        :param mime_codec pyswagger.primitives.MimeCodec: MIME codec
+        :param resolver: pyswagger.resolve.Resolver: customized resolver used as default when none is provided when resolving
+        :return: the restored App object
+        :rtype: App
+        :raises ValueError: if the image is incompatible or stale
+        """
+        with open(path, 'rb') as f:
+            header = six.moves.cPickle.load(f)
+            if not isinstance(header, dict) or \
+                header.get('format') != consts.private.SNAPSHOT_FORMAT or \
+                header.get('version') != __version__:
+                raise ValueError('Incompatible snapshot: {0}'.format(path))
+
+            state = six.moves.cPickle.load(f)
+
+        app = kls(state['url'], url_load_hook=url_load_hook, sep=state['sep'], prim=prim, mime_codec=mime_codec, resolver=resolver)
+        if verify and app._digest_of(app.__resolver, header['urls']) != header['key']:
+            raise ValueError('Stale snapshot: {0}'.format(path))
+
+        app.__raw = state['raw']
+        app.__root = state['root']
+        app.__version = state['swagger_version']
+        app.__schemes = state['schemes']
+        app.__op = state['op']
+        app.__m = state['m']
+        app.__objs = state['objs']
+
+        # primitive factory & MIME codec are not carried in image,
+        # Operation(s) might come from any loaded document
+        for o in six.itervalues(app.__objs):
+            for root in (six.itervalues(o) if isinstance(o, dict) else [o]):
+                for _, obj in default_tree_traversal(root, []):
+                    if isinstance(obj, Operation):
+                        setattr(obj, '_prim_factory', app.prim_factory)
+                        setattr(obj, '_mime_codec', app.mime_codec)
+
+        return app
+
     def resolve(self, jref, parser=None):
         """ JSON reference resolver
 
@@ -382,11 +685,15 @@ class App(object):
         :raises ValueError: if path is not valid
         """
 
-        logger.info('resolving: [{0}]'.format(jref))
-
         if jref == None or len(jref) == 0:
             raise ValueError('Empty Path is not allowed')
 
+        obj = self.__index.get(jref, None)
+        if obj != None:
+            return obj
+
+        logger.info('resolving: [{0}]'.format(jref))
+
         obj = None
         url, jp = utils.jr_split(jref)
 
@@ -422,8 +729,12 @@ class App(object):
             raise ValueError('Unable to resolve path, [{0}]'.format(jref))
 
         if isinstance(obj, (six.string_types, six.integer_types, list, dict)):
+            # containers might be replaced when merging,
+            # they are not indexed
             return obj
-        return weakref.proxy(obj)
+
+        obj = self.__index[jref] = weakref.proxy(obj)
+        return obj
 
     def s(self, p, b=_shortcut_[sc_path]):
         """ shortcut of App.resolve.
@@ -435,9 +746,14 @@ class App(object):
         """
 
         if b[0]:
-            return self.resolve(utils.jp_compose(b[0] + p if not p.startswith(b[0]) else p, base=b[1]))
+            jref = utils.jp_compose(b[0] + p if not p.startswith(b[0]) else p, base=b[1])
         else:
-            return self.resolve(utils.jp_compose(p, base=b[1]))
+            jref = utils.jp_compose(p, base=b[1])
+
+        obj = self.resolve(jref)
+        if self.__lazy:
+            self._prepare_lazily(obj, utils.jr_split(jref)[1])
+        return obj
 
     def dump(self):
         """ dump into Swagger Document
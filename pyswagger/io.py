@@ -1,10 +1,12 @@
 from __future__ import absolute_import
 from .primitives.comm import PrimJSONEncoder
-from .utils import final, deref, CaseInsensitiveDict
+from .primitives.codec import iter_chunks
+from .utils import final, deref, jp_split, CaseInsensitiveDict
 from pyswagger import errs
 from uuid import uuid4
 import six
-import io, codecs
+import io, os
+import functools
 import collections
 import logging
 
@@ -38,12 +40,23 @@ class Request(object):
         self.__consume = None
         self.__produce = None
         self.__scheme = None
+        self.__reset_url()
+
+    def __reset_url(self):
+        # quoted path parameters and scheme used in prepare,
+        # None before preparation
+        self.__path_params = None
+        self.__prepared_scheme = None
+        # url template and scheme patched by options
+        self.__url_tmpl = None
+        self.__url_scheme = None
 
     def reset(self):
         self.__url = self.__op.url
         self.__path = self.__op.path
         self.__header = CaseInsensitiveDict()
         self.__data = None
+        self.__reset_url()
 
     def consume(self, consume):
         self.__consume = consume
@@ -62,93 +75,55 @@ class Request(object):
 
         return content_type, six.moves.urllib.parse.urlencode(self.__p['formData'])
 
-    def _prepare_body(self):
+    def _prepare_body(self, encoding, stream=False):
         """ private function to prepare content for paramType=body
+
+        :param bool stream: True to return a StreamBody for iterators and file-likes,
+        instead of bytes
         """
-        content_type = self.__consume
-        if not content_type:
-            content_type = self.__op.consumes[0] if self.__op.consumes else 'application/json'
+        plan = self.__op.plan
+        content_type = self.__consume or self.__op._mime_codec.choose(self.__op.consumes) or plan.content_type
         if self.__op.consumes and content_type not in self.__op.consumes:
             raise errs.SchemaError('content type {0} does not present in {1}'.format(content_type, self.__op.consumes))
 
         # according to spec, payload should be one and only,
         # so we just return the first value in dict.
-        for parameter in self.__op.parameters:
-            parameter = final(parameter)
-            if getattr(parameter, 'in') == 'body':
-                schema = deref(parameter.schema)
-                _type = schema.type
-                _format = schema.format
-                name = schema.name
-                body = self.__p['body'][parameter.name]
-                return content_type, self.__op._mime_codec.marshal(content_type, body, _type=_type, _format=_format, name=name)
+        if plan.body:
+            body = self.__p['body'][plan.body.name]
+            if is_stream(body):
+                if hasattr(body, 'read'):
+                    # file-like is sent as it is
+                    body = StreamBody(body, length=_size_of(body), encoding=encoding)
+                else:
+                    body = StreamBody(self.__op._mime_codec.marshal_iter(
+                        content_type, body, _type=plan.body.type, _format=plan.body.format, name=plan.body.schema_name,
+                        schema=plan.body.schema
+                    ), encoding=encoding)
+                return content_type, body if stream else body.getvalue()
+
+            return content_type, self.__op._mime_codec.marshal(
+                content_type, body, _type=plan.body.type, _format=plan.body.format, name=plan.body.schema_name,
+                schema=plan.body.schema)
         return None, None
 
-    def _prepare_files(self, encoding):
+    def _prepare_files(self, encoding, stream=False):
         """ private function to prepare content for paramType=form with File
+
+        :param bool stream: True to return a MultipartEncoder instead of bytes
         """
         content_type = 'multipart/form-data'
         if self.__op.consumes and content_type not in self.__op.consumes:
             raise errs.SchemaError('content type {0} does not present in {1}'.format(content_type, self.__op.consumes))
 
-        boundary = uuid4().hex
-        content_type += '; boundary={0}'
-        content_type = content_type.format(boundary)
-
-        # init stream
-        body = io.BytesIO()
-        w = codecs.getwriter(encoding)
-
-        def append(name, obj):
-            body.write(six.b('--{0}\r\n'.format(boundary)))
-
-            # header
-            w(body).write('Content-Disposition: form-data; name="{0}"; filename="{1}"'.format(name, obj.filename))
-            body.write(six.b('\r\n'))
-            if 'Content-Type' in obj.header:
-                w(body).write('Content-Type: {0}'.format(obj.header['Content-Type']))
-                body.write(six.b('\r\n'))
-            if 'Content-Transfer-Encoding' in obj.header:
-                w(body).write('Content-Transfer-Encoding: {0}'.format(obj.header['Content-Transfer-Encoding']))
-                body.write(six.b('\r\n'))
-            body.write(six.b('\r\n'))
-
-            # body
-            if not obj.data:
-                with open(obj.filename, 'rb') as f:
-                    body.write(f.read())
-            else:
-                data = obj.data.read()
-                if isinstance(data, six.text_type):
-                    w(body).write(data)
-                else:
-                    body.write(data)
-
-            body.write(six.b('\r\n'))
-
-        for k, v in self.__p['formData']:
-            body.write(six.b('--{0}\r\n'.format(boundary)))
-
-            w(body).write('Content-Disposition: form-data; name="{0}"'.format(k))
-            body.write(six.b('\r\n'))
-            body.write(six.b('\r\n'))
-
-            w(body).write(v)
-
-            body.write(six.b('\r\n'))
-
-        # begin of file section
+        files = []
         for k, v in six.iteritems(self.__p['file']):
             if isinstance(v, list):
-                for vv in v:
-                    append(k, vv)
+                files.extend([(k, vv) for vv in v])
             else:
-                append(k, v)
-
-        # final boundary
-        body.write(six.b('--{0}--\r\n'.format(boundary)))
+                files.append((k, v))
 
-        return content_type, body.getvalue()
+        body = MultipartEncoder(self.__p['formData'], files, encoding=encoding)
+        return body.content_type, body if stream else body.getvalue()
 
     def _patch(self, opt={}):
         """ private function to patch this request. This function
@@ -159,24 +134,29 @@ class Request(object):
         opt_netloc = opt.pop(Request.opt_url_netloc, None)
         opt_scheme = opt.pop(Request.opt_url_scheme, None)
         if opt_netloc or opt_scheme:
-            scheme, netloc, path, params, query, fragment = six.moves.urllib.parse.urlparse(self.__url)
-            self.__url = six.moves.urllib.parse.urlunparse((
-                opt_scheme or scheme,
-                opt_netloc or netloc,
-                path,
-                params,
-                query,
-                fragment
-            ))
+            if opt_netloc:
+                self.__url_tmpl = (self.__url_tmpl or self.__op.plan.url).with_netloc(opt_netloc)
+            if opt_scheme:
+                self.__url_scheme = opt_scheme
+
+            if self.__path_params != None:
+                self.__render_url()
 
             logger.info('patching url: [{0}]'.format(self.__url))
 
-    def prepare(self, scheme='http', handle_files=True, encoding='utf-8'):
+    def __render_url(self):
+        tmpl = self.__url_tmpl or self.__op.plan.url
+        self.__url = ''.join([self.__url_scheme or self.__prepared_scheme, ':', tmpl.render(self.__path_params)])
+
+    def prepare(self, scheme='http', handle_files=True, encoding='utf-8', stream=False):
         """ make this request ready for Clients
 
         :param str scheme: scheme used in this request
         :param bool handle_files: False to skip multipart/form-data encoding
         :param str encoding: encoding for body content.
+        :param bool stream: True to provide body as a StreamBody, which yields chunks instead of
+        holding the whole body in memory. It applies to multipart/form-data (MultipartEncoder), and
+        body parameters provided as iterators or file-like objects.
         :rtype: Request
         """
 
@@ -191,16 +171,18 @@ class Request(object):
         elif not isinstance(scheme, six.string_types):
             raise ValueError('"scheme" should be a list or string')
 
-        # combine path parameters into path
-        # TODO: 'dot' is allowed in swagger, but it won't work in python-format
-        path_params = {}
-        for k, v in six.iteritems(self.__p['path']):
-            path_params[k] = six.moves.urllib.parse.quote_plus(v)
+        if self.__path_params == None:
+            path_params = {}
+            for k, v in six.iteritems(self.__p['path']):
+                path_params[k] = six.moves.urllib.parse.quote_plus(v)
 
-        self.__path = self.__path.format(**path_params)
-
-        # combine path parameters into url
-        self.__url = ''.join([scheme, ':', self.__url.format(**path_params)])
+            # combine path parameters into path and url
+            self.__path_params, self.__prepared_scheme = path_params, scheme
+            self.__path = self.__op.plan.path.render(path_params)
+            self.__render_url()
+        else:
+            # prepared again without reset
+            self.__url = ''.join([scheme, ':', self.__url])
 
         # header parameters
         self.__header.update(self.__p['header'])
@@ -209,7 +191,10 @@ class Request(object):
         content_type = None
         if self.__p['file']:
             if handle_files:
-                content_type, self.__data = self._prepare_files(encoding)
+                # multipart/form-data (and form-urlencoded below) is never compressed,
+                # compressed multipart bodies are not accepted by most servers, only
+                # Accept-Encoding for responses is applied.
+                content_type, self.__data = self._prepare_files(encoding, stream)
             else:
                 # client that can encode multipart/form-data, should
                 # access form-data via data property and file from file
@@ -221,23 +206,54 @@ class Request(object):
         elif self.__p['formData']:
             content_type, self.__data = self._prepare_forms()
         elif self.__p['body']:
-            content_type, self.__data = self._prepare_body()
+            content_type, self.__data = self._prepare_body(encoding, stream)
+            self.__compress(encoding)
         else:
             self.__data = None
 
+        if isinstance(self.__data, StreamBody) and self.__data.len != None:
+            self.__header.update({'Content-Length': str(self.__data.len)})
+
         if content_type:
             self.__header.update({'Content-Type': content_type})
 
-        accept = self.__produce
-        if not accept and self.__op.produces:
-            accept = self.__op.produces[0]
+        accept = self.__produce or self.__op._mime_codec.choose(self.__op.produces)
         if accept:
             if self.__op.produces and accept not in self.__op.produces:
                 raise errs.SchemaError('accept {0} does not present in {1}'.format(accept, self.__op.produces))
             self.__header.update({'Accept': accept})
 
+        compression = self.__op._mime_codec.compression
+        if compression and compression.accept and 'Accept-Encoding' not in self.__header:
+            self.__header.update({'Accept-Encoding': compression.accept_encoding})
+
         return self
 
+    def __compress(self, encoding):
+        """ compress the body according to the compression policy,
+        only applied to body parameters.
+        """
+        compression = self.__op._mime_codec.compression
+        data = self.__data
+        if not compression or not compression.encoding or data == None:
+            return
+
+        if isinstance(data, StreamBody):
+            if data.len != None and data.len < compression.threshold:
+                return
+            # length is unknown after compressed, and it could
+            # be rewound as long as the original one could.
+            data = StreamBody(_Reiterable(functools.partial(compression.compress_iter, data)))
+        else:
+            if isinstance(data, six.text_type):
+                data = data.encode(encoding)
+            if len(data) < compression.threshold:
+                return
+            data = compression.compress(data)
+
+        self.__data = data
+        self.__header.update({'Content-Encoding': compression.encoding})
+
     @property
     def scheme(self):
         """ preferred scheme used in this request
@@ -336,6 +352,288 @@ class Request(object):
         return self.__op.security
 
 
+def is_stream(v):
+    """ check if a value of body parameter should be streamed,
+    ex. generators, iterators and file-like objects.
+    """
+    if isinstance(v, (collections.Mapping, list, tuple, six.string_types, six.binary_type)):
+        return False
+
+    # an iterator returns itself in iter()
+    return hasattr(v, 'read') or (hasattr(v, '__iter__') and iter(v) is v)
+
+
+class StreamBody(object):
+    """ body of a request which is streamed. It's iterable (chunks of bytes)
+    and file-like (read), StreamBody.len is the length of the whole body
+    when known. Clients send it with Content-Length, or chunked when the
+    length is unknown.
+
+    It could be consumed again (ex. retries or redirects of clients) when
+    the source could be rewound: a seekable file-like object, or an iterable
+    which is not an iterator. Otherwise, ValueError is raised.
+    """
+
+    # size of chunk when reading file-like objects
+    chunk_size = 64 * 1024
+
+    def __init__(self, src=None, length=None, encoding='utf-8'):
+        """ constructor
+
+        :param src: file-like object, or iterable of str/bytes chunks
+        :param int length: length of the body, None when unknown
+        :param str encoding: encoding for text
+        """
+        self._src = src
+        self._len = length
+        self._encoding = encoding
+
+        # where a file-like source starts
+        self._mark = _tell(src) if hasattr(src, 'read') else None
+        self.__started = False
+
+        # for file-like interface
+        self.__it = None
+        self.__buf = six.b('')
+        self.__pos = 0
+
+    @property
+    def len(self):
+        """ length of body, None when unknown
+
+        :type: int
+        """
+        return self._len
+
+    def _encode(self, chunk):
+        return chunk.encode(self._encoding) if isinstance(chunk, six.text_type) else chunk
+
+    def _read_all(self, f):
+        """ iterate a file-like object in chunks
+        """
+        while True:
+            chunk = f.read(self.chunk_size)
+            if not chunk:
+                break
+            yield self._encode(chunk)
+
+    def _chunks(self):
+        """ iterate chunks of body from the start
+        """
+        if hasattr(self._src, 'read'):
+            for chunk in self._read_all(self._src):
+                yield chunk
+        else:
+            for chunk in self._src:
+                if chunk:
+                    yield self._encode(chunk)
+
+    def _restart(self):
+        """ move the source back to the start, raise ValueError when not possible
+        """
+        if hasattr(self._src, 'read'):
+            if self._mark == None:
+                raise ValueError('StreamBody is consumed, and its source is not seekable')
+            self._src.seek(self._mark)
+        elif iter(self._src) is self._src:
+            raise ValueError('StreamBody is consumed, and its source is an iterator')
+
+    def rewind(self):
+        """ rewind the body to the start, it's done implicitly when iterated again.
+
+        :raises ValueError: if the source could not be rewound
+        """
+        if self.__started:
+            self._restart()
+            self.__started = False
+
+        self.__it = None
+        self.__buf = six.b('')
+        self.__pos = 0
+
+    def __iter__(self):
+        if self.__started:
+            self.rewind()
+        self.__started = True
+        return self._chunks()
+
+    def tell(self):
+        """ file-like interface, bytes read so far
+        """
+        return self.__pos
+
+    def seek(self, offset, whence=os.SEEK_SET):
+        """ file-like interface, only rewinding to the start is supported
+        """
+        if offset != 0 or whence != os.SEEK_SET:
+            raise io.UnsupportedOperation('StreamBody could only be rewound to the start')
+        self.rewind()
+        return 0
+
+    def read(self, size=-1):
+        """ file-like interface
+
+        :param int size: max bytes to read, all when negative
+        :rtype: bytes
+        """
+        if self.__it == None:
+            self.__it = iter(self)
+
+        buf, n = [self.__buf], len(self.__buf)
+        while size < 0 or n < size:
+            chunk = next(self.__it, None)
+            if chunk == None:
+                break
+            buf.append(chunk)
+            n += len(chunk)
+
+        data = six.b('').join(buf)
+        if size < 0:
+            self.__buf = six.b('')
+        else:
+            self.__buf, data = data[size:], data[:size]
+
+        self.__pos += len(data)
+        return data
+
+    def getvalue(self):
+        """ the whole body
+
+        :rtype: bytes
+        """
+        return six.b('').join(self)
+
+
+class MultipartEncoder(StreamBody):
+    """ streaming encoder of multipart/form-data. Files are read
+    in chunks when iterating, instead of being copied into memory.
+    """
+
+    def __init__(self, form_data, files, encoding='utf-8', boundary=None):
+        """ constructor
+
+        :param list form_data: list of (name, value) for form fields
+        :param list files: list of (name, primitives.File)
+        :param str encoding: encoding for text
+        :param str boundary: boundary, a random one is generated when not provided
+        """
+        super(MultipartEncoder, self).__init__(encoding=encoding)
+        self.__boundary = boundary or uuid4().hex
+
+        # segments of body, either bytes or File
+        self.__segs = []
+        for k, v in form_data:
+            self.__append('--{0}\r\nContent-Disposition: form-data; name="{1}"\r\n\r\n'.format(self.__boundary, k))
+            self.__append(v)
+            self.__append('\r\n')
+
+        for k, v in files:
+            head = ['--{0}\r\nContent-Disposition: form-data; name="{1}"; filename="{2}"\r\n'.format(self.__boundary, k, v.filename)]
+            for h in ('Content-Type', 'Content-Transfer-Encoding'):
+                if h in v.header:
+                    head.append('{0}: {1}\r\n'.format(h, v.header[h]))
+            head.append('\r\n')
+            self.__append(''.join(head))
+            self.__segs.append((v, _tell(v.data) if v.data else None))
+            self.__append('\r\n')
+
+        self.__append('--{0}--\r\n'.format(self.__boundary))
+
+        self._len = 0
+        for seg in self.__segs:
+            if isinstance(seg, six.binary_type):
+                n = len(seg)
+            else:
+                f = seg[0]
+                n = _size_of(f.data) if f.data else os.path.getsize(f.filename)
+            if n == None:
+                self._len = None
+                break
+            self._len += n
+
+    def __append(self, s):
+        s = self._encode(s)
+
+        # merge adjacent bytes
+        if self.__segs and isinstance(self.__segs[-1], six.binary_type):
+            self.__segs[-1] += s
+        else:
+            self.__segs.append(s)
+
+    @property
+    def content_type(self):
+        """ value of Content-Type header, with boundary
+
+        :type: str
+        """
+        return 'multipart/form-data; boundary={0}'.format(self.__boundary)
+
+    def _chunks(self):
+        for seg in self.__segs:
+            if isinstance(seg, six.binary_type):
+                yield seg
+                continue
+
+            f = seg[0].data or open(seg[0].filename, 'rb')
+            try:
+                for chunk in self._read_all(f):
+                    yield chunk
+            finally:
+                if not seg[0].data:
+                    f.close()
+
+    def _restart(self):
+        # files opened by name are always read from the start
+        for seg in self.__segs:
+            if isinstance(seg, six.binary_type) or not seg[0].data:
+                continue
+            if seg[1] == None:
+                raise ValueError('multipart body is consumed, and {0} is not seekable'.format(seg[0].filename))
+            seg[0].data.seek(seg[1])
+
+
+class _Reiterable(object):
+    """ an iterable creating a new iterator by a function each time
+    """
+    def __init__(self, fn):
+        self.__fn = fn
+
+    def __iter__(self):
+        return self.__fn()
+
+
+def _tell(f):
+    """ current position of a file-like object, None when not seekable
+    """
+    try:
+        if hasattr(f, 'seekable') and not f.seekable():
+            return None
+        return f.tell()
+    except (AttributeError, EnvironmentError, io.UnsupportedOperation):
+        return None
+
+def _size_of(data):
+    """ size of the rest of a file-like object, None when unknown
+    """
+    if isinstance(data, io.TextIOBase):
+        # size in bytes is unknown before encoding
+        return None
+
+    try:
+        return os.fstat(data.fileno()).st_size - data.tell()
+    except (AttributeError, EnvironmentError, io.UnsupportedOperation):
+        pass
+
+    try:
+        cur = data.tell()
+        data.seek(0, os.SEEK_END)
+        end = data.tell()
+        data.seek(cur)
+        return end - cur
+    except (AttributeError, EnvironmentError, io.UnsupportedOperation):
+        return None
+
+
 class Response(object):
     """ Response layer
     """
@@ -354,11 +652,15 @@ class Response(object):
 
         # options
         self.__raw_body_only = False
+        self.__lazy_data = False
+        self.__columnar_data = False
+        self.__stream_body = False
+        self.__raw_stream = None
 
     def reset(self):
         self.__status = None
         self.__header = CaseInsensitiveDict()
-        self.__raw = self.__data = None
+        self.__raw = self.__data = self.__raw_stream = None
         self.__path = self.__op.path
         self.__url = self.__op.url
 
@@ -384,8 +686,7 @@ class Response(object):
         if status != None:
             self.__status = status
 
-        r = (final(self.__op.responses.get(str(self.__status), None)) or
-             final(self.__op.responses.get('default', None)))
+        r = self.__response_obj()
 
         if header != None:
             if isinstance(header, (collections.Mapping, collections.MutableMapping)):
@@ -396,28 +697,88 @@ class Response(object):
                     self._convert_header(r, k, v)
 
         if raw != None:
-            # update 'raw'
-            self.__raw = raw
-
             if self.__status == None:
                 raise Exception('Update status code before assigning raw data')
 
+            # update 'raw'
+            compression, content_encoding = self.__content_encoding()
+            self.__raw = compression.decompress(content_encoding, raw) if content_encoding else raw
+
             if r and r.schema and not self.__raw_body_only:
                 # update data from Opeartion if succeed else from responseMessage.responseModel
-                content_type = 'application/json'
-                for k, v in six.iteritems(self.header):
-                    if k.lower() == 'content-type':
-                        content_type = v[0].lower()
-                        break
+                content_type = self.__content_type()
                 schema = deref(r.schema)
                 _type = schema.type
                 _format = schema.format
                 name = schema.name
                 data = self.__op._mime_codec.unmarshal(content_type, self.raw, _type=_type, _format=_format, name=name)
-                self.__data = r.schema._prim_(data, self.__op._prim_factory, ctx=dict(read=True))
+                if self.__columnar_data:
+                    self.__data = self.__op._prim_factory.produce_columns(r.schema, data)
+                elif self.__lazy_data:
+                    self.__data = self.__op._prim_factory.produce_lazy(r.schema, data)
+                else:
+                    self.__data = r.schema._prim_(data, self.__op._prim_factory, ctx=dict(read=True))
 
         return self
 
+    def __response_obj(self):
+        """ Response object matched with status code
+        """
+        return (final(self.__op.responses.get(str(self.__status), None)) or
+                final(self.__op.responses.get('default', None)))
+
+    def __content_type(self):
+        for k, v in six.iteritems(self.header):
+            if k.lower() == 'content-type':
+                return v[0].lower()
+        return 'application/json'
+
+    def __content_encoding(self):
+        """ compression policy and Content-Encoding, when the body should be decompressed
+        """
+        compression = self.compression
+        if compression:
+            for k, v in six.iteritems(self.header):
+                if k.lower() == 'content-encoding':
+                    return compression, v[0]
+        return compression, None
+
+    def iter_data(self, pointer='', stream=None):
+        """ parse items of an array in body incrementally, and convert them
+        to primitives one by one, without holding the whole body in memory.
+
+        :param str pointer: JSON pointer to the array in body, ex. '/data', '' for the root
+        :param stream: bytes, file-like object, or iterable of bytes chunks. Response.raw_stream
+        (provided by clients when Response.stream_body is True) or Response.raw is used when not provided.
+        :return: generator of primitives
+        """
+        if self.__status == None:
+            raise Exception('Update status code before iterating data')
+
+        r = self.__response_obj()
+        if not (r and r.schema):
+            raise ValueError('no schema for status: {0}'.format(self.__status))
+
+        # find the Schema of items
+        schema = deref(r.schema)
+        for t in jp_split(pointer)[1:] if pointer else []:
+            schema = deref(schema.items if schema.type == 'array' else schema.properties[t])
+        if schema.type != 'array' or not schema.items:
+            raise ValueError('not an array: {0}'.format(pointer))
+
+        if stream == None:
+            if self.__raw_stream != None:
+                stream = self.__raw_stream
+                compression, content_encoding = self.__content_encoding()
+                if content_encoding:
+                    stream = compression.decompress_iter(content_encoding, iter_chunks(stream))
+            else:
+                stream = self.__raw
+
+        factory = self.__op._prim_factory.compile(schema.items)
+        for v in self.__op._mime_codec.unmarshal_iter(self.__content_type(), stream, pointer=pointer):
+            yield factory(v, True)
+
     def raw_body_only(self, only):
         """ an option to disable parsing bytes-stream to
         pyswagger primitives of body response. 'True' to enable this option
@@ -426,6 +787,62 @@ class Response(object):
 
     raw_body_only = property(None, raw_body_only)
 
+    def lazy_data(self, lazy):
+        """ an option to create Response.data lazily, sub-trees of
+        Model and Array are converted and validated when accessed, call
+        materialize() of Response.data to validate all of them.
+        'True' to enable this option
+        """
+        self.__lazy_data = lazy
+
+    lazy_data = property(None, lazy_data)
+
+    def columnar_data(self, columnar):
+        """ an option to create Response.data in columns, for an array of
+        objects with boolean, integer, number and string properties. Response.data
+        is an OrderedDict from property names to numpy arrays (when installed)
+        or array.array. 'True' to enable this option
+        """
+        self.__columnar_data = columnar
+
+    columnar_data = property(None, columnar_data)
+
+    @property
+    def stream_body(self):
+        """ an option for clients supporting streaming to skip reading body,
+        and provide it via Response.raw_stream for Response.iter_data.
+        'True' to enable this option
+
+        :type: bool
+        """
+        return self.__stream_body
+
+    @stream_body.setter
+    def stream_body(self, v):
+        self.__stream_body = v
+
+    @property
+    def raw_stream(self):
+        """ body not read yet, provided by clients when Response.stream_body is True
+
+        :type: file-like object, or iterable of bytes chunks
+        """
+        return self.__raw_stream
+
+    @raw_stream.setter
+    def raw_stream(self, v):
+        self.__raw_stream = v
+
+    @property
+    def compression(self):
+        """ compression policy of the App. When not None, clients should disable
+        decompression of their HTTP libraries, body is decompressed by Response
+        according to Content-Encoding applied before (or along with) it.
+
+        :type: pyswagger.primitives.Compression
+        """
+        return self.__op._mime_codec.compression
+
     @property
     def status(self):
         """ status code
@@ -10,20 +10,31 @@ from ._float import create_float, validate_float
 from ._array import Array
 from ._model import Model
 from ._uuid import UUID
+from ._lazy import LazyModel, LazyArray, produce_lazy
+from .columnar import produce_columns
 from .comm import create_obj, _2nd_pass_obj
 from .render import Renderer
-from .codec import MimeCodec
+from .codec import MimeCodec, MimePolicy
+from .compression import Compression
 import functools
+import six
 
 # TODO: enum is suitable for all types, not only string
 
+# handlers compiled into specialized constructors
+_model = (functools.partial(create_obj, constructor=Model), _2nd_pass_obj)
+_array = (functools.partial(create_obj, constructor=Array), _2nd_pass_obj)
+_scalar_creaters = (create_int, create_float, create_str, create_bool)
+_scalar_validators = (validate_int, validate_float, validate_str, validate_email_, None)
+
 
 class Primitive(object):
     """ primitive factory
     """
     def __init__(self):
-        from ._model import Model
-        from ._array import Array
+        # generation of _map, compiled constructors
+        # of older generations are discarded.
+        self.__gen = 0
 
         self._map = {
             # int
@@ -77,14 +88,14 @@ class Primitive(object):
 
             # array
             'array': {
-                '': (functools.partial(create_obj, constructor=Array), _2nd_pass_obj),
-                None: (functools.partial(create_obj, constructor=Array), _2nd_pass_obj),
+                '': _array,
+                None: _array,
             },
 
             # model / schema Object
             'object': {
-                '': (functools.partial(create_obj, constructor=Model), _2nd_pass_obj),
-                None: (functools.partial(create_obj, constructor=Model), _2nd_pass_obj),
+                '': _model,
+                None: _model,
             }
         }
 
@@ -147,6 +158,7 @@ class Primitive(object):
         if _type not in self._map:
             self._map[_type] = {}
         self._map[_type][_format] = (creater, _2nd_pass)
+        self.__gen += 1
 
     def produce(self, obj, val, ctx=None):
         """ factory function to create primitives
@@ -156,6 +168,184 @@ class Primitive(object):
 
         :return: the created primitive
         """
+        if ctx == None:
+            return self.compile(obj)(val, True)
+        if len(ctx) == 1 and 'read' in ctx:
+            return self.compile(obj)(val, ctx['read'])
+        return self._produce(obj, val, ctx)
+
+    def produce_lazy(self, obj, val):
+        """ create primitives in read context lazily, sub-trees of
+        Model and Array are converted and validated when accessed.
+
+        :param pyswagger.spec.v2_0.objects.Schema obj: spec to construct primitives
+        :param val: value to construct primitives
+        :return: the created primitive, call materialize() of LazyModel/LazyArray to validate all
+        """
+        return produce_lazy(self, obj, val)
+
+    def produce_columns(self, obj, val, use_numpy=True):
+        """ create columns from an array of objects in read context, one
+        typed column per property instead of one Model per row.
+
+        :param pyswagger.spec.v2_0.objects.Schema obj: spec of the array
+        :param list val: rows
+        :param bool use_numpy: numpy arrays when numpy is installed, else array.array
+        :return: OrderedDict from property names to columns
+        """
+        return produce_columns(self, obj, val, use_numpy=use_numpy)
+
+    def compile(self, obj):
+        """ compile a prepared Schema into a constructor of primitives,
+        which is cached on that Schema. The compiled constructor is
+        discarded when a new type/format handler is registered.
+
+        :param pyswagger.spec.v2_0.objects.Schema obj: spec to construct primitives
+        :return: a function(val, read) which is equivalent to produce(obj, val, dict(read=read))
+        """
+        c = getattr(obj, '_prim_compiled', None)
+        if c != None and c[0] is self and c[1] == self.__gen:
+            return c[2]
+
+        fn = self._compile(obj)
+        setattr(obj, '_prim_compiled', (self, self.__gen, fn))
+        return fn
+
+    def _compile(self, obj):
+        """ create the constructor for 'compile'
+        """
+        default, t = obj.default, deref(obj)
+        name = t.name if hasattr(t, 'name') else None
+
+        def _interpret(val, read):
+            return self._produce(obj, val, dict(read=read))
+
+        if getattr(t, 'allOf', None):
+            # members of allOf share one context, and
+            # the result depends on the order of them.
+            return _interpret
+
+        if t.type:
+            creater, _2nd = self.get(_type=t.type, _format=t.format)
+            if not creater:
+                return _interpret
+        elif len(t.properties) or t.additionalProperties:
+            creater, _2nd = _model
+        else:
+            return _interpret
+
+        if (creater, _2nd) == _model:
+            return self._compile_model(t, default, name)
+
+        if (creater, _2nd) == _array:
+            ctx = dict(factory=self)
+            def _produce_array(val, read):
+                val = default if val == None else val
+                if val == None:
+                    return None
+                ret = Array()
+                ret.apply_with(t, val, ctx)
+                return ret
+            return _produce_array
+
+        if creater in _scalar_creaters and _2nd in _scalar_validators:
+            def _produce_scalar(val, _):
+                val = default if val == None else val
+                if val == None:
+                    return None
+                ret = creater(t, val)
+                if _2nd:
+                    _2nd(t, ret, val, None)
+                return ret
+            return _produce_scalar
+
+        def _produce(val, read):
+            val = default if val == None else val
+            if val == None:
+                return None
+
+            ctx = dict(guard=CycleGuard(), addp_schema=None, addp=False, factory=self, read=read)
+            ctx['2nd_pass'] = None
+            if name != None:
+                ctx['name'] = name
+            ctx['guard'].update(t)
+
+            ret = creater(t, val, ctx)
+            if _2nd:
+                val = _2nd(t, ret, val, ctx)
+                ctx['2nd_pass'] = _2nd
+            if isinstance(ret, (Date, Datetime, Byte, File)):
+                return ret
+            if ret != None and hasattr(ret, 'cleanup'):
+                ret.cleanup(val, ctx)
+            return ret
+        return _produce
+
+    def _model_class(self, t):
+        """ class of Models created by compiled constructors
+
+        :param pyswagger.spec.v2_0.objects.Schema t: the dereferenced Schema
+        """
+        return Model
+
+    def _compile_model(self, t, default, name):
+        """ constructor of Model, which is equivalent to
+        Model.apply_with + Model.cleanup
+        """
+        model = self._model_class(t)
+        props = dict(t.properties)
+        read_only = set(k for k, p in six.iteritems(props) if p.readOnly == True)
+        defaults = [(k, p) for k, p in six.iteritems(props) if p.is_set('default')]
+        required = frozenset(t.required)
+        discriminator = t.discriminator
+        addp = t.additionalProperties
+
+        # compiled constructors of properties
+        fns = {}
+        def _prop(k, p, v):
+            fn = fns.get(k, None)
+            if fn == None:
+                fn = fns[k] = self.compile(p)
+            return fn(v, True)
+
+        def _produce_model(val, read):
+            val = default if val == None else val
+            if val == None:
+                return None
+
+            ret, extra = model(), {}
+            for k, v in six.iteritems(val):
+                if k in props:
+                    if k in read_only and read == False:
+                        raise Exception('read-only property is set in write context.')
+                    ret[k] = _prop(k, props[k], v)
+                else:
+                    extra[k] = v
+
+            for k, p in defaults:
+                if k not in ret:
+                    ret[k] = _prop(k, p, p.default)
+
+            not_found = required - set(six.iterkeys(ret))
+            if len(not_found):
+                raise ValueError('Model missing required key(s): {0}'.format(', '.join(not_found)))
+
+            if discriminator:
+                ret[discriminator] = name
+
+            if extra:
+                if addp == True:
+                    ret.update(extra)
+                elif addp not in (None, False):
+                    for k, v in six.iteritems(extra):
+                        ret[k] = self.produce(addp, v)
+
+            return ret
+        return _produce_model
+
+    def _produce(self, obj, val, ctx=None):
+        """ interpret Schema to create primitives, refer to Primitive.produce
+        """
         val = obj.default if val == None else val
         if val == None:
             return None
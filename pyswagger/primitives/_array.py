@@ -89,4 +89,11 @@ class Array(list):
         else:
             return [str(self)]
 
+    def materialize(self):
+        """ already converted and validated, the same interface as LazyArray
+
+        :return: self
+        """
+        return self
+
 
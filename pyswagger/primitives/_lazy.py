@@ -0,0 +1,247 @@
+from __future__ import absolute_import
+from ..errs import ValidationError
+from ..utils import deref
+from ._array import Array
+from ._model import Model
+import six
+
+
+def produce_lazy(factory, obj, val):
+    """ create a primitive, sub-trees of Model and Array are
+    converted and validated when accessed.
+
+    Schemas which can't be handled lazily (allOf, discriminator, custom
+    handlers for object/array...) are produced as usual, materialize()
+    of Model/Array is a no-op.
+
+    :param Primitive factory: primitive factory
+    :param pyswagger.spec.v2_0.objects.Schema obj: spec to construct primitives
+    :param val: value to construct primitives
+    """
+    from . import _model, _array
+
+    t = deref(obj)
+    if val != None and not getattr(t, 'allOf', None) and not t.discriminator:
+        if t.type:
+            h = factory.get(_type=t.type, _format=t.format)
+        elif len(t.properties) or t.additionalProperties:
+            h = _model
+        else:
+            h = None
+
+        if h == _model and isinstance(val, dict):
+            return LazyModel(factory, t, val)
+        if h == _array and isinstance(val, list) and t.items:
+            return LazyArray(factory, t, val)
+
+    return factory.produce(obj, val, dict(read=True))
+
+
+def _materialized(cls, name):
+    """ a method of cls which materializes the lazy one before calling
+    """
+    f = getattr(cls, name)
+    def _fn(self, *args, **kwargs):
+        return f(self.materialize(), *args, **kwargs)
+    _fn.__name__ = name
+    return _fn
+
+
+class LazyModel(Model):
+    """ a Model whose properties are converted and validated when
+    accessed. Before conversion, raw values are kept, therefore functions
+    accessing the underlying dict directly (ex. json.dumps) might see them,
+    call LazyModel.materialize before that.
+    """
+
+    def __init__(self, factory, obj, val):
+        """ constructor
+
+        :param Primitive factory: primitive factory
+        :param pyswagger.spec.v2_0.objects.Schema obj: the dereferenced Schema
+        :param dict val: raw value
+        """
+        super(LazyModel, self).__init__()
+
+        # key -> Schema to convert the raw value
+        pending = {}
+        for k, v in six.iteritems(val):
+            if k in obj.properties:
+                pending[k] = obj.properties[k]
+                dict.__setitem__(self, k, v)
+
+        for k, p in six.iteritems(obj.properties):
+            if k not in val and p.is_set('default'):
+                pending[k] = p
+                dict.__setitem__(self, k, p.default)
+
+        # checked before additionalProperties are filled, the same as Model
+        not_found = set(obj.required) - set(six.iterkeys(self))
+        if len(not_found):
+            raise ValueError('Model missing required key(s): {0}'.format(', '.join(not_found)))
+
+        addp = obj.additionalProperties
+        if addp not in (None, False):
+            for k, v in six.iteritems(val):
+                if k in obj.properties:
+                    continue
+                if addp != True:
+                    pending[k] = addp
+                dict.__setitem__(self, k, v)
+
+        object.__setattr__(self, '_LazyModel__factory', factory)
+        object.__setattr__(self, '_LazyModel__pending', pending)
+
+    def __convert(self, k):
+        p = self.__pending.get(k, None)
+        if p != None:
+            # kept pending when failed
+            dict.__setitem__(self, k, produce_lazy(self.__factory, p, dict.__getitem__(self, k)))
+            del self.__pending[k]
+
+    def materialize(self):
+        """ convert and validate everything
+
+        :return: self
+        """
+        for k in list(self.__pending):
+            self.__convert(k)
+        for v in dict.values(self):
+            if isinstance(v, (LazyModel, LazyArray)):
+                v.materialize()
+        return self
+
+    def __getitem__(self, k):
+        self.__convert(k)
+        return dict.__getitem__(self, k)
+
+    def __getattr__(self, k):
+        if k.startswith('_LazyModel__'):
+            raise AttributeError(k)
+        return self[k]
+
+    def __setitem__(self, k, v):
+        self.__pending.pop(k, None)
+        dict.__setitem__(self, k, v)
+
+    __setattr__ = __setitem__
+
+    def __delitem__(self, k):
+        self.__pending.pop(k, None)
+        dict.__delitem__(self, k)
+
+    def get(self, k, default=None):
+        return self[k] if k in self else default
+
+    def items(self):
+        return [(k, self[k]) for k in self]
+
+    def values(self):
+        return [self[k] for k in self]
+
+    def iteritems(self):
+        for k in self:
+            yield k, self[k]
+
+    def itervalues(self):
+        for k in self:
+            yield self[k]
+
+    def __eq__(self, other):
+        return super(LazyModel, self.materialize()).__eq__(other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return dict.__repr__(self.materialize())
+
+    def __reduce__(self):
+        return (Model, (), None, None, six.iteritems(self.materialize()))
+
+
+class LazyArray(Array):
+    """ an Array whose items are converted and validated when
+    accessed. Before conversion, raw values are kept, therefore functions
+    accessing the underlying list directly might see them, call
+    LazyArray.materialize before that.
+    """
+
+    def __init__(self, factory, obj, val):
+        """ constructor
+
+        :param Primitive factory: primitive factory
+        :param pyswagger.spec.v2_0.objects.Schema obj: the dereferenced Schema
+        :param list val: raw value
+        """
+        super(LazyArray, self).__init__()
+
+        if obj.uniqueItems:
+            seen = []
+            for e in val:
+                if e in seen:
+                    continue
+                seen.append(e)
+            val = seen
+
+        if obj.minItems and len(val) < obj.minItems:
+            raise ValidationError('Array should be more than {0}, not {1}'.format(obj.minItems, len(val)))
+        if obj.maxItems and len(val) > obj.maxItems:
+            raise ValidationError('Array should be less than {0}, not {1}'.format(obj.maxItems, len(val)))
+
+        list.extend(self, val)
+        self.__factory = factory
+        self.__items = obj.items
+        # indexes not converted yet
+        self.__pending = set(six.moves.xrange(len(val)))
+
+    def __convert(self, i):
+        if i < 0:
+            i += list.__len__(self)
+        if i in self.__pending:
+            # kept pending when failed
+            list.__setitem__(self, i, produce_lazy(self.__factory, self.__items, list.__getitem__(self, i)))
+            self.__pending.discard(i)
+
+    def materialize(self):
+        """ convert and validate everything
+
+        :return: self
+        """
+        for i in sorted(self.__pending):
+            self.__convert(i)
+        for v in list.__iter__(self):
+            if isinstance(v, (LazyModel, LazyArray)):
+                v.materialize()
+        return self
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return list.__getitem__(self.materialize(), i)
+        if -list.__len__(self) <= i < list.__len__(self):
+            self.__convert(i)
+        return list.__getitem__(self, i)
+
+    def __iter__(self):
+        for i in six.moves.xrange(list.__len__(self)):
+            yield self[i]
+
+    def __eq__(self, other):
+        return list.__eq__(self.materialize(), other)
+
+    def __ne__(self, other):
+        return not self.__eq__(other)
+
+    def __repr__(self):
+        return list.__repr__(self.materialize())
+
+    def __reduce__(self):
+        return (Array, (), None, list.__iter__(self.materialize()))
+
+
+# methods depending on all items, or changing keys/indexes
+for _n in ('pop', 'popitem', 'setdefault', 'update', 'copy', 'clear'):
+    setattr(LazyModel, _n, _materialized(Model, _n))
+for _n in ('__contains__', '__reversed__', '__setitem__', '__delitem__', '__iadd__', '__add__', '__mul__',
+           'append', 'extend', 'insert', 'pop', 'remove', 'sort', 'reverse', 'index', 'count', '__str__', 'to_url'):
+    setattr(LazyArray, _n, _materialized(Array, _n))
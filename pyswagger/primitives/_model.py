@@ -97,3 +97,10 @@ class Model(dict):
 
     def __ne__(self, other):
         return not self.__eq__(other)
+
+    def materialize(self):
+        """ already converted and validated, the same interface as LazyModel
+
+        :return: self
+        """
+        return self
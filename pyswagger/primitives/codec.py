@@ -1,15 +1,56 @@
+from ..utils import jp_split, deref
 import json
+import codecs
+import collections
+import functools
+import logging
+import re
 import six
 from .comm import PrimJSONEncoder
+from ._time import Time
+from ._byte import Byte
+from .encoder import SchemaEncoder
+
+
+logger = logging.getLogger(__name__)
 
 
 class MimeCodec:
-    def __init__(self):
+    def __init__(self, json_backend='json', policy=None, compression=None):
+        """ constructor
+
+        :param str json_backend: JSON library used by JSON codecs, refer to get_json_backend for details
+        :param MimePolicy policy: policy to choose among mime types of an Operation, None to pick the first one
+        :param pyswagger.primitives.compression.Compression compression: compression of HTTP bodies, None to disable
+        """
         self._codecs = {}
+        self.policy = policy
+        self.compression = compression
+        self.__json_backend = get_json_backend(json_backend)
         self.register('text/plain', PlainCodec())
-        jsonCodec = JsonCodec()
+        jsonCodec = JsonCodec(self.__json_backend)
         self.register('application/json', jsonCodec)
         self.register('text/json', jsonCodec)
+        ndjsonCodec = NdjsonCodec(self.__json_backend)
+        self.register('application/x-ndjson', ndjsonCodec)
+        self.register('application/x-jsonlines', ndjsonCodec)
+
+        # binary codecs, available when their libraries are installed
+        for mimes, cls in ((('application/msgpack', 'application/x-msgpack'), MsgpackCodec), (('application/cbor',), CborCodec)):
+            try:
+                c = cls()
+            except ImportError:
+                continue
+            for mime in mimes:
+                self.register(mime, c)
+
+    @property
+    def json_backend(self):
+        """ JSON library used by JSON codecs
+
+        :type: JsonBackend
+        """
+        return self.__json_backend
 
     def register(self, mime, codec):
         self._codecs[mime.lower()] = codec
@@ -22,32 +63,490 @@ class MimeCodec:
         mime = mime.strip().lower()
         return self._codecs.get(mime, None)
 
+    def choose(self, mimes):
+        """ choose a mime type from 'consumes' or 'produces' of an Operation
+
+        :param list mimes: list of mime types
+        :return: the chosen one, None when mimes is empty
+        :rtype: str
+        """
+        if not mimes:
+            return None
+        return self.policy.choose(mimes, self) if self.policy else mimes[0]
+
     def marshal(self, mime, value, **kwargs):
         codec = self.codec(mime)
         if not codec:
             raise Exception('Could not find codec for %s, value: %s, args: %s' % (mime, value, kwargs))
         return codec.marshal(value, **kwargs)
 
+    def marshal_iter(self, mime, values, **kwargs):
+        """ marshal an iterable lazily, chunk by chunk. Codecs without
+        marshal_iter would marshal all values as a list at once.
+
+        :param str mime: the mime type
+        :param values: iterable of values
+        :return: generator of str or bytes
+        """
+        codec = self.codec(mime)
+        if not codec:
+            raise Exception('Could not find codec for %s, args: %s' % (mime, kwargs))
+        if hasattr(codec, 'marshal_iter'):
+            return codec.marshal_iter(values, **kwargs)
+        return iter([codec.marshal(list(values), **kwargs)])
+
     def unmarshal(self, mime, data, **kwargs):
         codec = self.codec(mime)
         if not codec:
             raise Exception('Could not find codec for %s, data: %s, args: %s' % (mime, data, kwargs))
         return codec.unmarshal(data, **kwargs)
 
+    def unmarshal_iter(self, mime, data, pointer='', **kwargs):
+        """ unmarshal items of an array incrementally. Codecs without
+        unmarshal_iter would unmarshal the whole data at once.
+
+        :param str mime: the mime type
+        :param data: bytes, file-like object or iterable of bytes chunks
+        :param str pointer: JSON pointer to the array, '' for the root
+        :return: generator of items
+        """
+        codec = self.codec(mime)
+        if not codec:
+            raise Exception('Could not find codec for %s, args: %s' % (mime, kwargs))
+        if hasattr(codec, 'unmarshal_iter'):
+            return codec.unmarshal_iter(data, pointer=pointer, **kwargs)
+
+        if not isinstance(data, (six.binary_type, six.text_type)):
+            data = six.b('').join(iter_chunks(data))
+        v = codec.unmarshal(data, **kwargs)
+        for t in _jp_tokens(pointer):
+            v = v[int(t)] if isinstance(v, list) else v[t]
+        if not isinstance(v, list):
+            raise ValueError('not an array: {0}'.format(pointer))
+        return iter(v)
+
 
 class PlainCodec:
     def marshal(self, value, **kwargs):
         return value
 
+    def marshal_iter(self, values, **kwargs):
+        # chunks are sent as they are
+        return iter(values)
+
     def unmarshal(self, data, **kwargs):
         return data
 
 
+class JsonBackend(object):
+    """ dumps/loads of a JSON library
+    """
+
+    def __init__(self, name, dumps, loads, binary=False):
+        """ constructor
+
+        :param str name: name of the library
+        :param dumps: function(value), return str or bytes
+        :param loads: function(data)
+        :param bool binary: True if loads accepts bytes
+        """
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+        self.binary = binary
+
+    def __repr__(self):
+        return '<JsonBackend {0}>'.format(self.name)
+
+
+def _default(obj):
+    """ serialize primitives not supported by JSON libraries
+    """
+    if hasattr(obj, 'to_json'):
+        return obj.to_json()
+    raise TypeError('{0!r} is not JSON serializable'.format(obj))
+
+def _native_default(obj):
+    """ the same as _default, and let the library serialize date/datetime
+    """
+    if isinstance(obj, Time):
+        return obj.v
+    return _default(obj)
+
+def _loads_str(loads, data):
+    if isinstance(data, six.binary_type):
+        data = data.decode('utf-8')
+    return loads(data)
+
+def _stdlib():
+    return JsonBackend('json', functools.partial(json.dumps, cls=PrimJSONEncoder), functools.partial(_loads_str, json.loads))
+
+def _orjson():
+    import orjson
+    return JsonBackend('orjson', functools.partial(orjson.dumps, default=_native_default), orjson.loads, binary=True)
+
+def _ujson():
+    import ujson
+    return JsonBackend('ujson', functools.partial(ujson.dumps, default=_default, escape_forward_slashes=False), ujson.loads, binary=True)
+
+def _simplejson():
+    import simplejson
+    return JsonBackend('simplejson', functools.partial(simplejson.dumps, default=_default), functools.partial(_loads_str, simplejson.loads))
+
+# available backends, the faster the former
+_json_backends = collections.OrderedDict([
+    ('orjson', _orjson),
+    ('ujson', _ujson),
+    ('simplejson', _simplejson),
+    ('json', _stdlib),
+])
+
+def get_json_backend(name='json'):
+    """ get a JSON library, fallback to the standard library when not installed.
+
+    :param str name: 'json', 'orjson', 'ujson', 'simplejson', or 'auto' for the fastest one installed
+    :rtype: JsonBackend
+    """
+    if name == 'auto':
+        names = list(_json_backends)
+    elif name in _json_backends:
+        names = [name, 'json']
+    else:
+        raise ValueError('unknown JSON backend: {0}'.format(name))
+
+    for n in names:
+        try:
+            return _json_backends[n]()
+        except ImportError:
+            if name != 'auto':
+                logger.warning('JSON backend {0} is not installed, fallback to json'.format(n))
+
+def _to(s, like):
+    """ str s in the same type of like
+    """
+    return s.encode('utf-8') if isinstance(like, six.binary_type) else s
+
+
 class JsonCodec:
+    def __init__(self, backend=None):
+        self.__backend = backend or _stdlib()
+        # libraries other than the standard one are faster without Schema
+        self.__encoder = SchemaEncoder() if self.__backend.name == 'json' else None
+
+    def marshal(self, value, schema=None, **kwargs):
+        if schema != None and self.__encoder:
+            return self.__encoder.encode(schema, value)
+        return self.__backend.dumps(value)
+
+    def marshal_iter(self, values, schema=None, **kwargs):
+        # items are marshalled by Schema of items
+        schema = deref(schema) if schema != None else None
+        items = schema.items if schema != None and schema.type == 'array' else None
+
+        # values are streamed as a JSON array
+        first = True
+        for v in values:
+            data = self.marshal(v, schema=items, **kwargs)
+            yield _to('[' if first else ',', data)
+            yield data
+            first = False
+        yield '[]' if first else _to(']', data)
+
+    def unmarshal(self, data, **kwargs):
+        return self.__backend.loads(data)
+
+    def unmarshal_iter(self, data, pointer='', **kwargs):
+        # items of an array are parsed one by one
+        return JsonStream(data).iter_array(_jp_tokens(pointer))
+
+
+class NdjsonCodec:
+    """ newline delimited JSON, each line is an item of an array
+    """
+
+    def __init__(self, backend=None):
+        self.__backend = backend or _stdlib()
+
+    def marshal(self, value, **kwargs):
+        lines = list(self.marshal_iter(value, **kwargs))
+        return lines[0][:0].join(lines) if lines else ''
+
+    def marshal_iter(self, values, **kwargs):
+        for v in values:
+            data = self.__backend.dumps(v)
+            yield data + _to('\n', data)
+
+    def unmarshal(self, data, **kwargs):
+        return list(self.unmarshal_iter(data))
+
+    def unmarshal_iter(self, data, pointer='', **kwargs):
+        if pointer:
+            raise ValueError('JSON pointer is not supported by NDJSON: {0}'.format(pointer))
+
+        # lines are kept in bytes when the library accepts them
+        loads = self.__backend.loads
+        for line in iter_lines(data, None if self.__backend.binary else 'utf-8'):
+            if line.strip():
+                yield loads(line)
+
+
+def _pack_default(obj):
+    """ serialize primitives for binary formats, Byte is kept in bytes
+    """
+    if isinstance(obj, Byte):
+        return obj.v
+    return _default(obj)
+
+
+class MsgpackCodec:
+    """ MessagePack, requires msgpack
+    """
+
+    def __init__(self):
+        import msgpack
+        self.__msgpack = msgpack
+
+    def marshal(self, value, **kwargs):
+        return self.__msgpack.packb(value, default=_pack_default, use_bin_type=True)
+
+    def unmarshal(self, data, **kwargs):
+        return self.__msgpack.unpackb(data, raw=False)
+
+    def unmarshal_iter(self, data, pointer='', **kwargs):
+        if pointer:
+            raise ValueError('JSON pointer is not supported by MessagePack: {0}'.format(pointer))
+
+        unpacker = self.__msgpack.Unpacker(raw=False)
+        chunks = iter_chunks(data)
+
+        def _read(fn):
+            # feed chunks until a complete object is unpacked
+            while True:
+                try:
+                    return fn()
+                except self.__msgpack.OutOfData:
+                    c = next(chunks, None)
+                    if c == None:
+                        raise ValueError('unexpected end of MessagePack data')
+                    unpacker.feed(c)
+
+        for _ in six.moves.xrange(_read(unpacker.read_array_header)):
+            yield _read(unpacker.unpack)
+
+
+class CborCodec:
+    """ CBOR, requires cbor2
+    """
+
+    def __init__(self):
+        import cbor2
+        self.__cbor2 = cbor2
+
+    @staticmethod
+    def _default(encoder, value):
+        encoder.encode(_pack_default(value))
+
     def marshal(self, value, **kwargs):
-        return json.dumps(value, cls=PrimJSONEncoder)
+        return self.__cbor2.dumps(value, default=self._default)
 
     def unmarshal(self, data, **kwargs):
-        if isinstance(data, six.binary_type):
-            data = data.decode('utf-8')
-        return json.loads(data)
+        return self.__cbor2.loads(data)
+
+
+class MimePolicy(object):
+    """ choose the cheapest mime type which has a codec, by weights.
+    The lower the weight, the more preferred. Mime types not in weights
+    are weighted 100, ties are broken by the order in spec.
+    """
+
+    default_weights = {
+        'application/msgpack': 10,
+        'application/x-msgpack': 10,
+        'application/cbor': 20,
+        'application/json': 50,
+        'text/json': 50,
+        'application/x-ndjson': 50,
+        'application/x-jsonlines': 50,
+    }
+
+    def __init__(self, weights=None):
+        """ constructor
+
+        :param dict weights: mime type -> weight, merged into default_weights
+        """
+        self.weights = dict(self.default_weights)
+        self.weights.update(dict((k.lower(), v) for k, v in six.iteritems(weights or {})))
+
+    def weight(self, mime):
+        return self.weights.get(mime.split(';', 1)[0].strip().lower(), 100)
+
+    def choose(self, mimes, mime_codec):
+        """ choose a mime type
+
+        :param list mimes: candidates, in the order of spec
+        :param MimeCodec mime_codec: codecs available
+        :return: the chosen one, the first one when none has a codec
+        :rtype: str
+        """
+        candidates = [(self.weight(m), i) for i, m in enumerate(mimes) if mime_codec.codec(m)]
+        return mimes[min(candidates)[1]] if candidates else mimes[0]
+
+
+def _jp_tokens(pointer):
+    return jp_split(pointer)[1:] if pointer else []
+
+def iter_chunks(data, chunk_size=64 * 1024):
+    """ iterate bytes, file-like object, or iterable of chunks, in chunks
+    """
+    if isinstance(data, (six.binary_type, six.text_type)):
+        yield data
+    elif hasattr(data, 'read'):
+        while True:
+            chunk = data.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        for chunk in data:
+            yield chunk
+
+def iter_lines(data, encoding='utf-8'):
+    """ iterate lines of bytes, file-like object, or iterable of chunks,
+    without the trailing newline.
+
+    :param str encoding: encoding of bytes, None to iterate lines in bytes
+    """
+    if encoding == None:
+        rest, nl = six.b(''), six.b('\n')
+        decode = lambda chunk, final=False: chunk.encode('utf-8') if isinstance(chunk, six.text_type) else chunk
+    else:
+        rest, nl = six.u(''), six.u('\n')
+        decoder = codecs.getincrementaldecoder(encoding)()
+        decode = lambda chunk, final=False: chunk if isinstance(chunk, six.text_type) else decoder.decode(chunk, final)
+
+    for chunk in iter_chunks(data):
+        lines = (rest + decode(chunk)).split(nl)
+        rest = lines.pop()
+        for line in lines:
+            yield line
+
+    rest += decode(six.b(''), True)
+    if rest:
+        yield rest
+
+
+_ws = re.compile(r'[ \t\n\r]*')
+# characters allowed right after a complete value
+_delimiters = frozenset(' \t\n\r,]}:')
+
+class JsonStream(object):
+    """ incremental reader of a JSON document, only values
+    being read are kept in memory.
+    """
+
+    def __init__(self, data, encoding='utf-8'):
+        """ constructor
+
+        :param data: bytes, file-like object or iterable of bytes chunks
+        :param str encoding: encoding of bytes
+        """
+        self.__chunks = iter_chunks(data)
+        self.__decoder = codecs.getincrementaldecoder(encoding)()
+        self.__json = json.JSONDecoder()
+        self.__buf = six.u('')
+        self.__pos = 0
+        self.__eof = False
+
+    def __more(self):
+        """ read next chunk into buffer, False when no more data
+        """
+        if self.__eof:
+            return False
+
+        chunk = next(self.__chunks, None)
+        if chunk == None:
+            self.__eof = True
+            s = self.__decoder.decode(six.b(''), final=True)
+        else:
+            s = chunk if isinstance(chunk, six.text_type) else self.__decoder.decode(chunk)
+
+        # drop consumed part
+        self.__buf = self.__buf[self.__pos:] + s
+        self.__pos = 0
+        return True
+
+    def peek(self):
+        """ next non-whitespace character, None when no more data
+        """
+        while True:
+            self.__pos = _ws.match(self.__buf, self.__pos).end()
+            if self.__pos < len(self.__buf):
+                return self.__buf[self.__pos]
+            if not self.__more():
+                return None
+
+    def expect(self, c):
+        if self.peek() != c:
+            raise ValueError('expect {0!r}, not {1!r}'.format(c, self.peek()))
+        self.__pos += 1
+
+    def value(self):
+        """ read next JSON value
+        """
+        self.peek()
+        while True:
+            try:
+                v, end = self.__json.raw_decode(self.__buf, self.__pos)
+                # a number might be incomplete unless followed by a delimiter,
+                # ex. '-25.' is decoded as -25
+                if self.__eof or (end < len(self.__buf) and self.__buf[end] in _delimiters):
+                    self.__pos = end
+                    return v
+            except ValueError:
+                if self.__eof:
+                    raise
+
+            # at least double the pending data before trying again
+            n = (len(self.__buf) - self.__pos) * 2
+            while len(self.__buf) - self.__pos < n and self.__more():
+                pass
+
+    def iter_array(self, tokens=None):
+        """ iterate items of an array
+
+        :param list tokens: tokens of JSON pointer to the array
+        :return: generator of items
+        """
+        for t in tokens or []:
+            c = self.peek()
+            if c == '{':
+                self.__pos += 1
+                while True:
+                    if self.peek() != '"':
+                        raise ValueError('key not found: {0}'.format(t))
+                    k = self.value()
+                    self.expect(':')
+                    if k == t:
+                        break
+                    self.value()
+                    if self.peek() == ',':
+                        self.__pos += 1
+            elif c == '[':
+                self.__pos += 1
+                for _ in six.moves.xrange(int(t)):
+                    self.value()
+                    self.expect(',')
+            else:
+                raise ValueError('unable to find {0} in {1!r}'.format(t, c))
+
+        self.expect('[')
+        if self.peek() == ']':
+            self.__pos += 1
+            return
+
+        while True:
+            yield self.value()
+            c = self.peek()
+            self.expect(',' if c == ',' else ']')
+            if c != ',':
+                return
@@ -0,0 +1,306 @@
+from __future__ import absolute_import
+from ..errs import ValidationError
+from ..utils import deref, digest
+from ._int import create_int, validate_int
+from ._str import create_str, validate_str
+from ._bool import create_bool
+from ._float import create_float, validate_float
+from ._array import Array
+from ._model import Model
+from . import Primitive, _model, _array
+import six
+import os
+import io
+import logging
+import re
+
+
+logger = logging.getLogger(__name__)
+
+# marker before the source of each generated function
+_marker = '# schema: '
+# names of generated functions
+_names = re.compile(r'\b_s_[0-9a-f]+\b')
+
+
+class CodegenPrimitive(Primitive):
+    """ primitive factory which generates python source of a
+    validate+construct function for each Schema, and exec it once.
+
+    Numeric minimum/maximum, maxLength/minLength, enum, required and readOnly
+    checks are inlined as constants. Schemas not supported by the generator
+    (allOf, custom type/format handlers, ...) are compiled by Primitive.
+
+    Different from Primitive.produce, properties of a Model are created in the
+    order of Schema.properties, when more than one property is invalid, the
+    raised error might be different.
+    """
+
+    def __init__(self, path=None):
+        """ constructor
+
+        :param str path: path of a module generated by CodegenPrimitive.save, it's loaded when existed.
+        """
+        super(CodegenPrimitive, self).__init__()
+        self.__reset()
+
+        if path and os.path.exists(path):
+            self.load(path)
+
+    def __reset(self):
+        # namespace of generated functions
+        self.__ns = dict(
+            _Model=Model,
+            _Array=Array,
+            _ValidationError=ValidationError,
+            _string_types=six.string_types,
+            _iteritems=six.iteritems,
+        )
+        # name -> source, in the order of generation
+        self.__src = {}
+        self.__order = []
+        # names of functions ready in namespace
+        self.__ready = set()
+
+    def register(self, _type, _format, creater, _2nd_pass=None):
+        # generated functions assume handlers when generating
+        self.__reset()
+        super(CodegenPrimitive, self).register(_type, _format, creater, _2nd_pass)
+
+    def load(self, path):
+        """ load functions generated by CodegenPrimitive.save
+
+        :param str path: path of the module
+        """
+        with io.open(path, 'r', encoding='utf-8') as f:
+            src = f.read()
+
+        six.exec_(compile(src, path, 'exec'), self.__ns)
+        for chunk in src.split(_marker)[1:]:
+            name, body = chunk.split('\n', 1)
+            if name not in self.__src:
+                self.__src[name] = body
+                self.__order.append(name)
+
+        logger.info('load {0} generated functions from [{1}]'.format(len(self.__order), path))
+
+    def save(self, path):
+        """ write generated functions into a module
+
+        :param str path: path of the module
+        """
+        with io.open(path, 'w', encoding='utf-8') as f:
+            f.write(six.u('# generated by pyswagger.primitives.codegen, do not edit\n\n'))
+            for name in self.__order:
+                f.write(six.u('{0}{1}\n{2}').format(_marker, name, self.__src[name]))
+
+    def source(self, obj):
+        """ generated source of a Schema
+
+        :param pyswagger.spec.v2_0.objects.Schema obj: spec to construct primitives
+        :return: the source, or None when not generated
+        :rtype: str
+        """
+        return self.__src.get(self.__ensure(obj), None)
+
+    def _compile(self, obj):
+        return self.__ns[self.__ensure(obj)]
+
+    def __ensure(self, obj):
+        """ make sure the function of a Schema is ready in namespace
+
+        :return: name of the function
+        """
+        t = deref(obj)
+        name = '_s_' + digest(dict(
+            cls=t.__class__.__name__,
+            schema=t.dump(),
+            name=getattr(t, 'name', None),
+            default=obj.default,
+        )).hexdigest()
+
+        if name in self.__ready:
+            return name
+
+        src = self.__src.get(name, None)
+        if src != None and all(n in self.__ns for n in _names.findall(src)):
+            # loaded by CodegenPrimitive.load, along with functions it calls
+            self.__ready.add(name)
+            return name
+
+        # mark before generating, for recursive Schema
+        self.__ready.add(name)
+        try:
+            src = self.__generate(name, obj, t)
+            if src == None:
+                self.__ns[name] = super(CodegenPrimitive, self)._compile(obj)
+            elif name not in self.__src:
+                six.exec_(compile(src, name, 'exec'), self.__ns)
+                self.__src[name] = src
+                self.__order.append(name)
+        except:
+            self.__ready.discard(name)
+            raise
+
+        return name
+
+    def __generate(self, name, obj, t):
+        """ generate source of a function, None when not supported
+        """
+        if getattr(t, 'allOf', None):
+            return None
+
+        if t.type:
+            h = self.get(_type=t.type, _format=t.format)
+        elif len(t.properties) or t.additionalProperties:
+            h = _model
+        else:
+            return None
+
+        if h == (create_int, validate_int):
+            body = _gen_number(t, 'int', False)
+        elif h == (create_float, validate_float):
+            body = _gen_number(t, 'float', True)
+        elif h == (create_str, validate_str):
+            body = _gen_str(t)
+        elif h == (create_bool, None):
+            body = ['return bool(val)']
+        elif h == _model:
+            body = self.__gen_model(t)
+        elif h == _array and not hasattr(t, 'collectionFormat'):
+            body = self.__gen_array(t)
+        else:
+            return None
+
+        lines = ['def {0}(val, read):'.format(name)]
+        if obj.default == None:
+            lines += ['    if val == None:', '        return None']
+        else:
+            lines += ['    if val == None:', '        val = {0!r}'.format(obj.default)]
+        lines += ['    ' + l for l in body]
+        return '\n'.join(lines) + '\n\n'
+
+    def __gen_model(self, t):
+        props = t.properties
+        ret = ['ret = _Model()']
+        for k in sorted(props):
+            p = props[k]
+            f = self.__ensure(p)
+            ret += ['if {0!r} in val:'.format(k)]
+            if p.readOnly == True:
+                ret += [
+                    '    if read == False:',
+                    '        raise Exception(\'read-only property is set in write context.\')',
+                ]
+            ret += ['    ret[{0!r}] = {1}(val[{0!r}], True)'.format(k, f)]
+            if p.is_set('default'):
+                ret += ['else:', '    ret[{0!r}] = {1}({2!r}, True)'.format(k, f, p.default)]
+
+        if t.required:
+            ret += [
+                'if {0}:'.format(' or '.join('{0!r} not in ret'.format(k) for k in sorted(set(t.required)))),
+                '    raise ValueError(\'Model missing required key(s): {{0}}\'.format(\', \'.join({0} - set(ret))))'.format(_set_of(t.required)),
+            ]
+
+        if t.discriminator:
+            ret += ['ret[{0!r}] = {1!r}'.format(t.discriminator, t.name)]
+
+        addp = t.additionalProperties
+        if addp == True:
+            extra = 'v'
+        elif addp not in (None, False):
+            extra = '{0}(v, True)'.format(self.__ensure(addp))
+        else:
+            extra = None
+
+        if extra:
+            ret += ['for k, v in _iteritems(val):']
+            if len(props):
+                ret += ['    if k not in {0}:'.format(_set_of(props)), '        ret[k] = {0}'.format(extra)]
+            else:
+                ret += ['    ret[k] = {0}'.format(extra)]
+
+        return ret + ['return ret']
+
+    def __gen_array(self, t):
+        ret = [
+            'if isinstance(val, _string_types):',
+            '    val = val.split(\',\')',
+        ]
+        if t.uniqueItems:
+            ret += [
+                'if isinstance(val, (list, dict)):',
+                '    seen = []',
+                '    for e in val:',
+                '        if e in seen:',
+                '            continue',
+                '        seen.append(e)',
+                '    val = seen',
+                'else:',
+                '    val = set(val)',
+            ]
+
+        ret += ['ret = _Array()']
+        if t.items:
+            ret += ['if len(val):', '    ret.extend([{0}(v, True) for v in val])'.format(self.__ensure(t.items))]
+        if t.minItems:
+            ret += [
+                'if len(ret) < {0!r}:'.format(t.minItems),
+                '    raise _ValidationError(\'Array should be more than {{0}}, not {{1}}\'.format({0!r}, len(ret)))'.format(t.minItems),
+            ]
+        if t.maxItems:
+            ret += [
+                'if len(ret) > {0!r}:'.format(t.maxItems),
+                '    raise _ValidationError(\'Array should be less than {{0}}, not {{1}}\'.format({0!r}, len(ret)))'.format(t.maxItems),
+            ]
+        return ret + ['return ret']
+
+
+def _set_of(keys):
+    """ set literal of keys, in a stable order
+    """
+    return '{' + ', '.join(repr(k) for k in sorted(set(keys))) + '}'
+
+def _gen_number(t, conv, is_float):
+    """ inlined create_int/validate_int, create_float/validate_float
+    """
+    ret = ['r = {0}(val)'.format(conv)]
+    for n, is_max in ((t.minimum, False), (t.maximum, True)):
+        if n == None:
+            continue
+
+        exclusive = t.exclusiveMaximum if is_max else t.exclusiveMinimum
+        op = ('>=' if exclusive else '>') if is_max else ('<=' if exclusive else '<')
+        ret += [
+            'if r {0} {1!r}:'.format(op, n),
+            '    raise _ValidationError(\'condition failed: {0}, v:{{0}} compared to o:{{1}}\'.format(r, {1!r}))'.format(
+                'maximum' if is_max else 'minimum', str(n)),
+        ]
+
+    if is_float and t.multipleOf:
+        ret += [
+            'if r % {0!r} != 0:'.format(t.multipleOf),
+            '    raise _ValidationError(\'{{0}} should be multiple of {{1}}\'.format(val, {0!r}))'.format(str(t.multipleOf)),
+        ]
+    return ret + ['return r']
+
+def _gen_str(t):
+    """ inlined create_str/validate_str
+    """
+    ret = ['r = val if isinstance(val, _string_types) else str(val)']
+    if t.enum:
+        ret += [
+            'if r not in {0!r}:'.format(t.enum),
+            '    raise _ValidationError(\'{{0}} is not a valid enum for {{1}}\'.format(r, {0!r}))'.format(str(t.enum)),
+        ]
+    if t.maxLength:
+        ret += [
+            'if len(r) > {0!r}:'.format(t.maxLength),
+            '    raise _ValidationError(\'[{{0}}] is longer than {{1}} characters\'.format(r, {0!r}))'.format(str(t.maxLength)),
+        ]
+    if t.minLength:
+        ret += [
+            'if len(r) < {0!r}:'.format(t.minLength),
+            '    raise _ValidationError(\'[{{0}}] is shorter than {{1}} characters\'.format(r, {0!r}))'.format(str(t.minLength)),
+        ]
+    return ret + ['return r']
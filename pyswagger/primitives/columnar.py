@@ -0,0 +1,203 @@
+from __future__ import absolute_import
+from ..errs import ValidationError
+from ..utils import deref
+from .comm import min_max
+from ._int import create_int, validate_int
+from ._float import create_float, validate_float
+from ._str import create_str, validate_str
+from ._bool import create_bool
+import array
+import collections
+import six
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+# typecode of int64, 'q' is not available in python 2
+try:
+    array.array('q')
+    _INT64 = 'q'
+except ValueError:
+    _INT64 = 'l'
+
+# typecode of string columns, kept as python objects
+_OBJECT = None
+
+
+def _typecode(factory, p):
+    """ typecode of the column for a property, raise ValueError when not supported
+    """
+    h = factory.get(_type=p.type, _format=p.format)
+    if h == (create_int, validate_int):
+        return 'i' if p.format == 'int32' else _INT64
+    if h == (create_float, validate_float):
+        return 'f' if p.format == 'float' else 'd'
+    if h == (create_bool, None):
+        return 'b'
+    if h == (create_str, validate_str):
+        return _OBJECT
+
+    raise ValueError('type: {0}, format: {1} is not supported in columnar data'.format(p.type, p.format))
+
+def _items(factory, t):
+    """ Schema of rows and typecodes of columns
+    """
+    if t.type != 'array' or not t.items:
+        raise ValueError('columnar data requires an array, not {0}'.format(t.type))
+    if t.uniqueItems:
+        raise ValueError('uniqueItems is not supported in columnar data')
+
+    from . import _model
+
+    item = deref(t.items)
+    if (item.type not in (None, 'object') or not len(item.properties) or
+            getattr(item, 'allOf', None) or item.discriminator or
+            factory.get(_type='object', _format=item.format) is not _model):
+        raise ValueError('columnar data requires items of objects with properties')
+
+    return item, [(k, deref(item.properties[k]), _typecode(factory, deref(item.properties[k])))
+                  for k in sorted(item.properties)]
+
+def _typed(code, values):
+    """ create a typed column, values are converted the same way as
+    Primitive.produce when not in that type. A plain list is returned
+    when values don't fit in the typecode.
+    """
+    if code == _OBJECT:
+        if any(not issubclass(t, six.string_types) for t in set(map(type, values))):
+            values = [v if isinstance(v, six.string_types) else str(v) for v in values]
+        return values
+
+    if code == 'b':
+        if set(map(type, values)) - set([bool]):
+            values = [bool(v) for v in values]
+        return array.array(code, values)
+
+    conv = int if code in ('i', _INT64) else float
+    try:
+        try:
+            return array.array(code, values)
+        except TypeError:
+            values = [conv(v) for v in values]
+            return array.array(code, values)
+    except OverflowError:
+        # Primitive.produce accepts integers of any size
+        return [conv(v) for v in values]
+
+def _validate(p, code, col, np):
+    """ validate a column as a whole, the same checks as Primitive.produce
+    applied to extreme values.
+    """
+    if not len(col):
+        return
+
+    np = np if isinstance(col, array.array) else None
+    if code == _OBJECT:
+        longest, shortest = max(col, key=len), min(col, key=len)
+        validate_str(p, longest, longest, None)
+        validate_str(p, shortest, shortest, None)
+    elif code != 'b':
+        # NaN passes min/max checks in Primitive.produce, and should not
+        # hide other values from extremes
+        if np:
+            v = np.frombuffer(col, dtype=code)
+            w = v[v == v] if code in ('f', 'd') else v
+        else:
+            w = [e for e in col if e == e] if code in ('f', 'd') else col
+        if len(w):
+            min_max(p, min(w) if not np else w.min(), False)
+            min_max(p, max(w) if not np else w.max(), True)
+
+        if code in ('f', 'd') and p.multipleOf:
+            if np:
+                bad = v[v % p.multipleOf != 0]
+                bad = bad[0] if len(bad) else None
+            else:
+                bad = next((e for e in col if e % p.multipleOf != 0), None)
+            if bad != None:
+                raise ValidationError('{0} should be multiple of {1}'.format(bad, p.multipleOf))
+
+    if p.enum:
+        if np and code not in (_OBJECT, 'b'):
+            bad = v[~np.isin(v, p.enum)]
+            bad = list(bad[:1])
+        else:
+            bad = list(set(col).difference(p.enum))
+        if bad:
+            raise ValidationError('{0} is not a valid enum for {1}'.format(bad[0], str(p.enum)))
+
+def _column(p, code, col, np):
+    """ create a column of a property from values of all rows,
+    None is regarded as missing, the same as Model
+    """
+    n = col.count(None)
+    if n and p.is_set('default'):
+        col, n = [p.default if v is None else v for v in col], 0
+
+    values = _typed(code, [v for v in col if v is not None] if n else col)
+    _validate(p, code, values, np)
+
+    if n:
+        # fill missing values with NaN, or None in a plain list
+        it = iter(map(bool, values) if code == 'b' else values)
+        is_float = code in ('f', 'd') and isinstance(values, array.array)
+        fill = float('nan') if is_float else None
+        values = [fill if v is None else next(it) for v in col]
+        values = array.array(code, values) if is_float else values
+
+    if not np:
+        return values
+    if not isinstance(values, array.array):
+        ret = np.empty(len(values), dtype=object)
+        ret[:] = values
+        return ret
+    ret = np.frombuffer(values, dtype=code)
+    return ret.view(np.bool_) if code == 'b' else ret
+
+def produce_columns(factory, obj, val, use_numpy=True):
+    """ create columns from an array of objects, one typed column per
+    property instead of one Model per row. Checks of properties are
+    applied to columns as a whole.
+
+    Only arrays of objects with boolean, integer, number and string
+    (without format) properties are supported, ValueError is raised
+    for others. Like Model, a value of None is regarded as missing,
+    missing values of number columns are NaN, and of others are None.
+    Integer columns are int32 or int64 by format, columns that can't
+    be typed (missing values of integer/boolean, integers out of range)
+    are plain lists (numpy arrays of objects).
+
+    :param Primitive factory: primitive factory
+    :param pyswagger.spec.v2_0.objects.Schema obj: Schema of the array
+    :param list val: rows
+    :param bool use_numpy: create numpy arrays when numpy is installed, else array.array (list for strings)
+    :return: OrderedDict from property names to columns
+    """
+    item, props = _items(factory, deref(obj))
+
+    val = obj.default if val == None else val
+    if val == None:
+        return None
+    if not isinstance(val, list):
+        raise ValueError('columnar data requires a list of rows, not {0}'.format(type(val)))
+    if any(not issubclass(t, dict) for t in set(map(type, val))):
+        raise ValueError('columnar data requires rows of objects')
+
+    t = deref(obj)
+    if t.minItems and len(val) < t.minItems:
+        raise ValidationError('Array should be more than {0}, not {1}'.format(t.minItems, len(val)))
+    if t.maxItems and len(val) > t.maxItems:
+        raise ValidationError('Array should be less than {0}, not {1}'.format(t.maxItems, len(val)))
+
+    np = numpy if use_numpy else None
+    required = frozenset(item.required)
+
+    ret = collections.OrderedDict()
+    for k, p, code in props:
+        if k in required and not all(k in r for r in val):
+            raise ValueError('Model missing required key(s): {0}'.format(k))
+        ret[k] = _column(p, code, [r.get(k, None) for r in val], np)
+    return ret
@@ -0,0 +1,177 @@
+from __future__ import absolute_import
+import collections
+import functools
+import logging
+import zlib
+import six
+
+
+logger = logging.getLogger(__name__)
+
+
+def _zlib(wbits):
+    def _compressor(level):
+        o = zlib.compressobj(-1 if level == None else level, zlib.DEFLATED, wbits)
+        return o.compress, o.flush
+
+    def _decompressor():
+        o = zlib.decompressobj(wbits)
+        return o.decompress, o.flush
+
+    return _compressor, _decompressor
+
+def _brotli():
+    import brotli
+
+    def _compressor(level):
+        o = brotli.Compressor() if level == None else brotli.Compressor(quality=level)
+        return o.process, o.finish
+
+    def _decompressor():
+        o = brotli.Decompressor()
+        # 'process' in brotli, 'decompress' in brotlicffi
+        return getattr(o, 'process', None) or o.decompress, six.binary_type
+
+    return _compressor, _decompressor
+
+def _zstd():
+    import zstandard
+
+    def _compressor(level):
+        o = zstandard.ZstdCompressor(level=3 if level == None else level).compressobj()
+        return o.compress, o.flush
+
+    def _decompressor():
+        o = zstandard.ZstdDecompressor().decompressobj()
+        return o.decompress, six.binary_type
+
+    return _compressor, _decompressor
+
+# available encodings, the more preferred the former
+_encodings = collections.OrderedDict([
+    ('zstd', _zstd),
+    ('br', _brotli),
+    ('gzip', functools.partial(_zlib, 16 + zlib.MAX_WBITS)),
+    ('deflate', functools.partial(_zlib, zlib.MAX_WBITS)),
+])
+
+
+class Compression(object):
+    """ compression policy of HTTP bodies: request bodies are compressed
+    with 'encoding' when larger than 'threshold', 'accept' is advertised
+    via Accept-Encoding, and responses are decompressed according to
+    Content-Encoding before unmarshalled.
+
+    gzip and deflate are always available, zstd and br require zstandard
+    and brotli (or brotlicffi).
+    """
+
+    def __init__(self, encoding='gzip', accept=None, threshold=1024, level=None):
+        """ constructor
+
+        :param str encoding: encoding of request bodies, None to disable compressing request bodies
+        :param list accept: encodings advertised via Accept-Encoding, all installed ones when None
+        :param int threshold: request bodies smaller than this (in bytes) are not compressed
+        :param int level: compression level, the default of each library when None
+        """
+        # name -> (compressor factory, decompressor factory)
+        self.__coders = {}
+
+        if encoding and not self.__load(encoding, explicit=True):
+            logger.warning('encoding {0} is not installed, fallback to gzip'.format(encoding))
+            encoding = 'gzip'
+
+        self.encoding = encoding
+        self.accept = [n for n in (accept or _encodings) if self.__load(n, explicit=accept != None)]
+        self.threshold = threshold
+        self.level = level
+
+    def __load(self, name, explicit=False):
+        """ load an encoding, return False when not installed
+        """
+        if name in self.__coders:
+            return True
+        if name not in _encodings:
+            raise ValueError('unknown encoding: {0}'.format(name))
+
+        try:
+            self.__coders[name] = _encodings[name]()
+        except ImportError:
+            if explicit:
+                logger.warning('encoding {0} is not installed'.format(name))
+            return False
+        return True
+
+    @property
+    def accept_encoding(self):
+        """ value of Accept-Encoding header
+
+        :type: str
+        """
+        return ', '.join(self.accept)
+
+    def compress(self, data):
+        """ compress a request body with Compression.encoding
+
+        :param bytes data: the body
+        :rtype: bytes
+        """
+        process, finish = self.__coders[self.encoding][0](self.level)
+        return process(data) + finish()
+
+    def compress_iter(self, chunks):
+        """ compress a streamed request body with Compression.encoding
+
+        :param chunks: iterable of bytes
+        :return: generator of bytes
+        """
+        process, finish = self.__coders[self.encoding][0](self.level)
+        for chunk in chunks:
+            data = process(chunk)
+            if data:
+                yield data
+        yield finish()
+
+    def __decoders(self, content_encoding):
+        """ names of encodings to decode, in the order of decoding
+        """
+        names = [n.strip().lower() for n in content_encoding.split(',')]
+        names = [n for n in reversed(names) if n and n != 'identity']
+        for n in names:
+            if n not in _encodings or not self.__load(n):
+                raise ValueError('unsupported Content-Encoding: {0}'.format(content_encoding))
+        return names
+
+    def decompress(self, content_encoding, data):
+        """ decompress a response body
+
+        :param str content_encoding: value of Content-Encoding header
+        :param bytes data: the body
+        :rtype: bytes
+        """
+        for n in self.__decoders(content_encoding):
+            process, finish = self.__coders[n][1]()
+            data = process(data) + finish()
+        return data
+
+    def decompress_iter(self, content_encoding, chunks):
+        """ decompress a response body chunk by chunk
+
+        :param str content_encoding: value of Content-Encoding header
+        :param chunks: iterable of bytes
+        :return: generator of bytes
+        """
+        for n in self.__decoders(content_encoding):
+            chunks = _decompress_iter(self.__coders[n][1](), chunks)
+        return chunks
+
+
+def _decompress_iter(coder, chunks):
+    process, finish = coder
+    for chunk in chunks:
+        data = process(chunk)
+        if data:
+            yield data
+    data = finish()
+    if data:
+        yield data
@@ -0,0 +1,143 @@
+from __future__ import absolute_import
+from ..utils import deref
+from .comm import PrimJSONEncoder
+from ._byte import Byte
+from ._time import Time
+import json
+import six
+
+
+class SchemaEncoder(object):
+    """ JSON encoder directed by Schema. Each Schema is compiled once (cached
+    on that Schema) into a function converting primitives of known formats
+    (Byte, Date, Datetime) in place of json.JSONEncoder.default, sub-trees
+    without them (decided by Schema) are left untouched. Values produced
+    by Primitive.produce are trees, the circular check of json is skipped.
+
+    The output is the same JSON as json.dumps(value, cls=PrimJSONEncoder),
+    which is still the fallback for values not matching their Schema.
+    """
+
+    def __init__(self):
+        self.__json = PrimJSONEncoder(check_circular=False)
+
+    def encode(self, obj, value):
+        """ encode a value in JSON
+
+        :param pyswagger.spec.v2_0.objects.Schema obj: Schema of the value
+        :param value: the value, usually created by Primitive.produce
+        :rtype: str
+        """
+        fn = self.compile(obj)
+        if fn != None:
+            value = fn(value)
+        # str, the same as json.dumps
+        return self.__json.encode(value)
+
+    def compile(self, obj):
+        """ compile a Schema into a converting function
+
+        :param pyswagger.spec.v2_0.objects.Schema obj: the Schema
+        :return: function(value) returning a value serializable by json, None when no conversion is needed
+        """
+        t = deref(obj)
+        c = getattr(t, '_json_encoder', None)
+        if c != None and c[0] is self:
+            return c[1]
+
+        # placeholder for recursive Schema, assumed to be converted
+        cell = []
+        setattr(t, '_json_encoder', (self, lambda v: cell[0](v)))
+        try:
+            fn = self.__build(t)
+        except:
+            setattr(t, '_json_encoder', None)
+            raise
+
+        cell.append(fn or _same)
+        setattr(t, '_json_encoder', (self, fn))
+        return fn
+
+    def __build(self, t):
+        if getattr(t, 'allOf', None) or t.discriminator:
+            # left to PrimJSONEncoder.default
+            return None
+
+        if t.type == 'object' or (not t.type and (len(t.properties) or t.additionalProperties)):
+            return self.__build_object(t)
+        if t.type == 'array' and t.items:
+            return _build_array(self.compile(t.items))
+        if t.type == 'string':
+            return _build_string(t)
+        return None
+
+    def __build_object(self, t):
+        # properties to be converted
+        props = []
+        for k in sorted(t.properties):
+            fn = self.compile(t.properties[k])
+            if fn != None:
+                props.append((k, fn))
+
+        addp = t.additionalProperties
+        extra = self.compile(addp) if addp not in (None, True, False) else None
+        names = frozenset(t.properties)
+
+        if not props and extra == None:
+            return None
+
+        def _object(v):
+            if not isinstance(v, dict):
+                return v
+
+            # copied when any property is converted
+            ret = v
+            for k, fn in props:
+                e = v.get(k, None)
+                if e is None:
+                    continue
+                r = fn(e)
+                if r is not e:
+                    if ret is v:
+                        ret = dict(v)
+                    ret[k] = r
+
+            if extra != None:
+                for k, e in six.iteritems(v):
+                    if k in names or e is None:
+                        continue
+                    r = extra(e)
+                    if r is not e:
+                        if ret is v:
+                            ret = dict(v)
+                        ret[k] = r
+
+            return ret
+        return _object
+
+
+def _same(v):
+    return v
+
+def _build_array(fn):
+    if fn == None:
+        return None
+
+    def _array(v):
+        if not isinstance(v, (list, tuple)):
+            return v
+        return [fn(e) for e in v]
+    return _array
+
+def _build_string(t):
+    if t.format == 'byte':
+        kind = Byte
+    elif t.format in ('date', 'date-time'):
+        kind = Time
+    else:
+        # str, or primitives converted by PrimJSONEncoder.default
+        return None
+
+    def _string(v):
+        return v.to_json() if isinstance(v, kind) else v
+    return _string
@@ -0,0 +1,197 @@
+from __future__ import absolute_import
+from ._model import Model
+from . import Primitive
+import collections
+import keyword
+import re
+import six
+
+
+_identifier = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+# get a slot without falling back to __getattr__
+_get = object.__getattribute__
+
+
+class SlotsModel(collections.MutableMapping):
+    """ base of Model classes generated by SlotsPrimitive. Properties in
+    Schema are kept in __slots__, others (additionalProperties) overflow into
+    a side dict. An unset slot means the key is absent.
+
+    It's a mapping instead of a dict, therefore functions requiring a dict
+    (ex. json.dumps without PrimJSONEncoder) should call to_json first.
+    """
+
+    __slots__ = ('_extra',)
+
+    # property names, in order
+    _fields = ()
+    # property name -> slot name
+    _slot_of = {}
+
+    def __init__(self):
+        object.__setattr__(self, '_extra', None)
+
+    def __getitem__(self, k):
+        s = self._slot_of.get(k, None)
+        if s != None:
+            try:
+                return _get(self, s)
+            except AttributeError:
+                raise KeyError(k)
+        if self._extra != None and k in self._extra:
+            return self._extra[k]
+        raise KeyError(k)
+
+    def __setitem__(self, k, v):
+        s = self._slot_of.get(k, None)
+        if s != None:
+            object.__setattr__(self, s, v)
+        else:
+            if self._extra == None:
+                object.__setattr__(self, '_extra', {})
+            self._extra[k] = v
+
+    def __delitem__(self, k):
+        s = self._slot_of.get(k, None)
+        if s != None:
+            try:
+                object.__delattr__(self, s)
+            except AttributeError:
+                raise KeyError(k)
+        elif self._extra != None and k in self._extra:
+            del self._extra[k]
+        else:
+            raise KeyError(k)
+
+    def __contains__(self, k):
+        try:
+            self[k]
+        except KeyError:
+            return False
+        return True
+
+    def __is_set(self, k):
+        try:
+            _get(self, self._slot_of[k])
+        except AttributeError:
+            return False
+        return True
+
+    def __iter__(self):
+        for k in self._fields:
+            if self.__is_set(k):
+                yield k
+        if self._extra:
+            for k in self._extra:
+                yield k
+
+    def __len__(self):
+        n = len(self._extra) if self._extra else 0
+        for k in self._fields:
+            if self.__is_set(k):
+                n += 1
+        return n
+
+    def __getattr__(self, k):
+        # only called when not found in slots and class
+        if k in self._slot_of:
+            # unset, the same as Model
+            raise KeyError(k)
+        if self._extra != None and k in self._extra:
+            return self._extra[k]
+        raise AttributeError(k)
+
+    def __setattr__(self, k, v):
+        self[k] = v
+
+    def __eq__(self, other):
+        # the same as Model.__eq__, a key with None is regarded as missing
+        if other == None:
+            return False
+        if not isinstance(other, collections.Mapping):
+            return NotImplemented
+
+        for k, v in six.iteritems(self):
+            if v != other.get(k, None):
+                return False
+
+        residual = set(other.keys()) - set(self.keys())
+        for k in residual:
+            if other[k] != None:
+                return False
+
+        return True
+
+    def __ne__(self, other):
+        ret = self.__eq__(other)
+        return ret if ret is NotImplemented else not ret
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(dict(six.iteritems(self)))
+
+    def to_json(self):
+        """ a plain dict, for JSON encoders
+        """
+        return dict(six.iteritems(self))
+
+    def materialize(self):
+        """ already converted and validated, the same interface as LazyModel
+
+        :return: self
+        """
+        return self
+
+    def __reduce__(self):
+        # generated classes are not importable
+        return (Model, (), None, None, six.iteritems(self))
+
+
+def _slot_names(props):
+    """ slot names for property names, names not suitable for attributes
+    are replaced.
+    """
+    ret = []
+    for i, k in enumerate(props):
+        if (_identifier.match(k) and not keyword.iskeyword(k) and
+                not k.startswith('__') and not hasattr(SlotsModel, k)):
+            ret.append(k)
+        else:
+            ret.append('_slot_{0}'.format(i))
+
+    # in case of conflicts with replaced names
+    if len(set(ret)) != len(ret):
+        ret = ['_slot_{0}'.format(i) for i in six.moves.xrange(len(ret))]
+    return ret
+
+
+def model_class(t):
+    """ generate a SlotsModel class for a Schema
+
+    :param pyswagger.spec.v2_0.objects.Schema t: the dereferenced Schema
+    :rtype: type
+    """
+    props = sorted(t.properties)
+    slots = _slot_names(props)
+    name = getattr(t, 'name', None)
+    name = str(name) if name and _identifier.match(name) else 'SlotsModel'
+    return type(name, (SlotsModel,), dict(
+        __slots__=tuple(slots),
+        _fields=tuple(props),
+        _slot_of=dict(zip(props, slots)),
+    ))
+
+
+class SlotsPrimitive(Primitive):
+    """ primitive factory which creates a compact Model class per Schema,
+    properties are kept in __slots__ instead of a dict. It saves memory
+    when lots of Models are kept, ex. cached responses.
+
+    Instances support attribute access, mapping access, comparison with
+    dict and Model, and PrimJSONEncoder. Models created by interpreting
+    Schema (allOf, custom handlers) are still Model.
+    """
+
+    def _model_class(self, t):
+        return model_class(t)
@@ -1,9 +1,11 @@
 from __future__ import absolute_import
 from .utils import jr_split, jp_split
 from .getter import UrlGetter, LocalGetter
+from multiprocessing.pool import ThreadPool
 import six
 import os
 import inspect
+import timeit
 import logging
 
 
@@ -32,6 +34,14 @@ class Resolver(object):
         # default getter for all resolving
         self.__default_getter = default_getter
 
+    @property
+    def cache(self):
+        """ loaded documents, a map from url to json/yaml object
+
+        :type: dict
+        """
+        return self.__cache
+
     def resolve(self, jref, getter=None):
         """
         """
@@ -77,5 +87,44 @@ class Resolver(object):
 
         return obj
 
+    def prefetch(self, jrefs, getter=None, concurrency=1):
+        """ load documents referred by a list of JSON references into cache
+        with a bounded pool of threads, following calls to 'resolve'
+        would be served from cache in the order they are made.
+
+        Documents are loaded one by one when a getter instance (not a class)
+        is used, because it's consumed in sequence.
+
+        :param list jrefs: list of JSON references
+        :param getter: customized Getter
+        :param int concurrency: maximum number of documents loaded at the same time
+        :return: a map from url of loaded documents to seconds spent
+        :rtype: dict
+        """
+        urls = []
+        for jref in jrefs:
+            url, _ = jr_split(jref)
+            if url not in urls and url not in self.__cache:
+                urls.append(url)
+
+        g = getter or self.__default_getter
+        if g and not inspect.isclass(g):
+            concurrency = 1
+
+        def _fetch(url):
+            start = timeit.default_timer()
+            self.resolve(url, getter)
+            return url, timeit.default_timer() - start
+
+        if concurrency <= 1 or len(urls) <= 1:
+            return dict(map(_fetch, urls))
+
+        pool = ThreadPool(min(concurrency, len(urls)))
+        try:
+            return dict(pool.map(_fetch, urls))
+        finally:
+            pool.close()
+            pool.join()
+
 
 SwaggerResolver = Resolver
@@ -1,6 +1,11 @@
 from __future__ import absolute_import
 from .spec.base import BaseObj
 import six
+import timeit
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 def default_tree_traversal(root, leaves):
@@ -19,6 +24,73 @@ def default_tree_traversal(root, leaves):
         yield path, obj
 
 
+class _Path(object):
+    """ json-pointer of an object in traversal, it's
+    composed only when required.
+    """
+    __slots__ = ('parent', 'name', 'composed')
+
+    def __init__(self, parent, name):
+        self.parent = parent
+        self.name = name
+        self.composed = None if parent else name
+
+    def __str__(self):
+        if self.composed == None:
+            self.composed = str(self.parent) + '/' + self.name
+        return self.composed
+
+
+def _tree_traversal(root, leaves):
+    """ the same as default_tree_traversal, but yield _Path
+    instead of str as json-pointer.
+    """
+    objs = [(_Path(None, '#'), root)]
+    while len(objs) > 0:
+        path, obj = objs.pop()
+
+        if obj.__class__ not in leaves:
+            objs.extend(map(lambda i: (_Path(path, i[0]), i[1]), six.iteritems(obj._children_)))
+
+        yield path, obj
+
+
+def ref_tree_traversal(root, leaves, deref=None, path='#', skip=None, visited=None):
+    """ tree traversal which also goes through referenced objects,
+    each object is visited once.
+
+    :param func deref: accept an object, return (path, object) it refers to, or None.
+    :param str path: json-pointer of root
+    :param set skip: ids of objects not to be visited
+    :param set visited: ids of visited objects would be added to this set
+    """
+    skip = set() if skip == None else skip
+    seen = set()
+    objs = [(path, root)]
+    while len(objs) > 0:
+        path, obj = objs.pop()
+        if id(obj) in seen or id(obj) in skip:
+            continue
+        seen.add(id(obj))
+
+        if obj.__class__ not in leaves:
+            objs.extend(map(lambda i: (path + '/' + i[0],) + (i[1],), six.iteritems(obj._children_)))
+
+            ref = deref(obj) if deref else None
+            if ref:
+                objs.append(ref)
+
+        yield path, obj
+
+    if visited != None:
+        visited |= seen
+
+
+# cache of dispatch tables, a map from tuple of route classes
+# to _DispatchTable, it's cleared when any route is changed.
+_dispatch_tables = {}
+
+
 class DispatcherMeta(type):
     """ metaclass for Dispatcher
     """
@@ -52,6 +124,8 @@ class Dispatcher(six.with_metaclass(DispatcherMeta, object)):
         else:
             cls.obj_route[t] = [f]
 
+        _dispatch_tables.clear()
+
     @classmethod
     def register(cls, target):
         """
@@ -75,9 +149,32 @@ class Dispatcher(six.with_metaclass(DispatcherMeta, object)):
 
         # avoid bound error
         cls.result_fn = [f]
+        _dispatch_tables.clear()
         return f
 
 
+class _DispatchTable(dict):
+    """ a map from class of objects to list of handlers,
+    each handler is a tuple (index of route, handler function, result function).
+    Handlers for a class are composed along its MRO when first queried.
+    """
+    def __init__(self, routes):
+        super(_DispatchTable, self).__init__()
+        self.__routes = routes
+
+    def __missing__(self, kls):
+        ret = []
+        for idx, obj_route, res in self.__routes:
+            for cls in kls.__mro__[:-1]:
+                if cls is BaseObj:
+                    break
+                for f in obj_route.get(cls, []):
+                    ret.append((idx, f, res))
+
+        self[kls] = ret
+        return ret
+
+
 class Scanner(object):
     """ Scanner
     """
@@ -89,17 +186,23 @@ class Scanner(object):
     def app(self):
         return self.__app
 
-    def __build_route(self, route):
-        """
+    def __build_table(self, route):
+        """ get the dispatch table for a list of routes, which is
+        shared by all lists composed of the same route classes.
         """
-        ret = []
-        for r in route:
-            for attr in r.__class__.__dict__:
-                o = getattr(r, attr)
-                if type(o) == DispatcherMeta:
-                    ret.append((r, o.obj_route, o.result_fn[0]))
+        key = tuple(r.__class__ for r in route)
+        table = _dispatch_tables.get(key, None)
+        if table == None:
+            routes = []
+            for idx, r in enumerate(route):
+                for attr in r.__class__.__dict__:
+                    o = getattr(r, attr)
+                    if type(o) == DispatcherMeta:
+                        routes.append((idx, o.obj_route, o.result_fn[0]))
 
-        return ret
+            table = _dispatch_tables[key] = _DispatchTable(routes)
+
+        return table
 
     def scan(self, route, root, nexter=default_tree_traversal, leaves=[]):
         """
@@ -107,20 +210,58 @@ class Scanner(object):
         if root == None:
             raise ValueError('Can\'t scan because root==None')
 
-        merged_r = self.__build_route(route)
+        if nexter is default_tree_traversal:
+            # json-pointers are composed when required
+            nexter = _tree_traversal
+
+        table, app = self.__build_table(route), self.app
         for path, obj in nexter(root, leaves):
-            for the_self, r, res in merged_r:
-
-                def handle_cls(cls):
-                    f = r.get(cls, None)
-                    if f:
-                        for ff in f:
-                            ret = ff(the_self, path, obj, self.app)
-                            if res:
-                                res(the_self, ret)
-
-                for cls in obj.__class__.__mro__[:-1]:
-                    if cls is BaseObj:
+            handlers = table[obj.__class__]
+            if not handlers:
+                continue
+
+            path = str(path)
+            for idx, f, res in handlers:
+                ret = f(route[idx], path, obj, app)
+                if res:
+                    res(route[idx], ret)
+
+    def schedule(self, route, root, nexter=default_tree_traversal, leaves=[], after=None):
+        """ run routes in as few traversals as possible. Routes are
+        called in the order of 'route' on each object, a route would be
+        deferred to a later traversal only when it depends on a complete
+        traversal of another route.
+
+        :param list route: list of route objects
+        :param root: the root object to scan
+        :param dict after: a map from a route object to list of route objects
+        it depends on, those routes should be placed before it in 'route'.
+        :return: list of (names of route classes, seconds spent) for each traversal
+        :rtype: list of tuple
+        """
+        after = after or {}
+
+        passes = []
+        for r in route:
+            idx = len(passes) - 1 if len(passes) else 0
+            for d in after.get(r, []):
+                for i, p in enumerate(passes):
+                    if d in p:
+                        idx = max(idx, i + 1)
                         break
-                    handle_cls(cls)
+                else:
+                    raise ValueError('{0} depends on {1}, which is not scheduled before it'.format(
+                        r.__class__.__name__, d.__class__.__name__))
+
+            if idx == len(passes):
+                passes.append([])
+            passes[idx].append(r)
+
+        report = []
+        for p in passes:
+            start = timeit.default_timer()
+            self.scan(route=p, root=root, nexter=nexter, leaves=leaves)
+            report.append(([r.__class__.__name__ for r in p], timeit.default_timer() - start))
+            logger.info('pass {0}: {1:.3f} seconds'.format(*report[-1]))
 
+        return report
@@ -1,5 +1,5 @@
 from __future__ import absolute_import
-from ..utils import walk
+from ..utils import get_cycles
 from ..scan import Dispatcher
 from ..spec.v2_0.objects import (
     Schema,
@@ -13,11 +13,9 @@ from ..spec.v2_0.parser import (
     ResponseContext,
     PathItemContext,
     )
-import functools
 import six
 
-def _out(app, parser, path):
-    obj = app.resolve(path, parser=parser)
+def _out_obj(obj):
     r = getattr(obj, '$ref')
     return [r] if r else []
 
@@ -42,53 +40,73 @@ def _schema_out_obj(obj, out=None):
 
     return out
 
-def _schema_out(app, path):
-    obj = app.resolve(path, parser=SchemaContext)
-    return [] if obj == None else _schema_out_obj(obj)
-
 
 class CycleDetector(object):
-    """ circular detector """
+    """ circular detector
+
+    Outgoing '$ref' of each scanned object are collected during scanning,
+    cycles are searched once on the whole graph when 'cycles' is accessed.
+    """
 
     class Disp(Dispatcher): pass
 
+    # kind of objects -> (parser, function to get outgoing edges)
+    __kinds = {
+        'schema': (SchemaContext, _schema_out_obj),
+        'parameter': (ParameterContext, _out_obj),
+        'response': (ResponseContext, _out_obj),
+        'path_item': (PathItemContext, _out_obj),
+    }
+
     def __init__(self):
-        self.cycles = {
-            'schema':[],
-            'parameter':[],
-            'response':[],
-            'path_item':[]
-        }
+        self.__app = None
+        self.__cycles = None
+        # scanned paths, in the order of scanning
+        self.__starts = dict((k, []) for k in self.__kinds)
+        # vertex -> outgoing edges
+        self.__out = dict((k, {}) for k in self.__kinds)
+
+    @property
+    def cycles(self):
+        """ cycles detected, in a dict keyed by kinds of objects
+        """
+        if self.__cycles == None:
+            self.__cycles = dict(
+                (k, get_cycles(self.__starts[k], self.__ofn(k))) for k in self.__kinds
+            )
+        return self.__cycles
+
+    def __ofn(self, kind):
+        parser, fn = self.__kinds[kind]
+        out = self.__out[kind]
+
+        def _ofn(v):
+            if v not in out:
+                obj = self.__app.resolve(v, parser=parser)
+                out[v] = [] if obj == None else fn(obj)
+            return out[v]
+
+        return _ofn
+
+    def __collect(self, kind, path, obj, app):
+        self.__app = app
+        self.__cycles = None
+        self.__starts[kind].append(path)
+        self.__out[kind][path] = self.__kinds[kind][1](obj)
 
     @Disp.register([Schema])
-    def _schema(self, path, _, app):
-        self.cycles['schema'] = walk(
-            path,
-            functools.partial(_schema_out, app),
-            self.cycles['schema']
-        )
+    def _schema(self, path, obj, app):
+        self.__collect('schema', path, obj, app)
 
     @Disp.register([Parameter])
-    def _parameter(self, path, _, app):
-         self.cycles['parameter'] = walk(
-            path,
-            functools.partial(_out, app, ParameterContext),
-            self.cycles['parameter']
-        )
+    def _parameter(self, path, obj, app):
+        self.__collect('parameter', path, obj, app)
 
     @Disp.register([Response])
-    def _response(self, path, _, app):
-        self.cycles['response'] = walk(
-            path,
-            functools.partial(_out, app, ResponseContext),
-            self.cycles['response']
-        )
+    def _response(self, path, obj, app):
+        self.__collect('response', path, obj, app)
 
     @Disp.register([PathItem])
-    def _path_item(self, path, _, app):
-        self.cycles['path_item'] = walk(
-            path,
-            functools.partial(_out, app, PathItemContext),
-            self.cycles['path_item']
-        )
+    def _path_item(self, path, obj, app):
+        self.__collect('path_item', path, obj, app)
 
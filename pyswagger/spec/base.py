@@ -171,6 +171,20 @@ class Context(object):
             self._obj = obj
 
 
+def _deproxy(obj):
+    """ get the referent of a weakref.proxy to BaseObj,
+    a bound method accessed via the proxy carries the real object.
+    """
+    return obj.resolve.__self__ if isinstance(obj, weakref.ProxyTypes) else obj
+
+
+class _ProxyRef(object):
+    """ placeholder of weakref.proxy when pickling BaseObj
+    """
+    def __init__(self, obj):
+        self.obj = obj
+
+
 class BaseObj(object):
     """ Base implementation of all referencial objects,
     """
@@ -235,6 +249,19 @@ class BaseObj(object):
 
             container_apply(ct, obj, functools.partial(_assign, ctx))
 
+    def __getstate__(self):
+        """ weakref.proxy is not picklable, they are replaced
+        by their referents and restored in __setstate__.
+        """
+        state = {}
+        for k, v in six.iteritems(self.__dict__):
+            state[k] = _ProxyRef(_deproxy(v)) if isinstance(v, weakref.ProxyTypes) else v
+        return state
+
+    def __setstate__(self, state):
+        for k, v in six.iteritems(state):
+            self.__dict__[k] = weakref.proxy(v.obj) if isinstance(v, _ProxyRef) else v
+
     def get_private_name(self, f):
         """ get private protected name of an attribute
 
@@ -265,9 +292,7 @@ class BaseObj(object):
             ts = [ts]
 
         obj = self
-        while len(ts) > 0:
-            t = ts.pop(0)
-
+        for t in ts:
             if issubclass(obj.__class__, BaseObj):
                 obj = getattr(obj, t)
             elif isinstance(obj, list):
@@ -161,7 +161,7 @@ class ResourceListContext(Context):
     def __init__(self, parent, backref):
         super(ResourceListContext, self).__init__(parent, backref)
 
-    def parse(self, obj, root_url, resolver, getter):
+    def parse(self, obj, root_url, resolver, getter, concurrency=1):
         super(ResourceListContext, self).parse(obj=obj)
 
         resources = []
@@ -172,10 +172,14 @@ class ResourceListContext(Context):
             else:
                 raise TypeError('Invalid type of apis: ' + type(obj[private.SCHEMA_APIS]))
         base = url_dirname(root_url)
-        urls = zip(
+        urls = list(zip(
             map(lambda u: url_join(base,  u[1:]), resources),
             map(lambda u: u[1:], resources)
-        )
+        ))
+
+        # load all API declarations ahead, they are
+        # parsed in the order of 'apis' below.
+        resolver.prefetch([url for url, _ in urls], getter, concurrency=concurrency)
 
         # replace each element in 'apis' with Resource
         self._obj['apis'] = {}
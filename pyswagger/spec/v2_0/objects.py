@@ -1,11 +1,18 @@
 from __future__ import absolute_import
 from ..base import BaseObj, FieldMeta
-from ...utils import final
-from ...io import Request
+from ...utils import final, deref, PathTemplate
+from ...io import Request, is_stream
 from ...io import Response as _Response
 from ...primitives import Array
 import six
 import copy
+import collections
+import functools
+import itertools
+import logging
+
+
+logger = logging.getLogger(__name__)
 
 
 class BaseObj_v2_0(BaseObj):
@@ -47,6 +54,15 @@ class BaseSchema(BaseObj_v2_0):
         'uniqueItems': None,
     }
 
+    def __getstate__(self):
+        """ constructors compiled by primitive factory and encoders
+        compiled by SchemaEncoder are not carried along when pickling.
+        """
+        state = super(BaseSchema, self).__getstate__()
+        state.pop('_prim_compiled', None)
+        state.pop('_json_encoder', None)
+        return state
+
 
 class Items(six.with_metaclass(FieldMeta, BaseSchema)):
     """ Items Object
@@ -244,51 +260,252 @@ class Operation(six.with_metaclass(FieldMeta, BaseObj_v2_0)):
         'cached_schemes': [],
     }
 
+    def __getstate__(self):
+        """ primitive factory and MIME codec are bound to the App
+        loading this object, they are not carried along when pickling.
+        """
+        state = super(Operation, self).__getstate__()
+        state.pop('_prim_factory', None)
+        state.pop('_mime_codec', None)
+        state.pop('_call_plan', None)
+        return state
+
+    @property
+    def plan(self):
+        """ compiled CallPlan of this Operation,
+        it would be compiled when first accessed.
+
+        :rtype: CallPlan
+        """
+        plan = getattr(self, '_call_plan', None)
+        if plan == None:
+            plan = self.compile()
+        return plan
+
+    def compile(self):
+        """ compile the CallPlan used by Operation.__call__,
+        should be called after this Operation is prepared.
+
+        :rtype: CallPlan
+        """
+        if getattr(self, '_prim_factory', None) == None:
+            # parameters are not merged and patched yet, plans
+            # compiled from them should never be cached.
+            raise Exception('Operation should be prepared before compiled: {0}'.format(self.operationId))
+
+        plan = CallPlan(self)
+        setattr(self, '_call_plan', plan)
+        return plan
+
     def __call__(self, **k):
+        plan = self.plan
+
+        # missing parameters are reported before any value is converted
+        _check_required(plan, k)
+
         # prepare parameter set
         params = dict(header={}, query=[], path={}, body={}, formData=[], file={})
-        names = []
-        def _convert_parameter(p):
-            if p.name not in k and not p.is_set("default") and p.required:
-                raise ValueError('requires parameter: ' + p.name)
-
-            if p.is_set("default"):
-                v = k.get(p.name, p.default)
+        for p in plan.params:
+            v = _value_of(p, k)
+            if v is _absent:
+                continue
+            if p.bucket == 'body' and is_stream(v):
+                # streamed as it is
+                _put(params, p, v)
             else:
-                if p.name in k:
-                    v = k[p.name]
-                else:
-                    # do not provide value for parameters that use didn't specify.
-                    return
+                _put(params, p, self._prim_factory.produce(p.target, v, dict(read=False)))
 
-            c = p._prim_(v, self._prim_factory, ctx=dict(read=False))
-            i = getattr(p, 'in')
+        # check for unknown parameter
+        _check_unknown(plan, k)
 
-            if p.type == 'file':
-                params['file'][p.name] = c
-            elif i in ('query', 'formData'):
-                if isinstance(c, Array):
-                    if p.items.type == 'file':
-                        params['file'][p.name] = c
-                    else:
-                        params[i].extend([tuple([p.name, v]) for v in c.to_url()])
-                else:
-                    params[i].append((p.name, str(c),))
+        return \
+        Request(op=self, params=params), _Response(self)
+
+    def call_many(self, ks, on_error=None, chunk_size=256):
+        """ create (Request, Response) for each set of parameters lazily,
+        the call plan and converters of parameters are resolved once, and
+        parameters are converted column-wise in chunks.
+
+        :param ks: iterable of dict, each one is the same as kwargs of Operation.__call__
+        :param on_error: function(index, kwargs, error) called when failed to create a request,
+        that item is skipped. Errors are logged when not provided.
+        :param int chunk_size: number of items converted at a time
+        :return: generator of (Request, Response)
+        """
+        plan = self.plan
+
+        factory = self._prim_factory
+        convs = []
+        for p in plan.params:
+            if hasattr(factory, 'compile'):
+                convs.append(functools.partial(_write, factory.compile(p.target)))
             else:
-                params[i][p.name] = str(c) if i != 'body' else c
+                convs.append(functools.partial(_produce, factory, p.target))
+
+        it, base = iter(ks), 0
+        while True:
+            chunk = list(itertools.islice(it, chunk_size))
+            if len(chunk) == 0:
+                break
+
+            params = [dict(header={}, query=[], path={}, body={}, formData=[], file={}) for _ in chunk]
+            errors = [None] * len(chunk)
+            for i, k in enumerate(chunk):
+                try:
+                    _check_required(plan, k)
+                except ValueError as e:
+                    errors[i] = e
+            for p, conv in zip(plan.params, convs):
+                for i, k in enumerate(chunk):
+                    if errors[i] != None:
+                        continue
+                    try:
+                        v = _value_of(p, k)
+                        if v is _absent:
+                            continue
+                        _put(params[i], p, v if p.bucket == 'body' and is_stream(v) else conv(v))
+                    except Exception as e:
+                        errors[i] = e
+
+            for i, k in enumerate(chunk):
+                if errors[i] == None:
+                    try:
+                        _check_unknown(plan, k)
+                    except ValueError as e:
+                        errors[i] = e
+
+                if errors[i] != None:
+                    if on_error:
+                        on_error(base + i, k, errors[i])
+                    else:
+                        logger.error('failed to create request #{0} of {1}: {2}'.format(base + i, self.operationId, errors[i]))
+                    continue
 
-            names.append(p.name)
+                yield Request(op=self, params=params[i]), _Response(self)
 
-        for p in self.parameters:
-            _convert_parameter(final(p))
+            base += len(chunk)
 
-        # check for unknown parameter
-        unknown = set(six.iterkeys(k)) - set(names)
-        if len(unknown) > 0:
-            raise ValueError('Unknown parameters: {0}'.format(unknown))
 
-        return \
-        Request(op=self, params=params), _Response(self)
+# placeholder for parameters not provided
+_absent = object()
+
+def _value_of(p, k):
+    """ value of a parameter in kwargs, or the default one
+
+    :param CallPlan.Param p: the parameter
+    :param dict k: kwargs
+    """
+    if p.name in k:
+        return k[p.name]
+    elif p.has_default:
+        return p.default
+    elif p.required:
+        raise ValueError('requires parameter: ' + p.name)
+
+    # do not provide value for parameters that use didn't specify.
+    return _absent
+
+def _put(params, p, c):
+    """ put a converted parameter into parameter set
+    """
+    i = p.bucket
+
+    if i == 'file':
+        params['file'][p.name] = c
+    elif i in ('query', 'formData'):
+        if isinstance(c, Array):
+            if p.file_items:
+                params['file'][p.name] = c
+            else:
+                params[i].extend([tuple([p.name, v]) for v in c.to_url()])
+        else:
+            params[i].append((p.name, str(c),))
+    elif i == 'body':
+        params[i][p.name] = c
+    else:
+        params[i][p.name] = str(c)
+
+def _write(fn, v):
+    return fn(v, False)
+
+def _produce(factory, obj, v):
+    return factory.produce(obj, v, dict(read=False))
+
+def _check_required(plan, k):
+    if not plan.required.issubset(six.iterkeys(k)):
+        # the first missing one, in the order of parameters
+        p = next(p for p in plan.params if p.required and p.name not in k)
+        raise ValueError('requires parameter: ' + p.name)
+
+def _check_unknown(plan, k):
+    if not plan.names.issuperset(six.iterkeys(k)):
+        raise ValueError('Unknown parameters: {0}'.format(set(six.iterkeys(k)) - plan.names))
+
+
+class CallPlan(object):
+    """ Everything Operation.__call__ and Request need to know
+    about parameters of an Operation, resolved once.
+    """
+
+    # - name: name of parameter
+    # - bucket: where the value goes, 'in' of parameter, or 'file'
+    # - target: object passed to primitive factory
+    # - required: True if required and there is no default value
+    # - has_default, default: default value
+    # - file_items: True if it's an array of files
+    Param = collections.namedtuple('Param', [
+        'name', 'bucket', 'target', 'required', 'has_default', 'default', 'file_items'])
+
+    # - name: name of parameter
+    # - type, format, schema_name: used when marshalling
+    # - schema: Schema of body, for codecs encoding by Schema
+    Body = collections.namedtuple('Body', ['name', 'type', 'format', 'schema_name', 'schema'])
+
+    def __init__(self, op):
+        """ constructor
+
+        :param Operation op: the Operation to compile
+        """
+        self.params = []
+        self.names = set()
+        self.required = set()
+        self.defaults = {}
+        self.body = None
+        self.content_type = op.consumes[0] if op.consumes else 'application/json'
+        # templates of path and url
+        self.path = PathTemplate(op.path) if op.path else None
+        self.url = PathTemplate(op.url) if op.url else None
+
+        for p in op.parameters:
+            p = final(p)
+            i = getattr(p, 'in')
+            has_default = p.is_set('default')
+            target = p
+            if i == 'body':
+                target = p.schema
+                if self.body == None:
+                    schema = deref(p.schema)
+                    self.body = CallPlan.Body(p.name, schema.type, schema.format, schema.name, p.schema)
+
+            self.params.append(CallPlan.Param(
+                name=p.name,
+                bucket='file' if p.type == 'file' else i,
+                target=target,
+                required=p.required and not has_default,
+                has_default=has_default,
+                default=p.default if has_default else None,
+                file_items=getattr(p.items, 'type', None) == 'file',
+            ))
+
+            self.names.add(p.name)
+            if p.required and not has_default:
+                self.required.add(p.name)
+            if has_default:
+                self.defaults[p.name] = p.default
+
+        self.params = tuple(self.params)
+        self.names = frozenset(self.names)
+        self.required = frozenset(self.required)
 
 
 class PathItem(six.with_metaclass(FieldMeta, BaseObj_v2_0)):
@@ -2,7 +2,7 @@ from __future__ import absolute_import
 from pyswagger import App
 from pyswagger.contrib.client.requests import Client
 from ...utils import get_test_data_folder
-from ....primitives import Model, Array
+from ....primitives import Model, Array, MimeCodec, Compression
 import unittest
 import httpretty
 import json
@@ -77,6 +77,24 @@ class RequestsClient_Pet_TestCase(unittest.TestCase):
         self.assertEqual(resp.data[0].name, 'Tom')
         self.assertTrue(isinstance(resp.data[0].tags, Array))
 
+    def test_findPetsByStatus_stream(self):
+        """ Pet.findPetsByStatus, with Response.iter_data """
+        httpretty.register_uri(httpretty.GET, 'http://petstore.swagger.wordnik.com/api/pet/findByStatus',
+            status=200,
+            content_type='application/json',
+            body=json.dumps([pet_Tom, pet_Qoo])
+        )
+
+        req, resp = app.op['findPetsByStatus'](status=['available'])
+        resp.stream_body = True
+        resp = client.request((req, resp))
+
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp.data, None)
+        pets = list(resp.iter_data())
+        self.assertEqual([p.name for p in pets], ['Tom', 'Qoo'])
+        self.assertTrue(isinstance(pets[0], Model))
+
     def test_findPetsByTags(self):
         """ Pet.findPetsByTags """
         httpretty.register_uri(httpretty.GET, 'http://petstore.swagger.wordnik.com/api/pet/findByTags',
@@ -165,6 +183,30 @@ class RequestsClient_Pet_TestCase(unittest.TestCase):
             {u'name': 'Tom', u'tags': [{u'id': 0, u'name': 'available'}, {u'id': 1, u'name': 'sold'}], u'id': 1}
             )
 
+    def test_getPetById_compressed(self):
+        """ Pet.getPetById, with a compression policy """
+        c_app = App.load(get_test_data_folder(version='1.2', which='wordnik'),
+            mime_codec=MimeCodec(compression=Compression(accept=['gzip', 'deflate'])))
+        c_app.prepare()
+        httpretty.register_uri(httpretty.GET, 'http://petstore.swagger.wordnik.com/api/pet/1',
+            status=200,
+            content_type='application/json',
+            adding_headers={'Content-Encoding': 'gzip'},
+            body=Compression().compress(six.b(json.dumps(pet_Tom)))
+        )
+
+        resp = client.request(c_app.op['getPetById'](petId=1))
+
+        self.assertEqual(httpretty.last_request().headers['accept-encoding'], 'gzip, deflate')
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(resp.data.name, 'Tom')
+
+        # streamed
+        req, resp = c_app.op['getPetById'](petId=1)
+        resp.stream_body = True
+        resp = client.request((req, resp))
+        self.assertEqual(resp.compression.decompress('gzip', six.b('').join(resp.raw_stream)), six.b(json.dumps(pet_Tom)))
+
     def test_uploadFile(self):
         """ Pet.uploadFile """
         httpretty.register_uri(httpretty.POST, 'http://petstore.swagger.wordnik.com/api/pet/uploadImage',
@@ -230,6 +272,21 @@ class MultipleFileUploadTestCase(unittest.TestCase):
         self.assertTrue(body.find('_3.k') != -1)
         self.assertTrue(body.find('test image 3') != -1)
 
+    def test_uploadImages_redirect(self):
+        """ streamed body is sent again when redirected """
+        httpretty.register_uri(httpretty.POST, 'http://test.com/upload', status=307, location='http://test.com/upload2')
+        httpretty.register_uri(httpretty.POST, 'http://test.com/upload2', status=200)
+
+        app = App._create_(get_test_data_folder(version='2.0', which=os.path.join('io', 'files')))
+        resp = client.request(app.op['upload_images'](images=[
+                dict(data=six.BytesIO(six.b('test image 1')), filename='_1.k'),
+            ])
+        )
+        self.assertEqual(resp.status, 200)
+        self.assertEqual(httpretty.last_request().path, '/upload2')
+        body = httpretty.last_request().body.decode()
+        self.assertTrue(body.find('test image 1') != -1)
+
 @httpretty.activate
 class HeaderTestCase(unittest.TestCase):
     """ test case for passing headers """
@@ -1,6 +1,20 @@
 from __future__ import absolute_import
-from pyswagger.primitives import MimeCodec
+from pyswagger.primitives import MimeCodec, Compression, Model, Byte, Datetime, Date
+from pyswagger.primitives.codec import get_json_backend
 import unittest
+import json
+import six
+import datetime
+import gzip
+import zlib
+
+
+def _installed(name):
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
 
 
 class CodecTestCase(unittest.TestCase):
@@ -28,3 +42,166 @@ class CodecTestCase(unittest.TestCase):
         data = '{"key": "value"}'
         self.assertEqual(data, mime_codec.marshal(mime, value))
         self.assertEqual(value, mime_codec.unmarshal(mime, data))
+
+    def test_marshal_iter(self):
+        mime_codec = MimeCodec()
+        values = [dict(key='value'), 1]
+        self.assertEqual('[{"key": "value"},1]', ''.join(mime_codec.marshal_iter('application/json', iter(values))))
+        self.assertEqual('[]', ''.join(mime_codec.marshal_iter('application/json', iter([]))))
+        self.assertEqual('ab', ''.join(mime_codec.marshal_iter('text/plain', iter(['a', 'b']))))
+
+        # codec without marshal_iter marshals all values at once
+        class ListCodec(object):
+            def marshal(self, value, **kwargs):
+                return repr(value)
+        mime_codec.register('test', ListCodec())
+        self.assertEqual(["[{'key': 'value'}, 1]"], list(mime_codec.marshal_iter('test', iter(values))))
+
+    def test_unmarshal_iter(self):
+        mime_codec = MimeCodec()
+        doc = dict(meta=dict(x=[1, 2, {'a': '}]'}]), data=[dict(id=i, s=six.u('\u00e9') * i) for i in range(20)], z=12345)
+        raw = json.dumps(doc).encode('utf-8')
+
+        # chunks might split multi-bytes characters, numbers, ...
+        for n in (1, 2, 7, len(raw)):
+            chunks = [raw[i:i+n] for i in range(0, len(raw), n)]
+            self.assertEqual(doc['data'], list(mime_codec.unmarshal_iter('application/json', iter(chunks), pointer='/data')))
+            self.assertEqual(doc['meta']['x'], list(mime_codec.unmarshal_iter('application/json', iter(chunks), pointer='/meta/x')))
+
+        self.assertEqual([123, 45], list(mime_codec.unmarshal_iter('application/json', iter([b'[1', b'23, 4', b'5]']))))
+
+        # split at every offset, numbers might be split after '.', 'e' or '-'
+        doc = [-25000000000.0, 1.5e-10, -3, 0, 12e3, True, None, six.u('\u00e9-1.'), dict(a=[-1.25, 2E+5])]
+        raw = json.dumps(doc).encode('utf-8')
+        for i in range(len(raw) + 1):
+            self.assertEqual(doc, list(mime_codec.unmarshal_iter('application/json', iter([raw[:i], raw[i:]]))))
+        self.assertEqual([], list(mime_codec.unmarshal_iter('application/json', b' [ ] ')))
+        self.assertRaises(ValueError, list, mime_codec.unmarshal_iter('application/json', b'[1, 2'))
+        self.assertRaises(ValueError, list, mime_codec.unmarshal_iter('application/json', raw, pointer='/unknown'))
+
+    def test_ndjson_codec(self):
+        mime_codec = MimeCodec()
+        mime = 'application/x-ndjson'
+        values = [dict(key='value'), dict(key=six.u('\u00e9'))]
+        data = mime_codec.marshal(mime, values)
+        self.assertEqual(data, '{"key": "value"}\n{"key": "\\u00e9"}\n')
+        self.assertEqual(data, ''.join(mime_codec.marshal_iter(mime, iter(values))))
+        self.assertEqual(values, mime_codec.unmarshal(mime, data))
+
+        # lines split across chunks, CRLF and empty lines
+        raw = six.b('{"key": "value"}\r\n\n{"key": "\xc3\xa9"}')
+        chunks = [raw[i:i+3] for i in range(0, len(raw), 3)]
+        self.assertEqual(values, list(mime_codec.unmarshal_iter(mime, iter(chunks))))
+        self.assertRaises(ValueError, list, mime_codec.unmarshal_iter(mime, raw, pointer='/data'))
+
+    def _prims(self):
+        m = Model()
+        m['b'] = Byte()
+        m['b'].apply_with(None, six.b('bytes'), None)
+        m['dt'] = Datetime()
+        m['dt'].apply_with(None, '2007-04-05T12:30:00-02:00', None)
+        m['d'] = Date()
+        m['d'].apply_with(None, datetime.date(2017, 1, 2), None)
+        m['s'] = six.u('\u00e9/')
+        m['l'] = [1, 2.5, None, True]
+        return m
+
+    def test_json_backend(self):
+        """ JSON backends produce the same JSON """
+        expected = json.loads(MimeCodec().marshal('application/json', self._prims()))
+        for name in ('json', 'orjson', 'ujson', 'simplejson', 'auto'):
+            mime_codec = MimeCodec(json_backend=name)
+            data = mime_codec.marshal('application/json', self._prims())
+            self.assertEqual(expected, json.loads(data.decode('utf-8') if isinstance(data, six.binary_type) else data))
+
+            # bytes and str are both accepted
+            self.assertEqual(expected, mime_codec.unmarshal('application/json', json.dumps(expected)))
+            self.assertEqual(expected, mime_codec.unmarshal('application/json', json.dumps(expected).encode('utf-8')))
+
+            # NDJSON
+            data = mime_codec.marshal('application/x-ndjson', [self._prims(), self._prims()])
+            self.assertEqual([expected, expected], mime_codec.unmarshal('application/x-ndjson', data))
+
+    def test_json_backend_fallback(self):
+        """ fallback to stdlib when not installed """
+        self.assertRaises(ValueError, get_json_backend, 'not-a-json-lib')
+        for name in ('orjson', 'ujson', 'simplejson'):
+            try:
+                __import__(name)
+            except ImportError:
+                self.assertEqual('json', get_json_backend(name).name)
+            else:
+                self.assertEqual(name, get_json_backend(name).name)
+        self.assertEqual('json', MimeCodec().json_backend.name)
+
+    @unittest.skipUnless(_installed('msgpack'), 'msgpack is not installed')
+    def test_msgpack_codec(self):
+        mime_codec = MimeCodec()
+        expected = json.loads(mime_codec.marshal('application/json', self._prims()))
+        expected['b'] = six.b('bytes')
+        for mime in ('application/msgpack', 'application/x-msgpack'):
+            data = mime_codec.marshal(mime, self._prims())
+            self.assertEqual(expected, mime_codec.unmarshal(mime, data))
+
+        # items of an array, across chunks
+        data = mime_codec.marshal('application/msgpack', [self._prims(), self._prims()])
+        chunks = [data[i:i+7] for i in range(0, len(data), 7)]
+        self.assertEqual([expected, expected], list(mime_codec.unmarshal_iter('application/msgpack', iter(chunks))))
+        self.assertRaises(ValueError, list, mime_codec.unmarshal_iter('application/msgpack', iter(chunks[:-1])))
+
+    @unittest.skipUnless(_installed('cbor2'), 'cbor2 is not installed')
+    def test_cbor_codec(self):
+        mime_codec = MimeCodec()
+        expected = json.loads(mime_codec.marshal('application/json', self._prims()))
+        expected['b'] = six.b('bytes')
+        data = mime_codec.marshal('application/cbor', self._prims())
+        self.assertEqual(expected, mime_codec.unmarshal('application/cbor', data))
+
+    def test_binary_codec_optional(self):
+        """ binary codecs are registered only when installed """
+        mime_codec = MimeCodec()
+        self.assertEqual(_installed('msgpack'), mime_codec.codec('application/msgpack') != None)
+        self.assertEqual(_installed('cbor2'), mime_codec.codec('application/cbor') != None)
+
+
+class CompressionTestCase(unittest.TestCase):
+    def test_round_trip(self):
+        raw = six.b('{"key": "value"}') * 100
+        for name in ('zstd', 'br', 'gzip', 'deflate'):
+            c = Compression(encoding=name)
+            if c.encoding != name:
+                # not installed
+                self.assertFalse(name in c.accept)
+                continue
+            data = c.compress(raw)
+            self.assertTrue(len(data) < len(raw))
+            self.assertEqual(raw, c.decompress(name, data))
+
+            # streamed
+            data = six.b('').join(c.compress_iter(raw[i:i+7] for i in range(0, len(raw), 7)))
+            chunks = [data[i:i+5] for i in range(0, len(data), 5)]
+            self.assertEqual(raw, six.b('').join(c.decompress_iter(name, iter(chunks))))
+
+    def test_interop(self):
+        """ compatible with gzip/zlib """
+        raw = six.b('pyswagger') * 10
+        c = Compression()
+        self.assertEqual(zlib.decompress(c.compress(raw), 16 + zlib.MAX_WBITS), raw)
+        self.assertEqual(c.decompress('deflate', zlib.compress(raw)), raw)
+
+        f = six.BytesIO()
+        with gzip.GzipFile(fileobj=f, mode='wb') as g:
+            g.write(raw)
+        self.assertEqual(c.decompress('GZIP', f.getvalue()), raw)
+
+        # encodings applied in order, decoded in reverse
+        self.assertEqual(c.decompress('deflate, identity, gzip', c.compress(zlib.compress(raw))), raw)
+        self.assertEqual(c.decompress('identity', raw), raw)
+
+    def test_accept(self):
+        c = Compression(accept=['gzip', 'deflate'])
+        self.assertEqual(c.accept_encoding, 'gzip, deflate')
+        self.assertTrue(set(['gzip', 'deflate']) <= set(Compression().accept))
+
+        self.assertRaises(ValueError, Compression, accept=['not-an-encoding'])
+        self.assertRaises(ValueError, Compression().decompress, 'not-an-encoding', six.b(''))
@@ -3,7 +3,11 @@ from .utils import get_test_data_folder
 from pyswagger.spec.base import BaseObj
 import pyswagger
 import unittest
+import weakref
+import json
 import httpretty
+import tempfile
+import shutil
 import os
 import six
 
@@ -100,3 +104,97 @@ class SwaggerCoreTestCase(unittest.TestCase):
         req.prepare(scheme='https', handle_files=False)
         self.assertEqual(req.url, 'https://test.com/t1')
 
+
+
+class SnapshotTestCase(unittest.TestCase):
+    """ test App.save_snapshot, App.from_snapshot """
+
+    @classmethod
+    def setUpClass(kls):
+        kls.app = App.create(get_test_data_folder(
+            version='2.0',
+            which='wordnik'
+        ))
+        kls.folder = tempfile.mkdtemp()
+        kls.path = os.path.join(kls.folder, 'wordnik.snapshot')
+        kls.app.save_snapshot(kls.path)
+
+    @classmethod
+    def tearDownClass(kls):
+        shutil.rmtree(kls.folder)
+
+    def test_restore(self):
+        """ make sure restored App is the same as the prepared one """
+        app = App.from_snapshot(self.path, verify=True)
+
+        self.assertEqual(app.root.compare(self.app.root), (True, ''))
+        self.assertEqual(sorted(app.op.keys()), sorted(self.app.op.keys()))
+        self.assertEqual(sorted(app.m.keys()), sorted(self.app.m.keys()))
+        self.assertEqual(app.version, '2.0')
+        self.assertEqual(app.url, self.app.url)
+
+        # resolved $ref are kept as weakref.proxy
+        pet = app.resolve('#/paths/~1pet/post').parameters[0].schema
+        self.assertTrue(isinstance(pet.ref_obj, weakref.ProxyTypes))
+        self.assertEqual(pet.ref_obj.name, 'Pet')
+
+    def test_operation(self):
+        """ make sure restored Operation is callable """
+        app = App.from_snapshot(self.path)
+        req, resp = app.op['getPetById'](petId=1)
+        req.prepare()
+        self.assertEqual(req.url, 'http://petstore.swagger.io/v2/pet/1')
+
+        resp.apply_with(status=200, raw=json.dumps(dict(id=1, name='Tom', photoUrls=[])))
+        self.assertEqual(resp.data.name, 'Tom')
+
+    def test_stale(self):
+        """ make sure stale snapshot is detected """
+        path = os.path.join(self.folder, 'stale.snapshot')
+        with open(self.path, 'rb') as src:
+            header = six.moves.cPickle.load(src)
+            header['key'] = 'not-a-key'
+            with open(path, 'wb') as dst:
+                six.moves.cPickle.dump(header, dst)
+                dst.write(src.read())
+
+        # not verified by default
+        App.from_snapshot(path)
+        self.assertRaises(ValueError, App.from_snapshot, path, verify=True)
+
+    def test_external_operation(self):
+        """ make sure Operation(s) in external documents are restored """
+        from .v2_0.test_ex import _gen_hook
+        hook = _gen_hook(get_test_data_folder(version='2.0', which='ex'))
+        app = App.load(url='file:///root/swagger.json', url_load_hook=hook)
+        app.prepare()
+        path = os.path.join(self.folder, 'ex.snapshot')
+        app.save_snapshot(path)
+
+        app = App.from_snapshot(path, url_load_hook=hook)
+        op = app.resolve('file:///full/swagger.json#/paths/~1user/get')
+        self.assertEqual(op._prim_factory, app.prim_factory)
+        self.assertEqual(op._mime_codec, app.mime_codec)
+
+    def test_digest_non_ascii(self):
+        """ make sure urls are encoded in utf-8 when hashing """
+        class _Resolver(object):
+            def resolve(self, url):
+                return dict(url=url)
+
+        url = six.u('file:///tmp/\u4e2d\u6587/swagger.json')
+        self.assertEqual(App._digest_of(_Resolver(), [url]), App._digest_of(_Resolver(), [url]))
+        self.assertNotEqual(App._digest_of(_Resolver(), [url]), App._digest_of(_Resolver(), ['file:///tmp/swagger.json']))
+
+    def test_incompatible(self):
+        """ make sure image from other version is rejected """
+        path = os.path.join(self.folder, 'incompatible.snapshot')
+        with open(path, 'wb') as f:
+            six.moves.cPickle.dump(dict(format=0), f)
+
+        self.assertRaises(ValueError, App.from_snapshot, path)
+
+    def test_not_prepared(self):
+        """ only prepared App could be saved """
+        app = App.load(get_test_data_folder(version='2.0', which='wordnik'))
+        self.assertRaises(Exception, app.save_snapshot, os.path.join(self.folder, 'not_prepared'))
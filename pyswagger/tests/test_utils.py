@@ -85,6 +85,26 @@ class SwaggerUtilsTestCase(unittest.TestCase):
         self.assertEqual(d['get'], 1)
         self.assertEqual(d['something-get'], 2)
 
+    def test_scope_dict_update(self):
+        """ make sure ScopeDict lookups follow updates """
+        d = utils.ScopeDict({'a!b': 1, 'c!d': 2})
+        d.sep = '!'
+        self.assertEqual(d['b'], 1)
+        self.assertEqual(d['d'], 2)
+
+        d['e!b'] = 3
+        self.assertRaises(ValueError, d.__getitem__, 'b')
+        del d['a!b']
+        self.assertEqual(d['b'], 3)
+
+        d.update({'f!xd': 4})
+        self.assertEqual(d['d'], 2)
+        d.pop('c!d')
+        self.assertEqual(d['d'], 4)
+
+        d.clear()
+        self.assertRaises(KeyError, d.__getitem__, 'd')
+
     def test_dict_to_tuple(self):
         """ get_dict_as_tuple """
         self.assertEqual(
@@ -200,6 +220,23 @@ class SwaggerUtilsTestCase(unittest.TestCase):
         self.assertEqual(utils.normalize_jr('#/definitions/User', 'http://test.com/api/swagger.json'), 'http://test.com/api/swagger.json#/definitions/User')
         self.assertEqual(utils.normalize_jr('#/definitions/User'), '#/definitions/User')
 
+    def test_get_external_refs(self):
+        url = 'http://test.com/api/swagger.json'
+        obj = {
+            'definitions': {
+                'User': {'$ref': 'User.json'},
+                'Pet': {'$ref': '#/definitions/User'},
+                'Tag': {'properties': {'$ref': {'$ref': 'http://other.com/swagger.json#/definitions/Tag'}}},
+            },
+            'paths': {'/user': {'$ref': 'paths.json#/user'}},
+            'parameters': [{'schema': {'$ref': 'User.json'}}],
+        }
+        self.assertEqual(sorted(utils.get_external_refs(obj, url)), [
+            'http://other.com/swagger.json',
+            'http://test.com/api/User.json',
+            'http://test.com/api/paths.json',
+        ])
+
     def test_get_swagger_version(self):
         self.assertEqual(utils.get_swagger_version({'swaggerVersion': '1.2'}), '1.2')
         self.assertEqual(utils.get_swagger_version({'swagger': '2.0'}), '2.0')
@@ -430,6 +467,34 @@ class WalkTestCase(unittest.TestCase):
             [2, 3 ,4, 2]
             ]))
 
+    def test_get_cycles(self):
+        """ make sure get_cycles returns the same cycles as walk """
+        confs = [
+            {0: [0]},
+            {0: [1], 1: [2], 2: [3], 3: [4], 4: [5], 5: [1]},
+            {0: [6], 1: [6], 2: [0], 3: [1], 4: [4], 5: [3], 6: [3], 7: [4], 8: [0]},
+            {0: [1], 1: [2], 2: [3], 3: [0, 5], 4: [2], 5: [4]},
+            {0: [1, 2], 1: [2, 3], 2: [3, 4], 3: [4, 5], 4: [5, 6], 5: [6, 7], 6: [7], 7: []},
+            {0: [1, 4], 1: [2], 2: [0, 3], 3: [4, 5], 4: [1, 2], 5: [4]},
+            # duplicated edges
+            {0: [1, 1], 1: [0, 0, 1]},
+        ]
+
+        for conf in confs:
+            ofn = functools.partial(WalkTestCase._out, conf)
+            cyc = []
+            for i in sorted(conf.keys()):
+                cyc = utils.walk(i, ofn, cyc)
+
+            self.assertEqual(utils.get_cycles(sorted(conf.keys()), ofn), sorted(cyc))
+
+    def test_get_scc(self):
+        """ make sure strongly connected components are found """
+        conf = {0: [1], 1: [2], 2: [0, 3], 3: [4], 4: [3, 5], 5: []}
+
+        scc = utils.get_scc([0], functools.partial(WalkTestCase._out, conf))
+        self.assertEqual(sorted(sorted(c) for c in scc), [[0, 1, 2], [3, 4], [5]])
+
     def test_case_insensitive_dict(self):
         """ test utils.CaseInsensitiveDict
         """
@@ -454,3 +519,15 @@ class WalkTestCase(unittest.TestCase):
         else:
             # should not reach here
             self.assertTrue(False)
+
+    def test_path_template(self):
+        """ test utils.PathTemplate
+        """
+        t = utils.PathTemplate('//test.com/v1/{a.b}/c/{d}')
+        self.assertEqual(t.names, ('a.b', 'd'))
+        self.assertEqual(t.render({'a.b': '1', 'd': '2'}), '//test.com/v1/1/c/2')
+        self.assertRaises(KeyError, t.render, {'d': '2'})
+        self.assertEqual(t.with_netloc('localhost:8000').render({'a.b': '1', 'd': '2'}), '//localhost:8000/v1/1/c/2')
+
+        t = utils.PathTemplate('/a/b')
+        self.assertEqual(t.render({}), '/a/b')
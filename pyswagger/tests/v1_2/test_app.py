@@ -1,4 +1,5 @@
 from pyswagger import App, errs, utils
+from pyswagger.resolve import Resolver
 from ..utils import get_test_data_folder
 from pyswagger.spec.v2_0.objects import (
     Schema,
@@ -84,6 +85,34 @@ class HTTPGetterTestCase(unittest.TestCase):
         ]))
 
 
+class ConcurrentLoadingTestCase(unittest.TestCase):
+    """ test loading API declarations concurrently """
+
+    def test_concurrency(self):
+        """ make sure the result is the same as loading one by one """
+        folder = get_test_data_folder(version='1.2', which='wordnik')
+
+        app = App.load(folder)
+        app.prepare()
+        concurrent_app = App.load(folder, concurrency=4)
+        concurrent_app.prepare()
+
+        self.assertEqual(list(concurrent_app.raw.apis.keys()), list(app.raw.apis.keys()))
+        self.assertEqual(concurrent_app.root.compare(app.root), (True, ''))
+
+    def test_prefetch(self):
+        """ make sure Resolver.prefetch reports loaded documents """
+        folder = get_test_data_folder(version='1.2', which='wordnik')
+        resolver = Resolver()
+
+        urls = [utils.normalize_url(os.path.join(folder, n)) for n in ['pet.json', 'store.json', 'user.json']]
+        fetched = resolver.prefetch(urls + urls[:1], concurrency=2)
+        self.assertEqual(sorted(fetched.keys()), sorted(urls))
+
+        # cached documents would not be loaded again
+        self.assertEqual(resolver.prefetch(urls, concurrency=2), {})
+
+
 class ValidationTestCase(unittest.TestCase):
     """ test case for validation """
 
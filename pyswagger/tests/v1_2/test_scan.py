@@ -118,6 +118,56 @@ class ScannerTestCase(unittest.TestCase):
         ]))
         self.assertEqual(len(p.parameter), 3)
 
+    def test_schedule(self):
+        """ make sure routes are fused into as few traversals as possible """
+        s = Scanner(app)
+        co1, co2, co3, p = CountObject(), CountObject(), CountObject(), PathRecord()
+
+        report = s.schedule(route=[co1, co2, p, co3], root=app.raw, after={p: [co1], co3: [co2]})
+        self.assertEqual([names for names, _ in report], [
+            ['CountObject', 'CountObject'],
+            ['PathRecord', 'CountObject'],
+        ])
+        for co in (co1, co2, co3):
+            self.assertEqual(co.total, {
+                Authorization: 1,
+                Resource: 3,
+                Operation: 20,
+                ResponseMessage: 23
+            })
+        self.assertEqual(len(p.parameter), 3)
+
+        # routes without constraints are scanned in one traversal
+        self.assertEqual(len(s.schedule(route=[CountObject(), PathRecord()], root=app.raw)), 1)
+
+        # dependency should be placed before
+        self.assertRaises(ValueError, s.schedule, route=[co1, co2], root=app.raw, after={co1: [co2]})
+
+    def test_register_after_scan(self):
+        """ make sure routes registered after scanning are dispatched """
+        class Late(object):
+            class Disp(Dispatcher): pass
+
+            def __init__(self):
+                self.resource, self.operation = 0, 0
+
+            @Disp.register([Resource])
+            def _resource(self, path, obj, _):
+                self.resource += 1
+
+        s = Scanner(app)
+        late = Late()
+        s.scan(route=[late], root=app.raw)
+        self.assertEqual((late.resource, late.operation), (3, 0))
+
+        def _operation(self, path, obj, _):
+            self.operation += 1
+        Late.Disp.register([Operation])(_operation)
+
+        late = Late()
+        s.scan(route=[late], root=app.raw)
+        self.assertEqual((late.resource, late.operation), (3, 20))
+
 
 class ResolveTestCase(unittest.TestCase):
     """ test for scanner: Resolve """
@@ -111,6 +111,30 @@ class ExternalDocumentTestCase(unittest.TestCase):
         app.prepare()
 
 
+class PrefetchTestCase(unittest.TestCase):
+    """ test case for loading external documents concurrently """
+
+    def test_prefetch(self):
+        """ make sure referred documents are loaded before preparation,
+        and the result is the same as loading them one by one.
+        """
+        hook = _gen_hook(get_test_data_folder(version='2.0', which='ex'))
+        app = App.load(url='file:///root/swagger.json', url_load_hook=hook, concurrency=4)
+        app.prepare()
+
+        self.assertEqual(sorted(app.prefetched.keys()), [
+            'file:///full/swagger.json',
+            'file:///partial/path_item/swagger.json',
+            'file:///partial/schema/swagger.json',
+            'file:///root/path_item.json',
+        ])
+
+        serial_app = App.load(url='file:///root/swagger.json', url_load_hook=hook)
+        serial_app.prepare()
+        self.assertEqual(serial_app.prefetched, {})
+        self.assertEqual(app.root.compare(serial_app.root), (True, ''))
+
+
 class ReuseTestCase(unittest.TestCase):
     """ test case for 'reuse', lots of partial swagger document
         https://github.com/OAI/OpenAPI-Specification/blob/master/guidelines/REUSE.md#guidelines-for-referencing
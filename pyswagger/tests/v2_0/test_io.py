@@ -6,6 +6,7 @@ import unittest
 import os
 import six
 import json
+import types
 
 
 class RequestTestCase(unittest.TestCase):
@@ -80,6 +81,349 @@ class RequestTestCase(unittest.TestCase):
         req._patch(opt={'url_scheme': 'https'})
         self.assertEqual(req.url, 'https://test.com/v1/t')
 
+    def test_dotted_path_parameter(self):
+        """ names of path parameters could contain '.'
+        """
+        req, _ = self.app.op['user.get'](**{'user.name': 'a.b c'})
+        req.prepare()
+        self.assertEqual(req.path, '/user/a.b+c')
+        self.assertEqual(req.url, 'http://test.com/v1/user/a.b+c')
+
+    def test_patch_before_prepare(self):
+        """ options of Request._patch are kept until preparation
+        """
+        req, _ = self.app.op['user.login'](user_id='a', password='b')
+        req._patch(opt={'url_netloc': 'xxx.com', 'url_scheme': 'https'})
+        req.prepare()
+        self.assertEqual(req.url, 'https://xxx.com/v1/user/login/a/b')
+
+        # templates are cached per netloc
+        plan = self.app.op['user.login'].plan
+        self.assertEqual(id(plan.url.with_netloc('xxx.com')), id(plan.url.with_netloc('xxx.com')))
+
+        # patches are cleared by reset
+        req.reset()
+        req.prepare()
+        self.assertEqual(req.url, 'http://test.com/v1/user/login/a/b')
+
+    def test_body_type(self):
+        """ JSON bodies are str, the same as json.dumps, with or without Schema
+        """
+        req, _ = self.app.op['missing.parameter'](body=dict(f1='say', f2='hello'))
+        req.prepare()
+        self.assertEqual(type(req.data), type(json.dumps({})))
+        self.assertEqual(json.loads(req.data), dict(f1='say', f2='hello'))
+
+        app = App.create(get_test_data_folder(version='2.0', which='wordnik'))
+        req, _ = app.op['addPet'](body=dict(id=1, name='Tom', photoUrls=['a']))
+        req.prepare()
+        self.assertEqual(type(req.data), type(json.dumps({})))
+
+    def test_stream_body(self):
+        """ body parameter from iterators and file-like objects
+        """
+        op = self.app.op['missing.parameter']
+
+        # iterator, marshalled by codec
+        req, _ = op(body=(dict(f1='say', f2=str(i)) for i in range(3)))
+        req.prepare(stream=True)
+        self.assertTrue(isinstance(req.data, io.StreamBody))
+        self.assertEqual(req.data.len, None)
+        self.assertFalse('Content-Length' in req.header)
+        self.assertEqual(json.loads(req.data.getvalue().decode('utf-8')), [dict(f1='say', f2=str(i)) for i in range(3)])
+
+        # buffered when not streaming
+        req, _ = op(body=iter([dict(f1='say')]))
+        req.prepare()
+        self.assertEqual(json.loads(req.data.decode('utf-8')), [dict(f1='say')])
+
+        # file-like is sent as it is, with known length
+        raw = six.b('{"f1": "say", "f2": "hello"}')
+        req, _ = op(body=six.BytesIO(raw))
+        req.prepare(stream=True)
+        self.assertEqual(req.header['Content-Length'], str(len(raw)))
+        self.assertEqual(req.data.read(5) + req.data.read(), raw)
+
+        # consumed again
+        req.data.seek(0)
+        self.assertEqual(req.data.getvalue(), raw)
+        self.assertEqual(req.data.getvalue(), raw)
+
+        # the source could not be rewound
+        body = io.StreamBody(iter([six.b('a'), six.b('b')]))
+        self.assertEqual(body.getvalue(), six.b('ab'))
+        self.assertRaises(ValueError, body.getvalue)
+        self.assertRaises(ValueError, body.seek, 0)
+        body = io.StreamBody([six.b('a'), six.b('b')])
+        self.assertEqual(body.getvalue(), six.b('ab'))
+        self.assertEqual(body.getvalue(), six.b('ab'))
+
+        # also works with call_many
+        (req, _), = op.call_many([dict(body=six.BytesIO(raw))])
+        req.prepare()
+        self.assertEqual(req.data, raw)
+
+    def test_mime_policy(self):
+        """ choose among consumes/produces by MimePolicy
+        """
+        # the first one without policy
+        op = self.app.op['user.export']
+        self.assertEqual(op._mime_codec.choose(op.consumes), 'application/xml')
+        req, _ = op(body=dict(a=1))
+        req.consume('application/json').prepare()
+        self.assertEqual(req.header['Accept'], 'application/xml')
+
+        mime_codec = primitives.MimeCodec(policy=primitives.MimePolicy())
+        mime_codec.register('application/msgpack', primitives.codec.PlainCodec())
+        app = App.load(get_test_data_folder(
+            version='2.0',
+            which=os.path.join('io', 'request')
+        ), mime_codec=mime_codec)
+        app.prepare()
+        op = app.op['user.export']
+
+        # the cheapest one with codec
+        req, _ = op(body=six.BytesIO(six.b('packed')))
+        req.prepare()
+        self.assertEqual(req.header['Content-Type'], 'application/msgpack')
+        self.assertEqual(req.header['Accept'], 'application/msgpack')
+        self.assertEqual(req.data, six.b('packed'))
+
+        # preference weights
+        mime_codec.policy = primitives.MimePolicy(weights={'Application/JSON': 1})
+        req, _ = op(body=dict(a=1))
+        req.prepare()
+        self.assertEqual(req.header['Content-Type'], 'application/json')
+
+        # explicit ones are respected
+        req, _ = op(body=six.BytesIO(six.b('packed')))
+        req.consume('application/msgpack').produce('application/xml').prepare()
+        self.assertEqual(req.header['Content-Type'], 'application/msgpack')
+        self.assertEqual(req.header['Accept'], 'application/xml')
+
+        # the first one when none has a codec
+        self.assertEqual(mime_codec.choose(['text/xml', 'text/csv']), 'text/xml')
+        self.assertEqual(mime_codec.choose([]), None)
+
+    def test_compression(self):
+        """ request bodies are compressed by the compression policy
+        """
+        compression = primitives.Compression(accept=['gzip'], threshold=100)
+        app = App.load(get_test_data_folder(
+            version='2.0',
+            which=os.path.join('io', 'request')
+        ), mime_codec=primitives.MimeCodec(compression=compression))
+        app.prepare()
+        op = app.op['user.export']
+
+        # larger than threshold
+        body = dict(('key{0}'.format(i), 'value') for i in range(20))
+        req, _ = op(body=body)
+        req.consume('application/json').prepare()
+        self.assertEqual(req.header['Content-Encoding'], 'gzip')
+        self.assertEqual(req.header['Accept-Encoding'], 'gzip')
+        self.assertEqual(json.loads(compression.decompress('gzip', req.data).decode('utf-8')), body)
+
+        # smaller than threshold
+        req, _ = op(body=dict(a=1))
+        req.consume('application/json').prepare()
+        self.assertFalse('Content-Encoding' in req.header)
+        self.assertEqual(json.loads(req.data), dict(a=1))
+
+        # streamed, length is unknown after compressed
+        raw = six.b(json.dumps(body))
+        req, _ = op(body=six.BytesIO(raw))
+        req.consume('application/json').prepare(stream=True)
+        self.assertEqual(req.header['Content-Encoding'], 'gzip')
+        self.assertFalse('Content-Length' in req.header)
+        self.assertEqual(compression.decompress('gzip', req.data.getvalue()), raw)
+
+        # disabled
+        compression.encoding = None
+        req, _ = op(body=body)
+        req.consume('application/json').prepare()
+        self.assertFalse('Content-Encoding' in req.header)
+
+    def test_plan(self):
+        """ make sure call plan of Operation is compiled correctly
+        """
+        op = self.app.op['user.login']
+        plan = op.plan
+        self.assertEqual(id(plan), id(op.plan))
+        self.assertEqual([(p.name, p.bucket) for p in plan.params], [('user_id', 'path'), ('password', 'path')])
+        self.assertEqual(plan.required, frozenset(['user_id', 'password']))
+        self.assertEqual(plan.body, None)
+
+        plan = self.app.op['missing.parameter'].plan
+        self.assertEqual(plan.body.name, 'body')
+        self.assertEqual(plan.content_type, 'application/json')
+
+        # errors are raised as before
+        self.assertRaises(ValueError, op, user_id='a')
+        self.assertRaises(ValueError, op, user_id='a', password='b', unknown='c')
+
+    def test_required(self):
+        """ missing required parameters are reported before any value is converted
+        """
+        op = self.app.op['user.level']
+        k = dict(level='not an integer')
+
+        try:
+            op(**k)
+        except ValueError as e:
+            self.assertEqual(str(e), 'requires parameter: user_id')
+        else:
+            self.fail('ValueError is not raised')
+
+        errs = []
+        self.assertEqual(list(op.call_many([k], on_error=lambda i, k, e: errs.append(str(e)))), [])
+        self.assertEqual(errs, ['requires parameter: user_id'])
+
+        # converted when all required ones are provided
+        self.assertRaises(ValueError, op, level='not an integer', user_id='a')
+        req, _ = op(level='1', user_id='a')
+        req.prepare()
+        self.assertEqual(req.query, [('level', '1')])
+
+    def test_precompile(self):
+        """ make sure App.prepare(precompile=True) compiles call plans
+        """
+        for lazy in (False, True):
+            app = App.load(get_test_data_folder(
+                version='2.0',
+                which=os.path.join('io', 'request')
+            ))
+            app.prepare(lazy=lazy, precompile=True)
+            op = app.op['user.login']
+            self.assertNotEqual(getattr(op, '_call_plan', None), None)
+
+            req, _ = op(user_id='a', password='b')
+            req.prepare()
+            self.assertEqual(req.url, 'http://test.com/v1/user/login/a/b')
+
+    def test_call_many(self):
+        """ make sure Operation.call_many works like Operation.__call__
+        """
+        op = self.app.op['user.login']
+        ks = [
+            dict(user_id='a', password='b'),
+            dict(user_id='c'), # missing required
+            dict(user_id='d', password='e', unknown='f'), # unknown
+            dict(user_id='g', password='h'),
+        ]
+
+        errs = []
+        g = op.call_many(iter(ks), on_error=lambda i, k, e: errs.append((i, type(e))), chunk_size=3)
+        self.assertTrue(isinstance(g, types.GeneratorType))
+
+        urls = []
+        for req, resp in g:
+            self.assertTrue(isinstance(resp, io.Response))
+            req.prepare()
+            urls.append(req.url)
+
+        self.assertEqual(urls, ['http://test.com/v1/user/login/a/b', 'http://test.com/v1/user/login/g/h'])
+        self.assertEqual(errs, [(1, ValueError), (2, ValueError)])
+
+        # body parameter
+        (req, _), = self.app.op['missing.parameter'].call_many([dict(body=dict(f1='say', f2='hello'))])
+        req.prepare()
+        self.assertEqual(json.loads(req.data), {'f1': "say", 'f2': "hello"})
+
+
+class MultipartEncoderTestCase(unittest.TestCase):
+    """ test MultipartEncoder """
+
+    @classmethod
+    def setUpClass(kls):
+        kls.app = App.create(get_test_data_folder(
+            version='2.0',
+            which=os.path.join('io', 'files')
+        ))
+
+    def _files(self):
+        return [dict(data=six.BytesIO(six.b('test image {0}'.format(i) * 100)), filename='_{0}.k'.format(i)) for i in range(3)]
+
+    def test_compression(self):
+        """ multipart bodies are not compressed by the compression policy
+        """
+        compression = primitives.Compression(accept=['gzip'], threshold=10)
+        app = App.load(get_test_data_folder(
+            version='2.0',
+            which=os.path.join('io', 'files')
+        ), mime_codec=primitives.MimeCodec(compression=compression))
+        app.prepare()
+
+        for stream in (False, True):
+            req, _ = app.op['upload_images'](images=self._files())
+            req.prepare(stream=stream)
+            self.assertFalse('Content-Encoding' in req.header)
+            self.assertEqual(req.header['Accept-Encoding'], 'gzip')
+            body = req.data.getvalue() if stream else req.data
+            self.assertTrue(body.find(six.b('test image 1')) != -1)
+            self.assertTrue(req.header['Content-Type'].startswith('multipart/form-data'))
+
+    def test_stream(self):
+        """ make sure streamed body is the same as the buffered one
+        """
+        req, _ = self.app.op['upload_images'](images=self._files())
+        req.prepare()
+        data = req.data
+        boundary = req.header['Content-Type'].split('boundary=')[1]
+
+        req, _ = self.app.op['upload_images'](images=self._files())
+        req.prepare(stream=True)
+        self.assertTrue(isinstance(req.data, io.MultipartEncoder))
+        self.assertEqual(req.header['Content-Length'], str(len(data)))
+        self.assertEqual(req.data.len, len(data))
+
+        req.data.chunk_size = 7
+        body = req.data.getvalue()
+        self.assertEqual(body.replace(six.b(req.data.content_type.split('boundary=')[1]), six.b(boundary)), data)
+
+    def test_read(self):
+        """ file-like interface
+        """
+        req, _ = self.app.op['upload_images'](images=self._files())
+        req.prepare(stream=True)
+        enc = req.data
+
+        chunks = []
+        while True:
+            chunk = enc.read(100)
+            if not chunk:
+                break
+            self.assertTrue(len(chunk) <= 100)
+            chunks.append(chunk)
+        self.assertEqual(len(six.b('').join(chunks)), enc.len)
+
+    def test_consume_twice(self):
+        """ make sure the body is the same when consumed again (retries, redirects)
+        """
+        req, _ = self.app.op['upload_images'](images=self._files())
+        req.prepare(stream=True)
+        enc = req.data
+
+        body = enc.getvalue()
+        self.assertEqual(enc.getvalue(), body)
+
+        # file-like interface, rewound by seek
+        self.assertEqual(enc.read(10), body[:10])
+        self.assertEqual(enc.tell(), 10)
+        enc.seek(0)
+        self.assertEqual(enc.tell(), 0)
+        self.assertEqual(enc.read(), body)
+        self.assertRaises(ValueError, enc.seek, 5)
+
+    def test_unknown_length(self):
+        """ size of text file-like is unknown
+        """
+        req, _ = self.app.op['upload_images'](images=[dict(data=six.StringIO('test image'), filename='_0.k')])
+        req.prepare(stream=True)
+        self.assertEqual(req.data.len, None)
+        self.assertFalse('Content-Length' in req.header)
+        self.assertTrue(req.data.getvalue().find(six.b('test image')) != -1)
+
 
 class ResponseTestCase(unittest.TestCase):
     """ test Response """
@@ -153,4 +497,80 @@ class ResponseTestCase(unittest.TestCase):
         resp = io.Response(self.app.s('/resp2').get)
         resp.apply_with(status=200, raw=six.BytesIO(six.u('{"message":"測試資料A"}').encode('utf8')).getvalue())
 
+    def test_iter_data(self):
+        """ items of an array are parsed incrementally
+        """
+        items = [dict(id=i, message='item {0}'.format(i)) for i in range(10)]
+        raw = six.b(json.dumps(items))
+
+        resp = io.Response(self.app.s('/resp3').get)
+        resp.apply_with(status=0)
+        chunks = [raw[i:i+3] for i in range(0, len(raw), 3)]
+        ret = list(resp.iter_data(stream=iter(chunks)))
+        self.assertEqual(ret, items)
+        self.assertTrue(isinstance(ret[0], primitives.Model))
+        self.assertEqual(resp.data, None)
+
+        # addressed by JSON pointer, from Response.raw_stream
+        resp = io.Response(self.app.s('/resp3').get)
+        resp.apply_with(status=200)
+        resp.raw_stream = six.BytesIO(six.b(json.dumps(dict(data=items, total=10))))
+        self.assertEqual(list(resp.iter_data('/data')), items)
+
+        # invalid item is raised when reached
+        resp = io.Response(self.app.s('/resp3').get)
+        resp.apply_with(status=0)
+        g = resp.iter_data(stream=six.b('[{"id": 1}, {"id": "a"}]'))
+        self.assertEqual(next(g), dict(id=1))
+        self.assertRaises(ValueError, next, g)
+
+        # not an array
+        resp = io.Response(self.app.s('/resp3').get)
+        resp.apply_with(status=200)
+        self.assertRaises(ValueError, list, resp.iter_data('/total', stream=six.b('{}')))
+
+    def test_decompress(self):
+        """ body is decompressed according to Content-Encoding
+        """
+        items = [dict(id=i, message='item {0}'.format(i)) for i in range(3)]
+        compression = primitives.Compression()
+        raw = six.b(json.dumps(items))
+        data = compression.compress(raw)
+        app = App.load(get_test_data_folder(
+            version='2.0',
+            which=os.path.join('io', 'response')
+        ), mime_codec=primitives.MimeCodec(compression=compression))
+        app.prepare()
+
+        resp = io.Response(app.s('/resp3').get)
+        resp.apply_with(status=0, header={'Content-Encoding': 'gzip'}, raw=data)
+        self.assertEqual(resp.raw, raw)
+        self.assertEqual(resp.data, items)
+
+        # streamed
+        resp = io.Response(app.s('/resp3').get)
+        resp.apply_with(status=0, header={'Content-Encoding': 'gzip'})
+        resp.raw_stream = iter([data[i:i+3] for i in range(0, len(data), 3)])
+        self.assertEqual(list(resp.iter_data()), items)
+
+        # kept as it is without compression policy
+        resp = io.Response(self.app.s('/resp3').get)
+        resp.raw_body_only = True
+        resp.apply_with(status=0, header={'Content-Encoding': 'gzip'}, raw=data)
+        self.assertEqual(resp.raw, data)
+
+    def test_iter_data_ndjson(self):
+        """ Response.iter_data with NDJSON
+        """
+        items = [dict(id=i, message='item {0}'.format(i)) for i in range(3)]
+
+        resp = io.Response(self.app.s('/resp3').get)
+        resp.apply_with(status=0, header={'Content-Type': 'application/x-ndjson'})
+        stream = six.BytesIO(six.b(''.join(json.dumps(i) + '\n' for i in items)))
+        self.assertEqual(list(resp.iter_data(stream=stream)), items)
 
+        # the whole body
+        resp = io.Response(self.app.s('/resp3').get)
+        resp.apply_with(status=0, header={'Content-Type': 'application/x-ndjson'}, raw=stream.getvalue())
+        self.assertTrue(isinstance(resp.data, primitives.Array))
+        self.assertEqual(resp.data, items)
@@ -0,0 +1,115 @@
+from pyswagger import App
+from pyswagger.primitives import Model
+from ..utils import get_test_data_folder
+from ...utils import final
+import unittest
+import json
+
+
+class LazyPrepareTestCase(unittest.TestCase):
+    """ test App.prepare(lazy=True) """
+
+    @classmethod
+    def setUpClass(kls):
+        folder = get_test_data_folder(version='2.0', which='wordnik')
+        kls.app = App.create(folder)
+        kls.lazy_app = App.load(folder)
+        kls.lazy_app.prepare(lazy=True)
+
+    def test_op_keys(self):
+        """ make sure all Operation(s) are collected """
+        self.assertEqual(sorted(self.lazy_app.op.keys()), sorted(self.app.op.keys()))
+
+    def test_on_demand(self):
+        """ make sure only accessed Operation(s) are prepared """
+        app = App.load(get_test_data_folder(version='2.0', which='wordnik'))
+        app.prepare(lazy=True)
+
+        store = app.resolve('#/paths/~1store~1order').post
+        self.assertEqual(store.method, None)
+
+        op = app.op['getUserByName']
+        self.assertEqual(op.method, 'get')
+        self.assertEqual(op.path, '/user/{username}')
+        # other Operation in the same PathItem is prepared as well
+        self.assertEqual(app.resolve('#/paths/~1user~1{username}').put.method, 'put')
+
+        # Operation in other PathItem is untouched
+        self.assertEqual(store.method, None)
+
+    def test_same_as_eager(self):
+        """ make sure prepared Operation(s) are the same as eager preparation """
+        for k in self.app.op.keys():
+            op, lazy_op = self.app.op[k], self.lazy_app.op[k]
+            self.assertEqual(lazy_op.compare(op), (True, ''))
+            self.assertEqual(lazy_op.url, op.url)
+            self.assertEqual(lazy_op.method, op.method)
+            self.assertEqual(lazy_op.cached_schemes, op.cached_schemes)
+            self.assertEqual(
+                [final(p).name for p in lazy_op.parameters],
+                [final(p).name for p in op.parameters]
+            )
+
+    def test_schema(self):
+        """ make sure Schema(s) reachable from Operation are prepared """
+        app = App.load(get_test_data_folder(version='2.0', which='wordnik'))
+        app.prepare(lazy=True)
+
+        pet = app.resolve('#/definitions/Pet')
+        self.assertEqual(pet.name, None)
+
+        app.op['addPet']
+        self.assertEqual(pet.name, 'Pet')
+        self.assertNotEqual(pet.final, None)
+        self.assertEqual(app.resolve('#/definitions/Category').name, 'Category')
+
+        # access via App.m
+        self.assertEqual(app.m['User'].name, 'User')
+
+    def test_shortcut(self):
+        """ make sure App.s prepares the requested PathItem """
+        app = App.load(get_test_data_folder(version='2.0', which='wordnik'))
+        app.prepare(lazy=True)
+
+        req, resp = app.s('pet/{petId}').get(petId=1)
+        req.prepare()
+        self.assertEqual(req.url, 'http://petstore.swagger.io/v2/pet/1')
+
+        resp.apply_with(status=200, raw=json.dumps(dict(id=1, name='Tom', photoUrls=[])))
+        self.assertTrue(isinstance(resp.data, Model))
+        self.assertEqual(resp.data.name, 'Tom')
+
+    def test_iterate(self):
+        """ make sure Operation(s), Schema(s) accessed via iteration are prepared """
+        def _app():
+            app = App.load(get_test_data_folder(version='2.0', which='wordnik'))
+            app.prepare(lazy=True)
+            return app
+
+        # plan of an unprepared Operation is never compiled
+        app = _app()
+        store = app.resolve('#/paths/~1store~1order').post
+        self.assertRaises(Exception, store.compile)
+        self.assertEqual(getattr(store, '_call_plan', None), None)
+
+        for ops in (
+            lambda app: [op for _, op in app.op.items()],
+            lambda app: app.op.values(),
+            lambda app: [app.resolve('#/paths/~1pet~1{petId}').get for _ in app.op],
+        ):
+            for op in ops(_app()):
+                self.assertNotEqual(op.method, None)
+
+        app = _app()
+        self.assertEqual(app.op.get('not_existed'), None)
+        k = [k for k in app.op.keys() if k.endswith('getPetById')][0]
+        req, _ = app.op.get(k)(petId=1)
+        req.prepare()
+        self.assertEqual(req.url, 'http://petstore.swagger.io/v2/pet/1')
+
+        app = _app()
+        for m in app.m.values():
+            self.assertNotEqual(m.name, None)
+        app = _app()
+        for k in app.m:
+            self.assertEqual(app.resolve('#/definitions/' + k).name, k)
@@ -4,9 +4,18 @@ from pyswagger.spec.v2_0 import objects, parser
 from pyswagger.spec import base
 from pyswagger.utils import jp_compose
 from pyswagger.primitives import Primitive
+from pyswagger.primitives.codegen import CodegenPrimitive
+from pyswagger.primitives.slots import SlotsPrimitive, SlotsModel
+from pyswagger.primitives.encoder import SchemaEncoder
+from pyswagger.primitives.comm import PrimJSONEncoder
 import os
 import unittest
+import tempfile
+import shutil
 import datetime
+import array
+import json
+import pickle
 import six
 
 
@@ -455,6 +464,14 @@ class AdditionalPropertiesTestCase(unittest.TestCase):
         self.assertTrue('category1' not in m)
         self.assertTrue('category2' not in m)
 
+    def test_required_before_addp(self):
+        """ keys of additionalProperties don't satisfy required ones """
+        d = self.app.resolve('#/definitions/add_prop_required')
+        factory = self.app.prim_factory
+        for produce in (factory.produce, factory.produce_lazy):
+            self.assertRaises(ValueError, produce, d, dict(name='test', extra=1))
+            self.assertRaises(ValueError, produce, d, dict(name='test'))
+
     def test_with_allof_limitation(self):
         """ additionalProperties would accept all keys,
         we need to make sure nested model process those keys before
@@ -557,3 +574,450 @@ class PrimitiveExtensionTestCase(unittest.TestCase):
         m1 = app.resolve('#/definitions/m1')
         self.assertRaises(errs.ValidationError, m1._prim_, {'job':'man'}, app.prim_factory)
         # should raise
+
+
+class CompiledPrimitiveTestCase(unittest.TestCase):
+    """ test for Primitive.compile """
+
+    @classmethod
+    def setUpClass(kls):
+        kls.app = App._create_(get_test_data_folder(version='2.0', which=os.path.join('schema', 'model')))
+
+    def test_same_as_interpreted(self):
+        """ make sure compiled constructors produce the same primitives """
+        factory = self.app.prim_factory
+        tag = dict(id=1, name='Hairy')
+        pet = dict(
+            name='Buf',
+            photoUrls=['http://flickr.com'],
+            id=10,
+            category=dict(id=1, name='dog'),
+            tags=[tag, dict(id=2, name='south')],
+            unknown='not in properties',
+        )
+
+        for p, v in [
+            ('#/definitions/Tag', tag),
+            ('#/definitions/Pet', pet),
+            ('#/definitions/Boss', dict(id=1, location='office', boss_name='not you')),
+        ]:
+            obj = self.app.resolve(p)
+            ret, expected = factory.produce(obj, v), factory._produce(obj, v)
+            self.assertEqual(ret, expected)
+            self.assertEqual(sorted(ret.keys()), sorted(expected.keys()))
+
+        # the compiled constructor is cached
+        pet = self.app.resolve('#/definitions/Pet')
+        self.assertEqual(id(factory.compile(pet)), id(factory.compile(pet)))
+
+    def test_register(self):
+        """ make sure constructors are compiled again when handlers are registered """
+        factory = Primitive()
+        app = App.load(get_test_data_folder(version='2.0', which=os.path.join('schema', 'model')), prim=factory)
+        app.prepare()
+
+        tag = app.resolve('#/definitions/Tag')
+        self.assertEqual(factory.produce(tag, dict(id=1, name='Hairy')).name, 'Hairy')
+
+        factory.register('string', None, lambda obj, val, ctx: 'x' + val)
+        self.assertEqual(factory.produce(tag, dict(id=1, name='Hairy')).name, 'xHairy')
+
+
+class LazyPrimitiveTestCase(unittest.TestCase):
+    """ test for Primitive.produce_lazy """
+
+    @classmethod
+    def setUpClass(kls):
+        kls.app = App._create_(get_test_data_folder(version='2.0', which=os.path.join('schema', 'model')))
+
+    def _pet(self):
+        return dict(
+            name='Buf',
+            photoUrls=['http://flickr.com'],
+            id=10,
+            category=dict(id=1, name='dog'),
+            tags=[dict(id=1, name='Hairy'), dict(id='not an integer', name='south')],
+            unknown='not in properties',
+        )
+
+    def test_lazy(self):
+        """ sub-trees are converted when accessed """
+        factory = self.app.prim_factory
+        pet = self.app.resolve('#/definitions/Pet')
+
+        v = factory.produce_lazy(pet, self._pet())
+        self.assertTrue(isinstance(v, primitives.LazyModel))
+        self.assertEqual(v.unknown, 'not in properties')
+        self.assertEqual(v.name, 'Buf')
+        self.assertTrue(isinstance(v.category, primitives.LazyModel))
+        self.assertEqual(v.category.name, 'dog')
+        self.assertTrue(isinstance(v.tags, primitives.LazyArray))
+        self.assertEqual(len(v.tags), 2)
+        self.assertEqual(v.tags[0].id, 1)
+
+        # invalid item is found when accessed
+        self.assertRaises(ValueError, lambda: v.tags[1].id)
+        self.assertRaises(ValueError, v.materialize)
+
+        # the same as eager ones
+        p = self._pet()
+        p['tags'].pop()
+        v = factory.produce_lazy(pet, p)
+        self.assertEqual(v, factory.produce(pet, p))
+        self.assertEqual(id(v.materialize()), id(v))
+        self.assertEqual(dict(v), dict(factory.produce(pet, p)))
+
+        # checks of Model itself are not deferred
+        self.assertRaises(ValueError, factory.produce_lazy, pet, dict(id=1))
+
+    def test_response(self):
+        """ Response.lazy_data """
+        app = App._create_(get_test_data_folder(version='2.0', which=os.path.join('io', 'response')))
+        resp = io.Response(app.s('/resp').get)
+        resp.lazy_data = True
+        resp.apply_with(404, '{"id": 0, "message": "test string 2"}')
+        self.assertTrue(isinstance(resp.data, primitives.LazyModel))
+        self.assertEqual(resp.data.message, 'test string 2')
+
+    def test_not_lazy(self):
+        """ materialize() works for schemas produced as usual """
+        factory = self.app.prim_factory
+        for name, val in (('Employee', dict(id=1, skill_id=2, location='home', skill_name='coding', email='a@a.com')),
+                          ('Boss', dict(id=1, location='office', boss_name='not you'))):
+            v = factory.produce_lazy(self.app.resolve(jp_compose(name, '#/definitions')), val)
+            self.assertFalse(isinstance(v, primitives.LazyModel))
+            self.assertEqual(id(v.materialize()), id(v))
+
+        v = primitives.Array()
+        self.assertEqual(id(v.materialize()), id(v))
+
+
+def _installed(name):
+    try:
+        __import__(name)
+    except ImportError:
+        return False
+    return True
+
+
+class ColumnarTestCase(unittest.TestCase):
+    """ test for Primitive.produce_columns """
+
+    @classmethod
+    def setUpClass(kls):
+        kls.app = App._create_(get_test_data_folder(version='2.0', which=os.path.join('schema', 'model')))
+
+    def _rows(self):
+        return [
+            dict(ts=1000, id=1, value=1.5, kind='a', ok=True, unknown='not in properties'),
+            dict(ts=2000, value=100, kind='b', ok=False),
+            dict(ts=3000, id=3, ok=True),
+        ]
+
+    def _produce(self, val, use_numpy=False, p='Samples'):
+        return self.app.prim_factory.produce_columns(self.app.resolve(jp_compose(p, '#/definitions')), val, use_numpy=use_numpy)
+
+    def test_array(self):
+        """ columns in array.array """
+        ret = self._produce(self._rows())
+        self.assertEqual(list(ret.keys()), ['id', 'kind', 'ok', 'ts', 'value'])
+        self.assertTrue(isinstance(ret['ts'], array.array))
+        self.assertEqual(list(ret['ts']), [1000, 2000, 3000])
+        self.assertEqual(ret['id'].typecode, 'i')
+        # default
+        self.assertEqual(list(ret['id']), [1, 0, 3])
+        self.assertEqual(ret['value'].typecode, 'd')
+        self.assertEqual(list(ret['value'])[:2], [1.5, 100.0])
+        # missing values
+        self.assertTrue(ret['value'][2] != ret['value'][2])
+        self.assertEqual(ret['kind'], ['a', 'b', None])
+        self.assertEqual([bool(v) for v in ret['ok']], [True, False, True])
+
+        # the same values as Primitive.produce
+        rows = self.app.prim_factory.produce(self.app.resolve('#/definitions/Samples'), self._rows())
+        self.assertEqual(list(ret['ts']), [r.ts for r in rows])
+
+        self.assertEqual(self._produce([])['ts'], array.array(ret['ts'].typecode))
+        self.assertEqual(self._produce(None), None)
+
+    @unittest.skipUnless(_installed('numpy'), 'numpy is not installed')
+    def test_numpy(self):
+        """ columns in numpy arrays """
+        import numpy
+        ret = self._produce(self._rows(), use_numpy=True)
+        for k in ret:
+            self.assertTrue(isinstance(ret[k], numpy.ndarray))
+        self.assertEqual(ret['ts'].dtype, numpy.int64)
+        self.assertEqual(ret['id'].tolist(), [1, 0, 3])
+        self.assertEqual(ret['value'].dtype, numpy.float64)
+        self.assertTrue(numpy.isnan(ret['value'][2]))
+        self.assertEqual(ret['ok'].dtype, numpy.bool_)
+        self.assertEqual(ret['ok'].tolist(), [True, False, True])
+        self.assertEqual(ret['kind'].tolist(), ['a', 'b', None])
+
+        self.assertRaises(errs.ValidationError, self._produce, [dict(ok=True, ts=1, value=-1)], True)
+        self.assertRaises(errs.ValidationError, self._produce, [dict(ok=True, ts=1, kind='c')], True)
+
+    def test_validation(self):
+        """ checks applied to columns """
+        self.assertRaises(ValueError, self._produce, [dict(ts=1, ok=True), dict(id=2, ok=True)])
+        self.assertRaises(ValueError, self._produce, [dict(ok=True, ts='not an integer')])
+        self.assertRaises(ValueError, self._produce, [[1, 2]])
+        self.assertRaises(errs.ValidationError, self._produce, [dict(ok=True, ts=1, value=100.5)])
+        self.assertRaises(errs.ValidationError, self._produce, [dict(ok=True, ts=1, value=-1)])
+        # NaN doesn't hide values out of range, and passes as in Primitive.produce
+        nan = float('nan')
+        self.assertRaises(errs.ValidationError, self._produce, [dict(ok=True, ts=1, value=nan), dict(ok=True, ts=2, value=500.0)])
+        self.assertRaises(errs.ValidationError, self._produce, [dict(ok=True, ts=1, value=-1.0), dict(ok=True, ts=2, value=nan)])
+        self.assertEqual(len(self._produce([dict(ok=True, ts=1, value=nan)])['value']), 1)
+        if _installed('numpy'):
+            self.assertRaises(errs.ValidationError, self._produce, [dict(ok=True, ts=1, value=nan), dict(ok=True, ts=2, value=500.0)], True)
+            self.assertRaises(errs.ValidationError, self._produce, [dict(ok=True, ts=1, value=-1.0), dict(ok=True, ts=2, value=nan)], True)
+            self.assertEqual(len(self._produce([dict(ok=True, ts=1, value=nan)], True)['value']), 1)
+        self.assertRaises(errs.ValidationError, self._produce, [dict(ok=True, ts=1, kind='c')])
+        self.assertRaises(errs.ValidationError, self._produce, [dict(ok=True, ts=1)] * 101)
+
+        # converted the same way as Primitive.produce
+        self.assertEqual(list(self._produce([dict(ok=True, ts='1', value='2.5')])['ts']), [1])
+
+    def test_as_model(self):
+        """ None is missing, and columns not fit in typecodes are plain lists """
+        rows = [dict(ts=None, id=None, ok=None, value=None), dict(ts=2 ** 70, id=2 ** 40, ok=True, value=1)]
+        ret = self._produce(rows)
+        expected = self.app.prim_factory.produce(self.app.resolve('#/definitions/Samples'), rows)
+        self.assertEqual(ret['ts'], [r.ts for r in expected])
+        self.assertEqual(ret['id'], [r.id for r in expected])
+        self.assertEqual(ret['ok'], [None, True])
+        self.assertEqual(ret['kind'], [None, None])
+        self.assertTrue(ret['value'][0] != ret['value'][0])
+        self.assertEqual(ret['value'].typecode, 'd')
+
+        # typecode by format
+        ret = self._produce([dict(ts=2 ** 40, id=2 ** 30, ok=True)])
+        self.assertEqual(ret['ts'].typecode, self._produce([])['ts'].typecode)
+        self.assertEqual(ret['id'].typecode, 'i')
+        self.assertEqual(list(ret['ts']), [2 ** 40])
+
+        if _installed('numpy'):
+            import numpy
+            ret = self._produce(rows, use_numpy=True)
+            self.assertEqual(ret['ts'].dtype, numpy.object_)
+            self.assertEqual(ret['ts'].tolist(), [None, 2 ** 70])
+            self.assertEqual(ret['ok'].tolist(), [None, True])
+
+    def test_not_supported(self):
+        """ only arrays of objects with primitive properties """
+        self.assertRaises(ValueError, self._produce, [], False, 'array_int')
+        self.assertRaises(ValueError, self._produce, [], False, 'unique_object')
+        self.assertRaises(ValueError, self._produce, [], False, 'Pet')
+
+    def test_response(self):
+        """ Response.columnar_data """
+        app = App._create_(get_test_data_folder(version='2.0', which=os.path.join('io', 'response')))
+        resp = io.Response(app.s('/resp3').get)
+        resp.columnar_data = True
+        resp.apply_with(201, '[{"id": 0, "message": "a"}, {"id": 1, "message": "b"}]')
+        self.assertEqual(list(resp.data['id']), [0, 1])
+        self.assertEqual(list(resp.data['message']), ['a', 'b'])
+
+
+class CodegenSchemaTestCase(SchemaTestCase):
+    """ test for Schema object, with CodegenPrimitive """
+
+    @classmethod
+    def setUpClass(kls):
+        kls.app = App.load(get_test_data_folder(version='2.0', which=os.path.join('schema', 'model')), prim=CodegenPrimitive())
+        kls.app.prepare()
+
+    def test_source(self):
+        """ make sure source is generated and could be reused """
+        folder = tempfile.mkdtemp()
+        try:
+            path = os.path.join(folder, 'generated.py')
+            pet = self.app.resolve('#/definitions/Pet')
+            self.assertTrue(self.app.prim_factory.source(pet).startswith('def '))
+            self.assertEqual(self.app.prim_factory.source(self.app.resolve('#/definitions/date')), None)
+            self.app.prim_factory.save(path)
+
+            factory = CodegenPrimitive(path)
+
+            # not generated again when loaded
+            def _generate(*a):
+                raise Exception('source is generated again')
+            factory._CodegenPrimitive__generate = _generate
+
+            app = App.load(get_test_data_folder(version='2.0', which=os.path.join('schema', 'model')), prim=factory)
+            app.prepare()
+            pet = app.resolve('#/definitions/Pet')
+            self.assertEqual(factory.source(pet), self.app.prim_factory.source(self.app.resolve('#/definitions/Pet')))
+
+            v = factory.produce(pet, dict(name='Buf', photoUrls=['a'], id=10, tags=[dict(id=1, name='x')]))
+            self.assertTrue(isinstance(v.tags[0], primitives.Model))
+            self.assertEqual(v.tags[0].name, 'x')
+        finally:
+            shutil.rmtree(folder)
+
+
+class SlotsPrimitiveTestCase(unittest.TestCase):
+    """ test for SlotsPrimitive """
+
+    @classmethod
+    def setUpClass(kls):
+        kls.app = App.load(get_test_data_folder(version='2.0', which=os.path.join('schema', 'model')), prim=SlotsPrimitive())
+        kls.app.prepare()
+
+    def _pet(self):
+        return dict(
+            name='Buf',
+            photoUrls=['http://flickr.com'],
+            id=10,
+            category=dict(id=1, name='dog'),
+            tags=[dict(id=1, name='Hairy')],
+            unknown='not in properties',
+        )
+
+    def test_access(self):
+        """ attribute and mapping access """
+        v = self.app.prim_factory.produce(self.app.resolve('#/definitions/Pet'), self._pet())
+        self.assertTrue(isinstance(v, SlotsModel))
+        self.assertFalse(hasattr(v, '__dict__'))
+        self.assertEqual(v.name, 'Buf')
+        self.assertEqual(v['id'], 10)
+        self.assertEqual(v.category.name, 'dog')
+        self.assertTrue(isinstance(v.tags[0], SlotsModel))
+        self.assertEqual(v.tags[0]['name'], 'Hairy')
+        self.assertEqual(sorted(v.keys()), ['category', 'id', 'name', 'photoUrls', 'tags', 'unknown'])
+        self.assertEqual(len(v), 6)
+
+        # not in properties
+        self.assertEqual(v.unknown, 'not in properties')
+        self.assertEqual(v._extra, dict(unknown='not in properties'))
+
+        # unset
+        self.assertFalse('status' in v)
+        self.assertRaises(KeyError, lambda: v['status'])
+        self.assertRaises(KeyError, getattr, v, 'status')
+        self.assertRaises(AttributeError, getattr, v, 'not_existed')
+
+        v.status = 'sold'
+        self.assertEqual(v['status'], 'sold')
+        del v['status']
+        self.assertFalse('status' in v)
+        self.assertRaises(KeyError, v.__delitem__, 'status')
+
+    def test_additional_properties(self):
+        """ additionalProperties overflow into a side dict """
+        event = self.app.prim_factory.produce(self.app.resolve('#/definitions/Event'), dict(
+            id=1, at='2015-04-01T12:34:56.789Z', signature='some bytes', extra='2015-04-03'))
+        self.assertTrue(isinstance(event.at, primitives.Datetime))
+        self.assertTrue(isinstance(event.extra, primitives.Date))
+        self.assertEqual(list(event._extra.keys()), ['extra'])
+
+    def test_eq(self):
+        """ comparison with dict and Model """
+        pet = self.app.resolve('#/definitions/Pet')
+        v = self.app.prim_factory.produce(pet, self._pet())
+        expected = Primitive().produce(pet, self._pet())
+        self.assertTrue(isinstance(expected, primitives.Model))
+        self.assertEqual(v, expected)
+        self.assertEqual(expected, v)
+        self.assertEqual(v, self._pet())
+        self.assertNotEqual(v, dict(name='Buf'))
+        self.assertNotEqual(v, None)
+
+    def test_eq_as_model(self):
+        """ the same result as Model, None is regarded as missing """
+        pet = self.app.resolve('#/definitions/Pet')
+        v = self.app.prim_factory.produce(pet, self._pet())
+        m = Primitive().produce(pet, self._pet())
+        for other in (dict(self._pet(), status=None), dict(self._pet(), status='sold'),
+                      dict(self._pet(), unknown=None), dict(self._pet(), name=None), None):
+            self.assertEqual(v == other, m == other)
+            self.assertEqual(v != other, m != other)
+        self.assertTrue(v == dict(self._pet(), status=None))
+
+    def test_json(self):
+        """ encoded in JSON via PrimJSONEncoder and SchemaEncoder """
+        event = self.app.resolve('#/definitions/Event')
+        val = dict(id=1, at='2015-04-01T12:34:56.789Z', days=['2015-04-01'], category=dict(id=1, name='x'), extra='2015-04-03')
+        v = self.app.prim_factory.produce(event, val)
+        # the same as Model
+        expected = json.loads(json.dumps(Primitive().produce(event, val), cls=PrimJSONEncoder))
+        self.assertEqual(expected['extra'], '2015-04-03')
+        self.assertEqual(json.loads(json.dumps(v, cls=PrimJSONEncoder)), expected)
+        self.assertEqual(json.loads(SchemaEncoder().encode(event, v)), expected)
+
+    def test_pickle(self):
+        """ unpickled as Model """
+        v = self.app.prim_factory.produce(self.app.resolve('#/definitions/Pet'), self._pet())
+        p = pickle.loads(pickle.dumps(v))
+        self.assertTrue(isinstance(p, primitives.Model))
+        self.assertEqual(p, v)
+
+
+class SchemaEncoderTestCase(unittest.TestCase):
+    """ test for SchemaEncoder """
+
+    @classmethod
+    def setUpClass(kls):
+        kls.app = App._create_(get_test_data_folder(version='2.0', which=os.path.join('schema', 'model')))
+
+    def _check(self, path, val):
+        """ the same JSON as json.dumps """
+        obj = self.app.resolve(jp_compose(path, '#/definitions'))
+        data, expected = SchemaEncoder().encode(obj, val), json.dumps(val, cls=PrimJSONEncoder)
+        self.assertEqual(type(data), type(expected))
+        self.assertEqual(json.loads(data), json.loads(expected))
+        return data
+
+    def _event(self):
+        return self.app.prim_factory.produce(self.app.resolve('#/definitions/Event'), dict(
+            id=1,
+            at='2015-04-01T12:34:56.789Z',
+            signature='some bytes',
+            days=['2015-04-01', '2015-04-02'],
+            category=dict(id=1, name=six.u('\u00e9\n"')),
+            extra='2015-04-03',
+        ))
+
+    def test_primitives(self):
+        factory = self.app.prim_factory
+        event = self._event()
+        self._check('Event', event)
+        # not modified
+        self.assertTrue(isinstance(event.at, primitives.Datetime))
+
+        for name, v in (
+            ('byte', 'some bytes'),
+            ('date', datetime.date(2015, 4, 1)),
+            ('date-time', '2015-04-01T12:34:56.789Z'),
+            ('uuid', '12345678-1234-5678-1234-567812345678'),
+            ('number_int64', 100),
+            ('default_number', 10.0),
+            ('model_bool', dict(bool_val=False)),
+            ('array_int', [1, 2, 3]),
+        ):
+            self._check(name, factory.produce(self.app.resolve(jp_compose(name, '#/definitions')), v))
+
+        self._check('Pet', factory.produce(self.app.resolve('#/definitions/Pet'), dict(
+            name='Buf', photoUrls=['http://flickr.com'], id=10, category=dict(id=1, name='dog'), tags=[dict(id=1)])))
+
+        # allOf, discriminator
+        self._check('Boss', factory.produce(self.app.resolve('#/definitions/Boss'), dict(
+            name='Tom', email='a@b.com', skills=[dict(name='a')], employees=[], boss_level=1)))
+
+    def test_not_produced(self):
+        """ values not created by Primitive.produce """
+        self._check('Event', dict(at='2015-04-01', days='not a list', category=[1], extra=None))
+        self._check('Event', dict())
+        self._check('number_int64', float('inf'))
+
+    def test_compile(self):
+        """ compiled once per Schema """
+        encoder, event = SchemaEncoder(), self.app.resolve('#/definitions/Event')
+        self.assertEqual(id(encoder.compile(event)), id(encoder.compile(event)))
+        self.assertNotEqual(id(encoder.compile(event)), id(SchemaEncoder().compile(event)))
+
+        # nothing to convert
+        self.assertEqual(encoder.compile(self.app.resolve('#/definitions/Pet')), None)
+        self.assertEqual(encoder.compile(self.app.resolve('#/definitions/Boss')), None)
@@ -73,6 +73,15 @@ class ResolveTestCase(unittest.TestCase):
         self.assertRaises(ValueError, self.app.resolve, None)
         self.assertRaises(ValueError, self.app.resolve, '')
 
+    def test_index(self):
+        """ make sure resolved objects are indexed """
+        d1 = self.app.resolve('#/definitions/d1')
+        self.assertEqual(id(d1), id(self.app.resolve('#/definitions/d1')))
+
+        # containers are not indexed
+        self.assertTrue(isinstance(self.app.resolve('#/definitions'), dict))
+        self.assertTrue(isinstance(self.app.resolve('#/paths/~1a/get/parameters'), list))
+
 
 class DerefTestCase(unittest.TestCase):
     """ test for pyswagger.utils.deref """
@@ -10,6 +10,8 @@ import os
 import operator
 import functools
 import collections
+import hashlib
+import bisect
 
 #TODO: accept varg
 def scope_compose(scope, name, sep=private.SCOPE_SEPARATOR):
@@ -45,8 +47,16 @@ class ScopeDict(dict):
     """
     def __init__(self, *a, **k):
         self.__sep = private.SCOPE_SEPARATOR
+        self.__reset()
         super(ScopeDict, self).__init__(*a, **k)
 
+    def __reset(self):
+        # sorted list of reversed keys, keys sharing the same
+        # suffix are adjacent in this list.
+        self.__rkeys = None
+        # cache of partial key -> key
+        self.__found = {}
+
     @property
     def sep(self):
         """ separator property
@@ -58,6 +68,48 @@ class ScopeDict(dict):
         """ update separater used here
         """
         self.__sep = sep
+        self.__reset()
+
+    def __setitem__(self, k, v):
+        self.__reset()
+        super(ScopeDict, self).__setitem__(k, v)
+
+    def __delitem__(self, k):
+        self.__reset()
+        super(ScopeDict, self).__delitem__(k)
+
+    def clear(self):
+        self.__reset()
+        super(ScopeDict, self).clear()
+
+    def pop(self, *a):
+        self.__reset()
+        return super(ScopeDict, self).pop(*a)
+
+    def popitem(self):
+        self.__reset()
+        return super(ScopeDict, self).popitem()
+
+    def setdefault(self, *a):
+        self.__reset()
+        return super(ScopeDict, self).setdefault(*a)
+
+    def update(self, *a, **k):
+        self.__reset()
+        super(ScopeDict, self).update(*a, **k)
+
+    def __endswith(self, k):
+        """ list of keys ending with k
+        """
+        if self.__rkeys == None:
+            self.__rkeys = sorted(ik[::-1] for ik in self.keys())
+
+        rk, ret = k[::-1], []
+        for i in six.moves.xrange(bisect.bisect_left(self.__rkeys, rk), len(self.__rkeys)):
+            if not self.__rkeys[i].startswith(rk):
+                break
+            ret.append(self.__rkeys[i][::-1])
+        return ret
 
     def __getitem__(self, *keys):
         """ to access an obj with key: 'n!##!m...!##!z', caller can pass as key:
@@ -72,11 +124,12 @@ class ScopeDict(dict):
         try:
             return super(ScopeDict, self).__getitem__(k)
         except KeyError as e:
-            ret = []
-            for ik in self.keys():
-                if ik.endswith(k):
-                    ret.append(ik)
+            if k in self.__found:
+                return super(ScopeDict, self).__getitem__(self.__found[k])
+
+            ret = self.__endswith(k)
             if len(ret) == 1:
+                self.__found[k] = ret[0]
                 return super(ScopeDict, self).__getitem__(ret[0])
             elif len(ret) > 1:
                 # special case for the last token:
@@ -86,6 +139,7 @@ class ScopeDict(dict):
                 last_k = k.rsplit(self.__sep, 1)[-1]
                 matched = [r for r in ret if r.rsplit(self.__sep, 1)[-1] == last_k]
                 if len(matched) == 1:
+                    self.__found[k] = matched[0]
                     return super(ScopeDict, self).__getitem__(matched[0])
 
                 raise ValueError('Multiple occurrence of key: {0}'.format(k))
@@ -397,6 +451,30 @@ def normalize_jr(jr, url=None):
     else:
         return '#' + jp
 
+def get_external_refs(obj, url):
+    """ collect urls of external documents referred by $ref
+    in a loaded json/yaml object.
+
+    :param obj: the loaded json/yaml object
+    :param str url: url of that object, relative references are normalized against it
+    :return: urls of referred documents
+    :rtype: set of str
+    """
+    ret, stk = set(), [obj]
+    while len(stk):
+        o = stk.pop()
+        if isinstance(o, dict):
+            r = o.get('$ref', None)
+            if isinstance(r, six.string_types):
+                u, _ = jr_split(normalize_jr(r, url))
+                if u and u != url:
+                    ret.add(u)
+            stk.extend(six.itervalues(o))
+        elif isinstance(o, list):
+            stk.extend(o)
+
+    return ret
+
 def _fullmatch(regex, chunk):
     m = re.match(regex, chunk)
     if m and m.span()[1] == len(chunk):
@@ -436,6 +514,32 @@ def get_swagger_version(obj):
         # should be an instance of BaseObj
         return obj.swaggerVersion if hasattr(obj, 'swaggerVersion') else obj.swagger
 
+def digest(obj, h=None):
+    """ feed a loaded json/yaml object into a hash in
+    a canonical way, keys of dict are sorted.
+
+    :param obj: the loaded json/yaml object
+    :param h: a hash object from hashlib, sha1 is used when None
+    :return: the updated hash object
+    """
+    h = hashlib.sha1() if h == None else h
+
+    if isinstance(obj, dict):
+        h.update(six.b('{'))
+        for k in sorted(six.iterkeys(obj), key=str):
+            digest(k, h)
+            digest(obj[k], h)
+        h.update(six.b('}'))
+    elif isinstance(obj, list):
+        h.update(six.b('['))
+        for v in obj:
+            digest(v, h)
+        h.update(six.b(']'))
+    else:
+        h.update('{0}:{1!r};'.format(type(obj).__name__, obj).encode('utf-8'))
+
+    return h
+
 def walk(start, ofn, cyc=None):
     """ Non recursive DFS to detect cycles
 
@@ -445,40 +549,119 @@ def walk(start, ofn, cyc=None):
     :return: cycles
     :rtype: list of lists
     """
-    ctx, stk = {}, [start]
+    # stack of vertices, position of vertices in stack,
+    # and iterators of outgoing edges of vertices in stack
+    stk, pos, its = [start], {start: 0}, [iter(list(ofn(start)))]
     cyc = [] if cyc == None else cyc
 
     while len(stk):
-        top = stk[-1]
-
-        if top not in ctx:
-            ctx.update({top:list(ofn(top))})
-
-        if len(ctx[top]):
-            n = ctx[top][0]
-            if n in stk:
-                # cycles found,
-                # normalize the representation of cycles,
-                # start from the smallest vertex, ex.
-                # 4 -> 5 -> 2 -> 7 -> 9 would produce
-                # (2, 7, 9, 4, 5)
-                nc = stk[stk.index(n):]
-                ni = nc.index(min(nc))
-                nc = nc[ni:] + nc[:ni] + [min(nc)]
-                if nc not in cyc:
-                    cyc.append(nc)
-
-                ctx[top].pop(0)
-            else:
-                stk.append(n)
+        n = next(its[-1], _end)
+        if n is _end:
+            pos.pop(stk.pop())
+            its.pop()
+        elif n in pos:
+            # cycles found,
+            # normalize the representation of cycles,
+            # start from the smallest vertex, ex.
+            # 4 -> 5 -> 2 -> 7 -> 9 would produce
+            # (2, 7, 9, 4, 5)
+            nc = stk[pos[n]:]
+            ni = nc.index(min(nc))
+            nc = nc[ni:] + nc[:ni] + [min(nc)]
+            if nc not in cyc:
+                cyc.append(nc)
         else:
-            ctx.pop(top)
-            stk.pop()
-            if len(stk):
-                ctx[stk[-1]].remove(top)
+            pos[n] = len(stk)
+            stk.append(n)
+            its.append(iter(list(ofn(n))))
 
     return cyc
 
+# sentinel for exhausted iterators
+_end = object()
+
+def get_scc(vertices, ofn):
+    """ Tarjan's strongly connected components algorithm, non recursive
+
+    :param vertices: start vertices in graph
+    :param ofn: function to get the list of outgoing edges of a vertex
+    :return: strongly connected components reachable from vertices
+    :rtype: list of lists
+    """
+    index, low, on_stk, stk, ret = {}, {}, set(), [], []
+
+    def _visit(v):
+        index[v] = low[v] = len(index)
+        stk.append(v)
+        on_stk.add(v)
+        return v, iter(ofn(v))
+
+    for v in vertices:
+        if v in index:
+            continue
+
+        work = [_visit(v)]
+        while len(work):
+            u, it = work[-1]
+            for w in it:
+                if w not in index:
+                    work.append(_visit(w))
+                    break
+                elif w in on_stk:
+                    low[u] = min(low[u], index[w])
+            else:
+                work.pop()
+                if len(work):
+                    p = work[-1][0]
+                    low[p] = min(low[p], low[u])
+
+                if low[u] == index[u]:
+                    c = []
+                    while True:
+                        w = stk.pop()
+                        on_stk.discard(w)
+                        c.append(w)
+                        if w == u:
+                            break
+                    ret.append(c)
+
+    return ret
+
+def get_cycles(vertices, ofn):
+    """ find all elementary cycles reachable from vertices, the result
+    is the same as calling 'walk' on each vertex. Strongly connected
+    components are found first, only components with cycles are
+    searched further.
+
+    :param vertices: start vertices in graph
+    :param ofn: function to get the list of outgoing edges of a vertex
+    :return: cycles, each is represented in a list started and ended with minimum vertex.
+    :rtype: list of lists
+    """
+    ret = []
+    for c in get_scc(vertices, ofn):
+        members = set(c)
+        adj = dict((v, sorted(set(w for w in ofn(v) if w in members))) for v in c)
+        if len(c) == 1 and c[0] not in adj[c[0]]:
+            continue
+
+        # cycles started from s, composed of vertices larger than s
+        for s in sorted(c):
+            stk, on_stk, its = [s], set([s]), [iter(adj[s])]
+            while len(stk):
+                n = next(its[-1], _end)
+                if n is _end:
+                    on_stk.discard(stk.pop())
+                    its.pop()
+                elif n == s:
+                    ret.append(stk + [s])
+                elif n > s and n not in on_stk:
+                    stk.append(n)
+                    on_stk.add(n)
+                    its.append(iter(adj[n]))
+
+    return sorted(ret)
+
 def _diff_(src, dst, ret=None, jp=None, exclude=[], include=[]):
     """ compare 2 dict/list, return a list containing
     json-pointer indicating what's different, and what's diff exactly.
@@ -596,6 +779,65 @@ def patch_path(base_path, path):
     return path
 
 
+_placeholder = re.compile(r'{([^{}]+)}')
+
+class PathTemplate(object):
+    """ a path or url with {name} placeholders, compiled into
+    literal/placeholder segments. Different from str.format,
+    names containing '.' are allowed.
+    """
+
+    def __init__(self, src):
+        """ constructor
+
+        :param str src: the template
+        """
+        self.__src = src
+        # literals at even positions, names at odd positions
+        self.__parts = _placeholder.split(src)
+        self.__names = tuple(self.__parts[1::2])
+        self.__patched = {}
+
+    @property
+    def src(self):
+        return self.__src
+
+    @property
+    def names(self):
+        """ names of placeholders, in order
+
+        :type: tuple of str
+        """
+        return self.__names
+
+    def render(self, values):
+        """ fill placeholders with values
+
+        :param dict values: name -> value
+        :raises KeyError: when a value of placeholder is not provided
+        :rtype: str
+        """
+        if not self.__names:
+            return self.__src
+
+        ret = list(self.__parts)
+        for i in six.moves.xrange(1, len(ret), 2):
+            ret[i] = values[ret[i]]
+        return ''.join(ret)
+
+    def with_netloc(self, netloc):
+        """ the same template with netloc replaced, cached per netloc
+
+        :param str netloc: the new netloc
+        :rtype: PathTemplate
+        """
+        ret = self.__patched.get(netloc, None)
+        if ret == None:
+            p = six.moves.urllib.parse.urlparse(self.__src)
+            ret = self.__patched[netloc] = PathTemplate(six.moves.urllib.parse.urlunparse(p._replace(netloc=netloc)))
+        return ret
+
+
 class CaseInsensitiveDict(collections.MutableMapping):
     """ a case insensitive dict:
         - allow to query with case insensitive keys (get, in)